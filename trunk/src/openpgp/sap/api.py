@@ -41,25 +41,38 @@ you want to do anything with them.
 import time # get rid of this in favor of hands on _cmp_expiration()
 
 import logging
+import itertools
 
 from os import linesep
 
 from openpgp.code import *
 
 import openpgp.sap.crypto as CRYPT
+import openpgp.sap.hashes as HASH
 
 from openpgp.sap.exceptions import *
 
 from list import list_as_signed, list_msgs, find_keys, find_key_prefs, deliteralize
-from armory import looks_armored, list_armored, apply_armor
-from pkt.Packet import create_Packet
+from list import KeyIndex
+from armory import looks_armored, list_armored, apply_armor, ArmorWriter
+from keyring import Keyring
+from stream import read_header, read_literal, BodyReader, DecryptReader, BUFSIZE
+from stream import read_signed
+from stream import native_reader
+from stream import PacketWriter, CompressWriter, EncryptWriter
+from pkt.Packet import create_Packet, pktclass
 from pkt.CompressedData import create_CompressedDataBody
 from pkt.Signature import Signature
 from pkt.Signature import create_SignatureSubpacket as create_SigSub
 from pkt.OnePassSignature import create_OnePassSignatureBody
 from msg.Msg import Msg
 from msg.LiteralMsg import create_LiteralMsg
+from pkt.LiteralData import create_LiteralDataBody
 from util.strnum import hex2int
+from util.misc import LRUCache
+
+block_cache = LRUCache(4096) # (primary, block digests): (result, revocs)
+_VERIFY_CHUNK = 256 # items per verify_many() round, well under the cache size
 
 # For the sake of a complete log, the loops don't terminate in case there is
 # more than one match.
@@ -77,6 +90,9 @@ def decrypt_msg(encmsg, **kw):
           (if publicly encrypted) or the symmetric key used to decrypt
           `encmsg` directly (if symmetrically encrypted)
         - `key`: decryption key (`msg.KeyMsg.PrivateKey` instance)
+        - `session`: `KeySession` instance holding unlocked decryption keys
+          (used instead of `key`, `passphrase` is only used for symmetric
+          session keys)
         - `decompress`: set to True to automatically strip a compressed message
           wrapper from decrypted material (otherwise, you must handle the
           possibility of working with a decrypted compressed message)
@@ -90,6 +106,7 @@ def decrypt_msg(encmsg, **kw):
     """
     passphrase = kw.get('passphrase')
     keymsg = kw.get('key')
+    session = kw.get('session')
     decomp = kw.get('decompress')
     clrmsg = None
     errmsg = '' # store exception information from bypassed failures in loops
@@ -101,7 +118,22 @@ def decrypt_msg(encmsg, **kw):
     else: # defaults if no session packets exist?
         raise NotImplementedError("Unable to decrypt w/out a session packet.")
 
-    if keymsg and encpub:
+    if session and encpub:
+
+        for sespkt in encpub:
+            unlocked = session.get(sespkt.body.keyid)
+
+            if unlocked:
+                keypkt, seckeys = unlocked
+
+                try: # continue upon failure, a following target may work
+                    clrmsg = CRYPT.decrypt(encmsg.encrypted, passphrase, sespkt, keypkt, seckeys)
+                    break
+
+                except PGPCryptoError, m:
+                    errmsg = m
+
+    elif keymsg and encpub:
         keyids = keymsg.list_keyids()
 
         for keyid, sespkt in [(i,pkt) for i in keyids for pkt in encpub]:
@@ -144,7 +176,8 @@ def decrypt_str(cphtxt, **kw):
         - `passphrase`: string decryption passphrase (for either symmetric key
           encrypted ciphertext or protected decryption key)
         - `keys`: native OpenPGP or ASCII-armored string containing private
-          (decryption) keys
+          (decryption) keys, or a `Keyring`
+        - `session`: `KeySession` instance to use instead of `keys`
         - `decompress`: set to True to automatically strip compressed material
           (output uncompressed string)
         - `deliteral`: set to True to automatically string-ify literal data
@@ -160,7 +193,16 @@ def decrypt_str(cphtxt, **kw):
     delit = kw.pop('deliteral', False)
     armor = kw.pop('armor', False)
     encmsgs = _filter_msgs(list_as_signed(cphtxt), [MSG_ENCRYPTED])
-    keys = _filter_msgs(list_as_signed(keystring), MSG_KEYS)
+    keyids = []
+
+    for encmsg in encmsgs:
+        keyids.extend(encmsg.list_target_keyids())
+
+    if kw.get('session'): # kw['session'] passed to decrypt_msg()
+        keys = []
+    else:
+        keys = _list_keys(keystring, keyids)
+
     clrmsgs = []
 
     if keys:
@@ -213,6 +255,299 @@ def decrypt_str(cphtxt, **kw):
     return output
 
 
+def decrypt_file(infile, sink, **kw):
+    """Decrypt an OpenPGP-encrypted file incrementally.
+
+    :Parameters:
+        - `infile`: file-like object (native OpenPGP or ASCII-armored)
+          positioned at the start of an encrypted message
+        - `sink`: object with a ``write()`` method, receives decrypted literal
+          data a chunk at a time
+
+    :Keywords:
+        - `passphrase`: string decryption passphrase (for either symmetric key
+          encrypted ciphertext or protected decryption key)
+        - `keys`: native OpenPGP or ASCII-armored string containing private
+          (decryption) keys, or a `Keyring`
+        - `session`: `KeySession` instance to use instead of `keys`
+        - `bufsize`: integer maximum number of bytes handled per pass
+          (default `stream.BUFSIZE`)
+
+    :Returns: `openpgp.sap.pkt.LiteralData.LiteralDataBody` instance with the
+        literal data's format, filename and modification time (`data` is
+        always empty, the data went to `sink`)
+
+    :Exceptions:
+        - `PGPCryptoError`: decryption failed
+
+    Unlike `decrypt_str()`, neither the ciphertext nor the cleartext are held
+    in memory. Packets are decrypted, checked and decompressed as they are
+    read, so memory use depends on `bufsize` and not on the size of the
+    message. ASCII-armored input is decoded as it's read as well. Compressed
+    data is always decompressed, and signatures are skipped.
+
+    :note: An integrity check failure is only detected after all of the
+        cleartext has been written to `sink`. If this function raises
+        `PGPCryptoError`, discard whatever `sink` received.
+    """
+    passphrase = kw.get('passphrase')
+    bufsize = kw.get('bufsize') or BUFSIZE
+    sespkts = []
+    errmsg = '' # store exception information from bypassed failures in loops
+    infile = native_reader(infile, bufsize)
+
+    while True: # session packets are small, read them whole
+        header = read_header(infile)
+
+        if header is None:
+            raise PGPFormatError("No encrypted data found.")
+
+        body = BodyReader(infile, header, bufsize)
+
+        if body.tag.type in [PKT_PUBKEYSESKEY, PKT_SYMKEYSESKEY]:
+            sespkts.append(pktclass(body.tag.type)(header[3] + body.read()))
+
+        elif PKT_MARKER == body.tag.type:
+            body.drain()
+
+        elif body.tag.type in [PKT_SYMENCDATA, PKT_SYMENCINTDATA]:
+            break
+
+        else:
+            raise PGPFormatError("Expected encrypted message packets, received packet type->(%s)." % body.tag.type)
+
+    if not sespkts: # defaults if no session packets exist?
+        raise NotImplementedError("Unable to decrypt w/out a session packet.")
+
+    session = kw.get('session')
+
+    if session:
+        keys = []
+    else:
+        keys = _list_keys(kw.get('keys', ''), [p.body.keyid for p in sespkts
+                          if PKT_PUBKEYSESKEY == p.tag.type])
+
+    sessions = [] # (algorithm, key) candidates
+
+    for sespkt in sespkts:
+
+        if PKT_PUBKEYSESKEY == sespkt.tag.type and session:
+            unlocked = session.get(sespkt.body.keyid)
+            keypkts = unlocked and [unlocked] or []
+
+        elif PKT_PUBKEYSESKEY == sespkt.tag.type:
+            keypkts = [(k.get_keypkt(sespkt.body.keyid), None) for k in keys
+                       if sespkt.body.keyid in k.list_keyids()]
+        else:
+            keypkts = [(None, None)]
+
+        for keypkt, seckeys in keypkts:
+
+            try: # continue upon failure, a following target may work
+                sessions.append(CRYPT.decrypt_session(sespkt, passphrase, keypkt, seckeys))
+
+            except PGPCryptoError, m:
+                errmsg = m
+
+    integrity = PKT_SYMENCINTDATA == body.tag.type
+
+    if integrity and '\x01' != body.read(1):
+        raise NotImplementedError("Unsupported integrity protected data version.")
+
+    for algorithm, key in sessions:
+
+        try: # the prefix check tells whether or not the key is right
+            clearfile = DecryptReader(body, algorithm, key, integrity, bufsize)
+            break
+
+        except PGPCryptoError, m:
+            errmsg = m
+
+    else: # previous errors may have been suppressed
+        raise PGPCryptoError(errmsg or "Decryption failed. Check decryption key.")
+
+    return read_literal(clearfile, sink, bufsize)
+
+
+def decrypt_many(messages, session, **kw):
+    """Decrypt a batch of encrypted strings with unlocked keys.
+
+    :Parameters:
+        - `messages`: list (or other iterable) of ciphertext strings
+        - `session`: `KeySession` instance holding the decryption keys
+
+    :Keywords:
+        - `workers`: integer number of processes doing the decrypting (default
+          1, no extra processes)
+        - `passphrase`, `decompress`, `deliteral`, `armor`: see
+          `decrypt_str()`
+
+    :Returns: list of `decrypt_str()` cleartext strings, one per message in
+        input order (messages that fail to decrypt give None)
+
+    :Exceptions:
+        - `PGPCryptoError`: `session` has expired (or was wiped)
+
+    Since the keys in `session` are already unlocked, decrypting a message
+    only takes the public key math for its session key and the symmetric
+    decryption.
+
+    :note: Worker processes are forked with a copy of `session`, the secret
+        key values are never sent to them (or back) over a pipe. Wiping the
+        session in this process doesn't wipe the copies, but those go away
+        with the workers when this function returns.
+    """
+    workers = kw.pop('workers', 1)
+    messages = list(messages)
+
+    if not session.alive():
+        raise PGPCryptoError("The key session has expired.")
+
+    if 1 < workers:
+        import multiprocessing
+        pool = multiprocessing.Pool(workers, _set_worker_session, (session,))
+
+        try:
+            return pool.map(_decrypt_item, [(m, kw) for m in messages],
+                            len(messages) // (4 * workers) + 1)
+        finally:
+            pool.close()
+            pool.join()
+
+    _set_worker_session(session)
+
+    try:
+        return map(_decrypt_item, [(m, kw) for m in messages])
+    finally:
+        _set_worker_session(None)
+
+_worker_session = None # KeySession used by _decrypt_item()
+
+def _set_worker_session(session):
+    global _worker_session
+    _worker_session = session
+
+def _decrypt_item(item):
+    """Decrypt one `decrypt_many()` message, returning None on failure.
+    """
+    cphtxt, kw = item
+
+    try:
+        return decrypt_str(cphtxt, session=_worker_session, **kw)
+
+    except PGPError, e:
+        logging.getLogger("saplog").warn("Failed to decrypt a message (%s)." % e)
+
+
+class KeySession:
+    """Secret decryption keys, unlocked once for any number of messages.
+
+    :IVariables:
+        - `expires`: time (seconds since the epoch) after which the keys are
+          wiped, or None if they're kept until `wipe()` is called
+
+    Decrypting a secret key means running the passphrase through its S2K
+    specifier and decrypting the secret values, for every message. A session
+    does this once for each decryption key and hands the secret values
+    to `decrypt_msg()`, `decrypt_str()`, `decrypt_file()` and
+    `decrypt_many()` (keyword `session`)::
+
+        session = KeySession(seckeys, 'passphrase', lifetime=600)
+        clrtxts = decrypt_many(mailbox, session)
+        session.wipe()
+
+    :note: Wiping only drops the session's references to the secret values.
+        Python doesn't let us overwrite integers in place, so whatever copies
+        the interpreter made are left to the garbage collector.
+    """
+    def __init__(self, keys, passphrase='', lifetime=None):
+        """Unlock the decryption keys in some private keys.
+
+        :Parameters:
+            - `keys`: native OpenPGP or ASCII-armored string containing
+              private keys, or a `Keyring`
+            - `passphrase`: string passphrase protecting the keys
+            - `lifetime`: optional number of seconds the keys stay unlocked
+
+        :Exceptions:
+            - `PGPCryptoError`: no decryption key could be unlocked
+
+        Keys that can't be unlocked with `passphrase` are skipped. The
+        passphrase isn't kept.
+        """
+        saplog = logging.getLogger("saplog")
+        self._unlocked = {} # key ID: (secret key packet, secret values)
+
+        if lifetime is None:
+            self.expires = None
+        else:
+            self.expires = time.time() + lifetime
+
+        for key in _filter_msgs(_list_keys(keys), [MSG_PRIVATEKEY]):
+
+            for keyid in key.list_keyids():
+                keypkt = key.get_keypkt(keyid)
+
+                if keypkt.body.alg not in [ASYM_RSA_E, ASYM_RSA_EOS,
+                                           ASYM_ELGAMAL_E, ASYM_ELGAMAL_EOS]:
+                    continue
+
+                try:
+                    seckeys = CRYPT.decrypt_secret_key(keypkt, passphrase)
+
+                except PGPError, e:
+                    saplog.warn("Couldn't unlock key ID:%r (%s)." % (keyid, e))
+                    continue
+
+                self._unlocked[keyid] = (keypkt, seckeys)
+
+        if not self._unlocked:
+            raise PGPCryptoError("No decryption keys were unlocked. Check the passphrase.")
+
+    def __len__(self):
+        return len(self._unlocked)
+
+    def get(self, keyid):
+        """Retrieve an unlocked key.
+
+        :Parameters:
+            - `keyid`: string key ID (16 char caps hex)
+
+        :Returns: tuple (secret key packet, secret key values) or None if the
+            key isn't in the session
+
+        :Exceptions:
+            - `PGPCryptoError`: the session has expired (and was wiped)
+        """
+        if not self.alive():
+            raise PGPCryptoError("The key session has expired.")
+
+        return self._unlocked.get(keyid)
+
+    def alive(self):
+        """Tell whether the keys are still unlocked (wiping them if not).
+
+        :Returns: boolean
+        """
+        if self.expires is not None and self.expires <= time.time():
+            self.wipe()
+            return False
+
+        return True
+
+    def list_keyids(self):
+        """List the IDs of the unlocked keys.
+
+        :Returns: list of string key IDs
+        """
+        return self._unlocked.keys()
+
+    def wipe(self):
+        """Forget the unlocked keys.
+        """
+        self._unlocked.clear()
+        self.expires = time.time()
+
 def encrypt_msg(msg, **kw):
     """Create an OpenPGP encrypted message.
 
@@ -242,42 +577,7 @@ def encrypt_msg(msg, **kw):
         is used to ensure that decrypted data is a message.
     """
     saplog = logging.getLogger('saplog')
-    passphrase = kw.get('passphrase', '')
-    keytargets = kw.get('keys')
-    pkts = []
-    # default MUSTs 12.1 says SYM_DES3 is an implied preference
-    alg_sym, alg_hash, alg_comp = SYM_DES3, HASH_SHA1, COMP_UNCOMPRESSED
-    
-    if 'passphrase' in kw: # set symmetric if 'passphrase' keyword exists at all
-        sespkt = CRYPT.encrypt_symmetric_session(alg_sym)
-        enckey = CRYPT.string2key(sespkt.body.s2k, alg_sym, passphrase)
-        pkts.append(sespkt)
-
-    elif keytargets: # set public session keys
-        preferred = find_key_prefs([p[0] for p in keytargets])
-
-        if preferred['sym']:
-            alg_sym = preferred['sym'][0]
-
-        if preferred['hash']:
-            alg_hash = preferred['hash'][0]
-
-        if preferred['comp']:
-            alg_comp = preferred['comp'][0]
-
-        enckey = CRYPT.gen_random(CRYPT._keysize(alg_sym))
-
-        for keymsg, targets in keytargets:
-
-            for target in targets:
-
-                if verify_block(keymsg, 'key', target):
-                    keypkt = keymsg.get_keypkt(target)
-                    sespkt = CRYPT.encrypt_public_session(keypkt, enckey, alg_sym)
-                    pkts.append(sespkt)
-
-                else:
-                    saplog.warn("Skipping unbound Encryption key %s::%s." % (keymsg.primary_id, target))
+    pkts, enckey, alg_sym, alg_comp = _create_sessions(**kw)
 
     # create encrypted message
     if pkts:
@@ -306,7 +606,8 @@ def encrypt_str(clrtxt, **kw):
 
     :Keywords:
         - `passphrase`: string symmetrical encryption passphrase
-        - `keys`: native OpenPGP or ASCII-armored string containing public keys
+        - `keys`: native OpenPGP or ASCII-armored string containing public
+          keys, or a `Keyring`
         - `use_key`: [(primary, keyid), ..] specific encryption key(s)
         - `use_userid`: [(primary, userid), ..] encryption key(s) by user ID(s)
         - `lit_filename`: name of literal cleartext (NOT output)
@@ -327,20 +628,8 @@ def encrypt_str(clrtxt, **kw):
     lit_modified = kw.pop('lit_modified', 0)
     armor = kw.pop('armor', False)
 
-    keys = _filter_msgs(list_as_signed(keystring), MSG_KEYS)
-
-    opts = {}
-
-    if encrypting_key:
-        opts['keyids'] = encrypting_key
-
-    elif encrypting_userid:
-        opts['userids'] = encrypting_userid
-
-    elif 'passphrase' not in kw:
-        raise PGPError("Please specify encryption key by user ID, key ID or fingerprint.")
-
-    keytargets = find_keys(keys, action='encrypt', **opts)
+    keytargets = _find_encryption_keys(keystring, encrypting_key,
+                                       encrypting_userid, 'passphrase' in kw)
 
     literal = {'data': clrtxt, 'format': "b",
                'filename': lit_filename,
@@ -358,6 +647,157 @@ def encrypt_str(clrtxt, **kw):
 
     return output
 
+class EncryptingWriter:
+    """Encrypt (and optionally sign) data written a piece at a time.
+
+    :IVariables:
+        - `literal`: `openpgp.sap.pkt.LiteralData.LiteralDataBody` instance
+          describing the literal data (its `data` is empty)
+
+    This is the incremental counterpart of `encrypt_str()` for data that
+    won't fit in memory (multi-gigabyte backups piped through, for example).
+    Data passed to `write()` goes straight through signature hashing,
+    compression and encryption to `outfile`. Packets whose size isn't known up
+    front (literal, compressed and encrypted data) are written with partial
+    body lengths, so memory use depends on `bufsize` and not on the amount of
+    data.
+
+    Usage::
+
+        w = EncryptingWriter(outfile, keys=key_d, use_userid=[(None, 'Tester')])
+
+        for chunk in chunks:
+            w.write(chunk)
+
+        w.close()
+
+    `close()` must be called to finish the message, it does not close
+    `outfile`.
+    """
+    def __init__(self, outfile, **kw):
+        """Start an encrypted message.
+
+        :Parameters:
+            - `outfile`: file-like object with a ``write()`` method
+
+        :Keywords:
+            - `passphrase`: string symmetrical encryption passphrase
+            - `keys`: native OpenPGP or ASCII-armored string containing public
+              keys, or a `Keyring`
+            - `use_key`: [(primary, keyid), ..] specific encryption key(s)
+            - `use_userid`: [(primary, userid), ..] encryption key(s) by user
+              ID(s)
+            - `sign_keys`: native OpenPGP or ASCII-armored string containing
+              the (private) signing key, or a `Keyring`, set to add a one-pass
+              signature
+            - `sign_passphrase`: string private signing key passphrase
+            - `lit_filename`: name of literal cleartext (NOT output)
+            - `lit_modified`: modification time of literal cleartext (NOT
+              output)
+            - `armor`: set to True to armor encrypted output
+            - `bufsize`: integer partial body size, rounded down to a power
+              of 2 (default `stream.BUFSIZE`)
+
+        :Exceptions:
+            - `PGPError`: no encryption targets or an ambiguous signer
+
+        :note: Signatures are always ``SIG_BINARY``.
+        """
+        bufsize = kw.pop('bufsize', None) or BUFSIZE
+        keystring = kw.pop('keys', '')
+        encrypting_key = kw.pop('use_key', None)
+        encrypting_userid = kw.pop('use_userid', None)
+        sign_keys = kw.pop('sign_keys', None)
+        sign_passphrase = kw.pop('sign_passphrase', None)
+        lit_filename = kw.pop('lit_filename', 'cleartext')
+        lit_modified = kw.pop('lit_modified', 0)
+        armor = kw.pop('armor', False)
+        # kw['passphrase'] passed to _create_sessions()
+
+        kw['keys'] = _find_encryption_keys(keystring, encrypting_key,
+                                           encrypting_userid, 'passphrase' in kw)
+        pkts, enckey, alg_sym, alg_comp = _create_sessions(**kw)
+
+        if not pkts:
+            raise PGPError("No session keys created. Check target validity.")
+
+        self._signer = None
+
+        if sign_keys: # resolve the signer before writing anything
+            signers = _find_keys(sign_keys, action='sign')
+
+            if 1 < len(signers):
+                raise PGPError("Ambiguous signer. Please be more specific.")
+
+            elif not signers:
+                raise PGPError("No signing keys found. Check key, user ID.")
+
+            self._signer = signers[0][0].get_keypkt(signers[0][1][0])
+            self._sign_passphrase = sign_passphrase
+            self._hash = HASH.new(HASH_SHA1)
+
+        if armor:
+            outfile = ArmorWriter(outfile)
+
+        self._writers = [] # in closing order, first to last
+
+        for pkt in pkts:
+            outfile.write(pkt.rawstr())
+
+        encpkt = PacketWriter(outfile, PKT_SYMENCINTDATA, bufsize)
+        inner = EncryptWriter(encpkt, alg_sym, enckey)
+        self._writers[:0] = [inner, encpkt]
+
+        if alg_comp != COMP_UNCOMPRESSED: # compress msg string, if allowed
+            comppkt = PacketWriter(inner, PKT_COMPRESSED, bufsize)
+            comppkt.write(chr(alg_comp))
+            inner = CompressWriter(comppkt, alg_comp)
+            self._writers[:0] = [inner, comppkt]
+
+        if self._signer:
+            op_opts = {'sigtype':SIG_BINARY,
+                       'alg_hash':HASH_SHA1,
+                       'alg_pubkey':self._signer.body.alg,
+                       'keyid':self._signer.body.id,
+                       'nest':1}
+            onepassbody = create_OnePassSignatureBody(op_opts)
+            inner.write(create_Packet(PKT_ONEPASS, onepassbody._d).rawstr())
+
+        self.literal = create_LiteralDataBody(data='', format='b',
+                                              filename=lit_filename,
+                                              modified=lit_modified)
+        self._inner = inner
+        self._litpkt = PacketWriter(inner, PKT_LITERAL, bufsize)
+        self._litpkt.write(self.literal._d)
+
+        if armor:
+            self._writers.append(outfile)
+
+    def write(self, d):
+        """Encrypt a string.
+
+        :Parameters:
+            - `d`: string of (literal) cleartext
+        """
+        if self._signer:
+            self._hash.update(d)
+
+        self._litpkt.write(d)
+
+    def close(self):
+        """Finish the literal data, signature and encrypted message.
+        """
+        self._litpkt.close()
+
+        if self._signer:
+            sigpkt = CRYPT.sign(SIG_BINARY, None, self._signer,
+                                passphrase=self._sign_passphrase,
+                                hasher=self._hash)
+            self._inner.write(sigpkt.rawstr())
+
+        for writer in self._writers:
+            writer.close()
+
 # this uses new-style snap packets for easy attribute->stringification
 #def gen_key_str(**kw):
 #    """Generate a public/private key pair. DEMO ONLY.
@@ -562,7 +1002,8 @@ def sign_str(sigtype, key, **kw):
 
     :Parameters:
         - `sigtype`: (int) signature type code
-        - `key`: (str) native or ASCII-armored private signing key
+        - `key`: (str) native or ASCII-armored private signing key, or a
+          `Keyring`
 
     :Keywords:
         - `target`: str signed data (may contain target key)
@@ -633,8 +1074,7 @@ def sign_str(sigtype, key, **kw):
     if signing_key:
         opts['keyids'] = [signing_key]
 
-    keys = _filter_msgs(list_as_signed(key), MSG_KEYS)
-    signers = find_keys(keys, action='sign', **opts)
+    signers = _find_keys(key, action='sign', **opts)
 
     if 1 == len(signers):
         keymsg = signers[0][0] # signing key message
@@ -734,6 +1174,93 @@ def sign_str(sigtype, key, **kw):
     else:
         raise PGPError("No signing keys found. Check key, user ID.")
 
+def sign_file(sigtype, key, infile, **kw):
+    """Create a detached signature on a file, reading it incrementally.
+
+    :Parameters:
+        - `sigtype`: integer signature type constant, ``SIG_BINARY`` or
+          ``SIG_TEXT``
+        - `key`: native or ASCII-armored private signing key, or a `Keyring`
+        - `infile`: file-like object positioned at the start of the data to
+          sign
+
+    :Keywords:
+        - `use_key`: tuple (primary, keyid) signing key
+        - `use_userid`: tuple (primary, userid) primary associated with
+          user ID
+        - `passphrase`: str private signing key passphrase
+        - `sig_created`: int timestamp when the signature was created
+        - `hashalg`: integer hash algorithm constant (default SHA-1)
+        - `bufsize`: integer maximum number of bytes read per pass (default
+          `stream.BUFSIZE`)
+        - `armor`: set to True to armor the signature
+
+    :Returns: string detached signature
+
+    The data is read and hashed a chunk at a time (text is canonicalized on
+    the way for ``SIG_TEXT``), so memory use doesn't depend on the size of the
+    file. The signing key ID is added as an unhashed subpacket.
+
+    :see: `sign_str()`
+    """
+    bufsize = kw.get('bufsize') or BUFSIZE
+    hashalg = kw.get('hashalg') or HASH_SHA1
+    opts = {}
+
+    if sigtype not in [SIG_BINARY, SIG_TEXT]:
+        raise PGPError("Only binary and text signatures can be made on files.")
+
+    if kw.get('use_userid'):
+        opts['userids'] = [kw['use_userid']]
+
+    if kw.get('use_key'):
+        opts['keyids'] = [kw['use_key']]
+
+    signers = _find_keys(key, action='sign', **opts)
+
+    if 1 < len(signers):
+        raise PGPError("Ambiguous signer. Please be more specific.")
+
+    elif not signers:
+        raise PGPError("No signing keys found. Check key, user ID.")
+
+    keypkt = signers[0][0].get_keypkt(signers[0][1][0])
+    md = HASH.new(hashalg)
+
+    if SIG_TEXT == sigtype:
+        canon = CRYPT.TextCanonicalizer()
+    else:
+        canon = None
+
+    while True:
+        d = infile.read(bufsize)
+
+        if not d:
+            break
+
+        if canon:
+            d = canon.update(d)
+
+        md.update(d)
+
+    if canon:
+        md.update(canon.final())
+
+    hashed = []
+
+    if 'sig_created' in kw:
+        hashed.append(create_SigSub(SIGSUB_CREATED, kw['sig_created']))
+
+    sigpkt = CRYPT.sign(sigtype, None, keypkt, passphrase=kw.get('passphrase'),
+                        hashalg=hashalg, hasher=md, hashed_subpkts=hashed,
+                        unhashed_subpkts=[create_SigSub(SIGSUB_SIGNERID,
+                                                        keypkt.body.id)])
+
+    if kw.get('armor'):
+        return apply_armor(sigpkt)
+
+    return sigpkt.rawstr()
+
 # The loops do not terminate once a suitable item is found. If the list is
 # small, no big deal anyway. If the list is large, this allows for the
 # possibility of multiple matches. An improvement might be to pop out sigs
@@ -754,6 +1281,8 @@ def verify_block(key, blocktype, target, **kw):
     :Keywords:
         - `revocs`: list to which applicable revocation signature packets will
           be appended
+        - `outcomes`: optional dictionary of signature outcomes already worked
+          out (see `crypto.verify()`)
 
     :Returns: True if verified, None otherwise. If keyword `revocs` is set and
         pending revocations exist, they will be appended to it.
@@ -818,14 +1347,30 @@ def verify_block(key, blocktype, target, **kw):
         signature type to do this (my interpretation).
     :note: Keywords aren't used since I wanted it to be obvious that only one
         block could be verified at a time.
+    :note: Outcomes are cached in `block_cache` by the content of the block
+        and the primary block, until the first signature or key expiration
+        that could change them.
     
     :todo: User attributes are not supported yet since I don't know of a nice
         way to identify one in a list of them.
     """
     saplog = logging.getLogger("saplog")
     saplog.info("Checking block bindings..")
+    outcomes = kw.get('outcomes')
  
     block = key.get_block(blocktype, target)
+    cache_key = (_block_digest(key._b_primary), _block_digest(block))
+    cached = block_cache.get(cache_key)
+
+    if cached is not None:
+        saplog.info("Using the cached block verification.")
+        result, revocs = cached
+
+        if 'revocs' in kw:
+            kw['revocs'].extend(revocs)
+
+        return result
+
     pending_revocs, effective_revocs = [], []
     verified = expired = revoked = False
     exempt = [PKT_PUBLICKEY, PKT_PRIVATEKEY]
@@ -839,7 +1384,8 @@ def verify_block(key, blocktype, target, **kw):
 
     elif block.type in nonexempt: # check primary (a bad primary spoils the lot)
         l = [] # (potential) revocation holder
-        verified_primary = verify_block(key, 'key', key.primary_fprint, revocs=l)
+        verified_primary = verify_block(key, 'key', key.primary_fprint,
+                                        revocs=l, outcomes=outcomes)
 
         if verified_primary:
             pending_revocs.extend(l)
@@ -856,7 +1402,8 @@ def verify_block(key, blocktype, target, **kw):
                 if _cmp_expiration(sig, SIGSUB_EXPIRES): # ignore expired sig
                     saplog.info("A local binding has expired (skipping verification).")
 
-                elif CRYPT.verify(sig, block.leader, key._b_primary.leader):
+                elif CRYPT.verify(sig, block.leader, key._b_primary.leader,
+                                  outcomes=outcomes):
 
                     if _cmp_expiration(sig, SIGSUB_KEYEXPIRES):
                         expired = True
@@ -878,7 +1425,8 @@ def verify_block(key, blocktype, target, **kw):
     # check local revocations 
     for sig in block.local_revocs: # assuming an outside revoc did not sneak in
 
-        if CRYPT.verify(sig, block.leader, key._b_primary.leader):
+        if CRYPT.verify(sig, block.leader, key._b_primary.leader,
+                        outcomes=outcomes):
             revoked = True
             saplog.info("The key was revoked locally.")
             effective_revocs.append(sig)
@@ -893,7 +1441,8 @@ def verify_block(key, blocktype, target, **kw):
 
             if _cmp_expiration(sig, SIGSUB_KEYEXPIRES, block.leader.body.created):
 
-                if CRYPT.verify(sig, block.leader, key._b_primary.leader):
+                if CRYPT.verify(sig, block.leader, key._b_primary.leader,
+                                outcomes=outcomes):
                     expired = True
                     effective_revocs.append(sig)
                     saplog.info("The key has expired.")
@@ -917,7 +1466,8 @@ def verify_block(key, blocktype, target, **kw):
 
             for perm in local_auths:
 
-                if CRYPT.verify(perm, block.leader, key._b_primary.leader):
+                if CRYPT.verify(perm, block.leader, key._b_primary.leader,
+                                outcomes=outcomes):
                     pending_revocs.append(revoker) # no effect on verifcation
                     saplog.info("Found an unresolved outside revocation.")
 
@@ -929,19 +1479,20 @@ def verify_block(key, blocktype, target, **kw):
 
     if True == verified and False == revoked and False == expired:
         saplog.info("Key verified successfully.")
-
-        if 'revocs' in kw:
-            kw['revocs'].extend(pending_revocs)
-
-        return True
+        result, revocs = True, pending_revocs
 
     else:
         saplog.info("Key failed to verify.")
+        result, revocs = None, effective_revocs
 
-        if 'revocs' in kw:
-            kw['revocs'].extend(effective_revocs)
+    expires = _next_expiration(block.get_sigs() + key._b_primary.get_sigs(),
+                               [block.leader, key._b_primary.leader])
+    block_cache.set(cache_key, (result, revocs), expires)
 
-        return None
+    if 'revocs' in kw:
+        kw['revocs'].extend(revocs)
+
+    return result
 
 # Maybe a check_time=True option to reconcile revocations with respect to
 # timestamps. If sig was made before (foreign) revocation time, don't add 
@@ -965,6 +1516,13 @@ def verify_msg(signed, key, **kw):
           revocation signature packets will be appended (see `verify_block()`)
         - `signer_fprint`: fingerprint of signing key - use this to force
           validation against a particular key packet in `key`
+        - `index`: optional `list.KeyIndex` containing `key`, used to look up
+          its signing keys for unassigned signatures
+        - `hashers`: optional dictionary of hash objects already fed the
+          signed data, keyed by (signature type, hash algorithm) (see
+          `stream.read_signed()`), used instead of hashing the target
+        - `outcomes`: optional dictionary of signature outcomes already worked
+          out (see `crypto.verify()`)
 
     :Returns: message that was verified (packet instance, message instance, or
         string) or None if nothing was verified
@@ -1035,46 +1593,13 @@ def verify_msg(signed, key, **kw):
     """
     saplog = logging.getLogger("saplog")
     signer_fprint = kw.get('signer_fprint', None)
+    index = kw.get('index')
+    hashers = kw.get('hashers')
+    outcomes = kw.get('outcomes')
     success = False # the goal is to set this to True
-    opts = {}
-    pending, revocs = [], []
-
-    # package pending verifications, sigs & msg are verified, msg is returned
-    if isinstance(signed, tuple):
-        sigs, msg = signed
-
-        if hasattr(msg, 'type') and msg.type in MSG_KEYS:
-            opts['primary'] = msg._b_primary.leader
-            blocks = msg.list_blocks()
-
-            for sig in sigs: # match the sig with the appropriate block leader
-
-                for b in blocks: # may as well skip block leaders ([1:])
-                    # there should be a better way to match, see func docs
-                    if [s for s in b.seq()[1:] if s.rawstr() == sig.rawstr()]:
-                        pending.append((sig, b.leader))
-                        break
-
-            if not pending:
-                raise PGPError("No matching signatures in the key message.")
-
-        else:
-
-            if hasattr(msg, 'type') and MSG_SIGNED == msg.type:
-                # assume the sig is singled out for verification
-                msg = msg.msg
-                
-            for sig in sigs: # handles all other messages and None (standalone)
-                pending.append((sig, msg))
-
-    elif signed.type == MSG_SIGNED: # should be a SignedMsg
-        sigs, msg = signed.sigs, signed.msg
-
-        for sig in sigs:
-            pending.append((sig, msg))
-
-    else:
-        raise NotImplementedError("Unable to verify %s." % signed)
+    revocs = []
+    pending, msg, opts = _list_pending(signed)
+    opts['outcomes'] = outcomes
 
     assigned = ex_verified = im_verified = 0 # Explicit/implicit verification..
     # ..is needed so that all assigned signatures are accounted for by explicit
@@ -1086,6 +1611,9 @@ def verify_msg(signed, key, **kw):
         keypkt = None
         signer_id = sig.body.keyid
 
+        if hashers is not None:
+            opts['hasher'] = hashers.get((sig.body.type, sig.body.alg_hash))
+
         if signer_fprint: # forced a signer to verify against
             keypkt = key.get_keypkt(signer_fprint)
             signer_id = signer_fprint # this is ugly: it's used to match up the
@@ -1104,7 +1632,8 @@ def verify_msg(signed, key, **kw):
                 if _cmp_expiration(sig, SIGSUB_EXPIRES): # if sig expired..
                         saplog.info("..but the signature has expired.") #..abort
 
-                elif verify_block(key, 'key', signer_id, revocs=revocs):
+                elif verify_block(key, 'key', signer_id, revocs=revocs,
+                                  outcomes=outcomes):
                     success = True
 
                 else: # room for timestamp/reason for revocation exceptions
@@ -1113,7 +1642,11 @@ def verify_msg(signed, key, **kw):
                 saplog.warn("A signature from ID:%r failed." % signer_id)
 
         elif not signer_id: # try to verify unassigned sig !! not just else: !!
-            matches = find_keys([key], action='sign')
+            if index is None:
+                index = KeyIndex([key])
+
+            matches = index.find(keyids=[(key.primary_fprint, None)],
+                                 action='sign')
 
             if matches:
                 saplog.warn("Attempting to verify an unassigned signature.")
@@ -1130,7 +1663,8 @@ def verify_msg(signed, key, **kw):
                     if v:
                         im_verified += 1
 
-                        if verify_block(key, 'key', keyid, revocs=revocs):
+                        if verify_block(key, 'key', keyid, revocs=revocs,
+                                        outcomes=outcomes):
                             success = True
 
     #if 0 == assigned:
@@ -1150,7 +1684,7 @@ def verify_str(signed, keys, **kw):
  
     :Parameters:
         - `signed`: string containing signed messages or detached signatures
-        - `keys`: string containing one or more public keys
+        - `keys`: string containing one or more public keys, or a `Keyring`
 
     :Keywords:
         - `detached`: str detached data - outside data that may be the target
@@ -1181,25 +1715,251 @@ def verify_str(signed, keys, **kw):
 
     :todo: Make revocations (as ``revocs``) accessible.
     """
+    keyring, index = _key_source(keys)
+    signed = list_as_signed(signed, detached=kw.get('detached'), decompress=True)
+
+    return _verify_signed(signed, keyring, index, kw.get('armor', False))
+
+def verify_many(items, keys, **kw):
+    """Verify a batch of signed strings.
+
+    :Parameters:
+        - `items`: list (or other iterable) of signed strings or tuples
+          (signed string, detached string), see `verify_str()`
+        - `keys`: string containing one or more public keys, or a `Keyring`
+
+    :Keywords:
+        - `workers`: integer number of processes doing the public key math
+          (default 1, no extra processes)
+        - `armor`: see `verify_str()`
+
+    :Returns: list of `verify_str()` results, one per item in input order
+        (items that can't be verified or raise a `PGPError` give False)
+
+    The keys are parsed (or looked up) once for the whole batch. Items are
+    worked through in chunks: every signature in a chunk is paired with the
+    key packets that could have made it, and the signed contexts are hashed
+    here, in this process. Signatures made by the same signer share the
+    signer's block verifications, which are only done once. The public key
+    math is then spread over `workers` processes and the outcomes are handed
+    to the verification of each item (with `verify_str()` rules), which
+    only looks them up. They're put into `crypto.verify_cache` as well.
+
+    :note: Extra processes only help on machines with more than one core,
+        and only if there are enough signatures to make up for sending them
+        over. Keep `workers` at 1 otherwise.
+    :note: Signatures whose outcome doesn't matter to `verify_str()` (an
+        expired binding, for example) may be verified anyway.
+    """
     saplog = logging.getLogger("saplog")
-    keys = _filter_msgs(list_as_signed(keys), MSG_KEYS)
-    det = kw.get('detached')
-    armor = kw.pop('armor', False)
-    verified_msgs = []
+    workers = kw.get('workers', 1)
+    armor = kw.get('armor', False)
+    keyring, index = _key_source(keys)
+    items = iter(items)
+    results = []
+    pool = None
 
-    for signed in list_as_signed(signed, detached=det, decompress=True):
-        verified = False
+    if 1 < workers:
+        import multiprocessing
+        pool = multiprocessing.Pool(workers)
+
+    try:
+
+        while True:
+            batch, tasks, outcomes = [], {}, {}
+
+            for item in itertools.islice(items, _VERIFY_CHUNK):
+
+                if isinstance(item, tuple):
+                    signed, detached = item
+                else:
+                    signed, detached = item, None
+
+                try:
+                    signed = list_as_signed(signed, detached=detached,
+                                            decompress=True)
+
+                    for s in signed:
+                        _collect_verifications(_as_verifiable(s), keyring,
+                                               index, tasks, outcomes)
+
+                except PGPError, e:
+                    saplog.warn("Skipping an unverifiable item (%s)." % e)
+                    signed = None
+
+                batch.append(signed)
+
+            if not batch:
+                break
+
+            cache_keys = tasks.keys()
+            tasks = [tasks[k] for k in cache_keys]
+
+            if pool:
+                verified_tasks = pool.map(CRYPT.verify_task, tasks,
+                                          len(tasks) // (4 * workers) + 1)
+            else:
+                verified_tasks = map(CRYPT.verify_task, tasks)
+
+            for cache_key, verified in zip(cache_keys, verified_tasks):
+                outcomes[cache_key] = verified
+                CRYPT.verify_cache.set(cache_key, verified)
+
+            for signed in batch:
+                verified = False
+
+                if signed is not None:
+
+                    try:
+                        verified = _verify_signed(signed, keyring, index,
+                                                  armor, outcomes)
+
+                    except PGPError, e:
+                        saplog.warn("Failed to verify an item (%s)." % e)
+
+                results.append(verified)
+
+    finally:
+
+        if pool:
+            pool.close()
+            pool.join()
+
+    return results
+
+def verify_file(infile, sink, keys, **kw):
+    """Verify a signed message in a file incrementally.
+
+    :Parameters:
+        - `infile`: file-like object (native OpenPGP or ASCII-armored)
+          positioned at the start of a signed message
+        - `sink`: object with a ``write()`` method, receives the signed
+          literal data a chunk at a time
+        - `keys`: string containing one or more public keys, or a `Keyring`
+
+    :Keywords:
+        - `bufsize`: integer maximum number of bytes handled per pass
+          (default `stream.BUFSIZE`)
+
+    :Returns: `openpgp.sap.pkt.LiteralData.LiteralDataBody` instance with the
+        literal data's format, filename and modification time (`data` is
+        always empty, the data went to `sink`) or None if the message did not
+        verify
+
+    :Exceptions:
+        - `PGPFormatError`: no signatures or literal data were found, or a
+          signature wasn't announced ahead of the literal data
+
+    Unlike `verify_str()`, the message isn't parsed into a message instance
+    first. The one-pass signature packets are read, a hash is started for
+    each signature type and hash algorithm they announce, the literal data is
+    passed through the hashes to `sink` and the trailing signatures are
+    verified against the hashes (see `stream.read_signed()`). Memory use
+    depends on `bufsize` and the number of signatures, not on the size of the
+    literal data. ASCII-armored input is decoded as it's read, compressed
+    data is decompressed. Verification follows `verify_msg()` rules.
+
+    :note: Nothing is known about the signatures until all of the literal
+        data has been written to `sink`. If this function returns None or
+        raises an exception, discard whatever `sink` received.
+    """
+    bufsize = kw.get('bufsize') or BUFSIZE
+    literal, sigs, hashers = read_signed(native_reader(infile, bufsize), sink,
+                                         bufsize)
+
+    if not sigs:
+        raise PGPFormatError("No signatures found.")
+
+    if literal is None:
+        raise PGPFormatError("No literal data found.")
 
-        if hasattr(signed, 'type') and signed.type in MSG_KEYS: # handle keys
-            block_sigs = []
+    for sig in sigs:
 
-            for b in signed.list_blocks():
-                block_sigs.extend(b.get_sigs()) # foreign sigs will be ignored
+        if (sig.body.type, sig.body.alg_hash) not in hashers:
+            raise PGPFormatError("Signature type->(%s) hash->(%s) wasn't announced ahead of the literal data." % (sig.body.type, sig.body.alg_hash))
 
-            signed = (block_sigs, signed) # set as detached for verify_msg()
+    keyring, index = _key_source(keys)
+    signed = (sigs, literal)
+    keys, key_index = _signer_keys(signed, keyring, index)
+
+    for key in keys:
+
+        if verify_msg(signed, key, index=key_index, hashers=hashers):
+            return literal
+
+def _key_source(keys):
+    """Prepare verification keys for `_signer_keys()`.
+
+    :Parameters:
+        - `keys`: string containing keys or a `Keyring`
+
+    :Returns: tuple (`Keyring` or None, `list.KeyIndex` or None)
+    """
+    if isinstance(keys, Keyring): # only load the keys that signed something
+        return keys, None
+
+    return None, KeyIndex(_list_keys(keys))
+
+def _as_verifiable(signed):
+    """Set up a key message as a detached signature for `verify_msg()`.
+    """
+    if hasattr(signed, 'type') and signed.type in MSG_KEYS: # handle keys
+        block_sigs = []
+
+        for b in signed.list_blocks():
+            block_sigs.extend(b.get_sigs()) # foreign sigs will be ignored
+
+        signed = (block_sigs, signed)
+
+    return signed
+
+def _signer_keys(signed, keyring, index):
+    """List the keys that could have signed something.
+
+    :Parameters:
+        - `signed`: see `verify_msg()`
+        - `keyring`: `Keyring` instance or None
+        - `index`: `list.KeyIndex` instance (used if `keyring` is None)
+
+    :Returns: tuple ([key message, ..], `list.KeyIndex` holding them)
+    """
+    if isinstance(signed, tuple):
+        keyids = [s.body.keyid for s in signed[0]]
+    else:
+        keyids = [s.body.keyid for s in getattr(signed, 'sigs', [])]
+
+    unassigned = [k for k in keyids if not k] # these need all the keys
+
+    if keyring:
+
+        if unassigned:
+            keys = keyring.list_keys()
+        else:
+            keys = keyring.list_keys(keyids)
+
+        return keys, KeyIndex(keys)
+
+    elif unassigned:
+        return index.keys, index
+
+    # only the keys that made the signatures can verify them
+    return index.list_keys(keyids), index
+
+def _verify_signed(signed_list, keyring, index, armor, outcomes=None):
+    """Verify a list of signed things for `verify_str()`.
+
+    `outcomes` is passed on to `verify_msg()`.
+    """
+    verified_msgs = []
+
+    for signed in signed_list:
+        verified = False
+        signed = _as_verifiable(signed)
+        keys, key_index = _signer_keys(signed, keyring, index)
 
         for key in keys:
-            verified = verify_msg(signed, key)
+            verified = verify_msg(signed, key, index=key_index,
+                                  outcomes=outcomes)
 
             if verified:
                 verified_msgs.append(verified)
@@ -1229,6 +1989,125 @@ def verify_str(signed, keys, **kw):
 
         return ''.join(verified_out)
 
+def _collect_verifications(signed, keyring, index, tasks, outcomes):
+    """Gather the signature verifications `verify_msg()` would do.
+
+    :Parameters:
+        - `signed`: see `verify_msg()`
+        - `keyring`: `Keyring` instance or None
+        - `index`: `list.KeyIndex` instance (used if `keyring` is None)
+        - `tasks`: dictionary to which {cache key: task} items are added (see
+          `crypto.prepare_verify()`)
+        - `outcomes`: dictionary to which {cache key: outcome} items are added
+          for verifications already in `crypto.verify_cache`
+
+    Each signature is paired with the signing key packets that could have
+    made it, along with the local signatures of the signing key's block and
+    the primary block that `verify_block()` checks.
+    """
+    pending, msg, opts = _list_pending(signed)
+    keys, index = _signer_keys(signed, keyring, index)
+
+    for key in keys:
+        primary = key._b_primary.leader
+
+        for sig, target in pending:
+            keyid = sig.body.keyid
+
+            if keyid:
+
+                if keyid not in key.list_keyids():
+                    continue
+
+                keyids = [keyid]
+
+            else:
+                matches = index.find(keyids=[(key.primary_fprint, None)],
+                                     action='sign')
+                keyids = matches and matches[0][1] or []
+
+            for keyid in keyids:
+                _add_verification(tasks, outcomes, sig, target,
+                                  key.get_keypkt(keyid), **opts)
+                blocks = [key._b_primary, key.get_block('key', keyid)]
+
+                if blocks[1] is blocks[0]:
+                    blocks.pop()
+
+                for b in blocks:
+
+                    for s in b.local_bindings + b.local_revocs + b.local_direct:
+                        _add_verification(tasks, outcomes, s, b.leader,
+                                          primary)
+
+def _add_verification(tasks, outcomes, sig, target, keypkt, **opts):
+    try:
+        cache_key, task = CRYPT.prepare_verify(sig, target, keypkt, **opts)
+
+    except (PGPError, AttributeError, NotImplementedError):
+        return # verify_msg() will run into it (or not) on its own
+
+    if cache_key in tasks or cache_key in outcomes:
+        return
+
+    verified = CRYPT.verify_cache.get(cache_key)
+
+    if verified is None:
+        tasks[cache_key] = task
+    else:
+        outcomes[cache_key] = verified
+
+def _list_pending(signed):
+    """Pair the signatures in something signed with their targets.
+
+    :Parameters:
+        - `signed`: see `verify_msg()`
+
+    :Returns: tuple ([(signature packet, target), ..], message, opts) where
+        ``opts`` are the keywords `crypto.verify()` needs for the targets
+    """
+    opts = {}
+    pending = []
+
+    # package pending verifications, sigs & msg are verified, msg is returned
+    if isinstance(signed, tuple):
+        sigs, msg = signed
+
+        if hasattr(msg, 'type') and msg.type in MSG_KEYS:
+            opts['primary'] = msg._b_primary.leader
+            blocks = msg.list_blocks()
+
+            for sig in sigs: # match the sig with the appropriate block leader
+
+                for b in blocks: # may as well skip block leaders ([1:])
+                    # there should be a better way to match, see func docs
+                    if [s for s in b.seq()[1:] if s.rawstr() == sig.rawstr()]:
+                        pending.append((sig, b.leader))
+                        break
+
+            if not pending:
+                raise PGPError("No matching signatures in the key message.")
+
+        else:
+
+            if hasattr(msg, 'type') and MSG_SIGNED == msg.type:
+                # assume the sig is singled out for verification
+                msg = msg.msg
+                
+            for sig in sigs: # handles all other messages and None (standalone)
+                pending.append((sig, msg))
+
+    elif signed.type == MSG_SIGNED: # should be a SignedMsg
+        sigs, msg = signed.sigs, signed.msg
+
+        for sig in sigs:
+            pending.append((sig, msg))
+
+    else:
+        raise NotImplementedError("Unable to verify %s." % signed)
+
+    return pending, msg, opts
+
 def _cmp_expiration(sig, subpkt_type, exp_base=None):
     """Compare a signature's expiration with the current time.
 
@@ -1255,10 +2134,159 @@ def _cmp_expiration(sig, subpkt_type, exp_base=None):
     # v3 sigs don't have expiration, just move along
     return False
 
+def _next_expiration(sigs, leaders):
+    """Find the next time an expiration could change verification results.
+
+    :Parameters:
+        - `sigs`: list of `OpenPGP.packet.Signature` instances
+        - `leaders`: list of block leader packets, key creation times are
+          used as a base for key expirations
+
+    :Returns: integer time of the earliest signature or key expiration (of
+        those that haven't passed yet) or None if there aren't any
+
+    Each expiration is measured from the signature creation time and from the
+    leaders' creation times (if they have one), any of which
+    `_cmp_expiration()` might use. Erring early only costs a cache miss.
+    """
+    now = time.time()
+    bases = [getattr(l.body, 'created', None) for l in leaders]
+    expirations = []
+
+    for sig in sigs:
+
+        if 3 < sig.body.version:
+
+            for e in sig.body.hashed_subpkts:
+
+                if e.type in [SIGSUB_EXPIRES, SIGSUB_KEYEXPIRES]:
+
+                    for base in bases + [sig.body.created]:
+
+                        if base and now <= base + e.value:
+                            expirations.append(base + e.value)
+
+    if expirations:
+        return min(expirations)
+
+    return None
+
+def _block_digest(block):
+    return HASH.new(HASH_SHA1, ''.join([p.rawstr() for p in block.seq()])).digest()
+
+def _create_sessions(**kw):
+    """Create session key packets for encryption.
+
+    :Keywords:
+        - `passphrase`: *optional* symmetric encryption passphrase
+        - `keys`: *optional* list of tuples (``key``, [``keyids``]) to encrypt
+          to (see `encrypt_msg()`)
+
+    :Returns: tuple (list of session key packets, string session key, integer
+        symmetric algorithm, integer compression algorithm)
+
+    The list of session packets will be empty if no valid targets were found.
+    """
+    saplog = logging.getLogger('saplog')
+    passphrase = kw.get('passphrase', '')
+    keytargets = kw.get('keys')
+    pkts = []
+    enckey = None
+    # default MUSTs 12.1 says SYM_DES3 is an implied preference
+    alg_sym, alg_hash, alg_comp = SYM_DES3, HASH_SHA1, COMP_UNCOMPRESSED
+    
+    if 'passphrase' in kw: # set symmetric if 'passphrase' keyword exists at all
+        sespkt = CRYPT.encrypt_symmetric_session(alg_sym)
+        enckey = CRYPT.string2key(sespkt.body.s2k, alg_sym, passphrase)
+        pkts.append(sespkt)
+
+    elif keytargets: # set public session keys
+        preferred = find_key_prefs([p[0] for p in keytargets])
+
+        if preferred['sym']:
+            alg_sym = preferred['sym'][0]
+
+        if preferred['hash']:
+            alg_hash = preferred['hash'][0]
+
+        if preferred['comp']:
+            alg_comp = preferred['comp'][0]
+
+        enckey = CRYPT.gen_random(CRYPT._keysize(alg_sym))
+
+        for keymsg, targets in keytargets:
+
+            for target in targets:
+
+                if verify_block(keymsg, 'key', target):
+                    keypkt = keymsg.get_keypkt(target)
+                    sespkt = CRYPT.encrypt_public_session(keypkt, enckey, alg_sym)
+                    pkts.append(sespkt)
+
+                else:
+                    saplog.warn("Skipping unbound Encryption key %s::%s." % (keymsg.primary_id, target))
+
+    return pkts, enckey, alg_sym, alg_comp
+
+def _find_encryption_keys(keystring, use_key, use_userid, symmetric):
+    """Find encryption targets for the string-like encryption functions.
+
+    :Parameters:
+        - `keystring`: native OpenPGP or ASCII-armored string containing
+          public keys, or a `Keyring`
+        - `use_key`: [(primary, keyid), ..] specific encryption key(s)
+        - `use_userid`: [(primary, userid), ..] encryption key(s) by user
+          ID(s)
+        - `symmetric`: boolean, True if a passphrase will be used instead
+
+    :Returns: list of tuples (``key``, [``keyids``]) (see `encrypt_msg()`)
+    """
+    opts = {}
+
+    if use_key:
+        opts['keyids'] = use_key
+
+    elif use_userid:
+        opts['userids'] = use_userid
+
+    elif not symmetric:
+        raise PGPError("Please specify encryption key by user ID, key ID or fingerprint.")
+
+    return _find_keys(keystring, action='encrypt', **opts)
+
 def _filter_msgs(msgs, msgtypes):
     f = lambda i: hasattr(i, 'type') and i.type in msgtypes
     return filter(f, msgs)
 
+def _list_keys(keys, keyids=None):
+    """List key messages for the string-like functions.
+
+    :Parameters:
+        - `keys`: native OpenPGP or ASCII-armored string containing keys, or
+          a `Keyring`
+        - `keyids`: optional list of key IDs or fingerprints that are needed,
+          only key messages containing them are loaded from a `Keyring`
+          (strings are always parsed whole)
+
+    :Returns: list of key message instances
+    """
+    if isinstance(keys, Keyring):
+
+        if keyids is None:
+            return keys.list_keys()
+
+        return keys.list_keys([k for k in keyids if k])
+
+    return _filter_msgs(list_as_signed(keys), MSG_KEYS)
+
+def _find_keys(keys, **kw):
+    """Find keys in a string or `Keyring` (see `list.find_keys()`).
+    """
+    if isinstance(keys, Keyring):
+        return keys.find_keys(**kw)
+
+    return find_keys(_list_keys(keys), **kw)
+
 ## Consider more ifs/thens to avoid setting redundant 'data' & 'armored_type'.
 ## if it outputs a list, it should handle a list in, to support
 ##   dicts = sap_out(decrypt_str(x,y,z))
@@ -10,11 +10,15 @@ ASCII-armored block of data.
 - Armored instances *do not* regard the encoded message data's validity as
   OpenPGP data (consequently, they will not reconcile the encoded message
   data with the "type" declared in the block title).
+
+`ArmorDecoder` and `ArmorWriter` do the same a chunk at a time, for armored
+data that shouldn't be held in memory all at once.
 """
 import os
 import base64
 
 import util.strnum as STN
+import hashes as HASH
 
 from openpgp.code import *
 from openpgp.sap.exceptions import *
@@ -110,15 +114,17 @@ class Armored:
         raise NotImplementedError
         headers = '  '.join(self._headers) # _headers should be a list!
 
-# crc24() ruthlessly copied from pgpmsg.py:
+# The bit-by-bit CRC-24 (rfc2440 6.1) was ruthlessly copied from pgpmsg.py:
 # Copyright (C) 2003  Jens B. Jorgensen <jbj1@ultraemail.net>
-def crc24(s):
-    crc24_init = 0xb704ce
+#
+# It's used here to build a table of the CRC of each octet value, so the
+# checksum can be computed an octet (rather than a bit) at a time.
+def _crc24_table():
     crc24_poly = 0x1864cfb
-    crc = crc24_init
+    table = []
 
-    for i in list(s):
-        crc = crc ^ (ord(i) << 16)
+    for i in range(256):
+        crc = i << 16
 
         for j in range(0, 8):
             crc = crc << 1
@@ -126,7 +132,176 @@ def crc24(s):
             if crc & 0x1000000:
                 crc = crc ^ crc24_poly
 
-    return crc & 0xffffff
+        table.append(crc & 0xffffff)
+
+    return table
+
+_crc24_table = _crc24_table()
+
+def crc24(s, crc=0xb704ce):
+    """Calculate the CRC-24 checksum used in ASCII armor.
+
+    :Parameters:
+        - `s`: string of data to checksum
+        - `crc`: integer previous result, to checksum data a piece at a time
+
+    :Returns: integer checksum
+    """
+    table = _crc24_table
+
+    for i in bytearray(s):
+        crc = ((crc << 8) & 0xffffff) ^ table[(crc >> 16) ^ i]
+
+    return crc
+
+class CRC24:
+    """Incremental CRC-24 checksum (see `crc24()`).
+
+    :IVariables:
+        - `crc`: integer checksum of the data so far
+    """
+    def __init__(self, d=''):
+        self.crc = crc24(d)
+
+    def update(self, d):
+        """Add data to the checksum.
+
+        :Parameters:
+            - `d`: string of data
+        """
+        self.crc = crc24(d, self.crc)
+
+    def digest(self):
+        """Return the 3 octet checksum string used in armor.
+        """
+        return STN.prepad(3, STN.int2str(self.crc))
+
+class ArmorDecoder:
+    """Decode ASCII-armored text incrementally.
+
+    :IVariables:
+        - `title`: string, apparent ASCII-armored message type of the last
+          block found (None until a block is found)
+        - `headerlines`: list of strings, header lines of the last block
+        - `chksum`: integer checksum received for the last block (None if
+          the block didn't have one)
+
+    Text is passed to `feed()` in chunks of any size (they don't need to
+    break on lines) and the data decoded so far is returned, so neither the
+    whole text nor the whole of the data has to be held at once. Only a
+    partial line and a few base64 characters are kept between calls.
+
+    Each block's checksum is checked as its end is reached. Data from
+    consecutive blocks is returned as a single string of data, and the
+    cleartext part of a clearsigned message is skipped (only its signature is
+    decoded), the same as `list_pkts()` does with `list_armored()`.
+    """
+    def __init__(self):
+        self.title = None
+        self.headerlines = []
+        self.chksum = None
+        self._state = 'outside'
+        self._line = '' # partial line
+        self._b64 = [] # base64 characters not decoded yet
+        self._crc = CRC24()
+
+    def feed(self, d):
+        """Decode a chunk of ASCII-armored text.
+
+        :Parameters:
+            - `d`: string of armored text
+
+        :Returns: string of data decoded so far (possibly empty)
+
+        :Exceptions:
+            - `PGPFormatError`: a checksum did not match its data
+        """
+        lines = (self._line + d).split('\n')
+        self._line = lines.pop()
+        out = []
+
+        for line in lines:
+            self._chew(line.strip(), out)
+
+        if 'data' == self._state and self._b64: # leave an incomplete quad
+            b64 = ''.join(self._b64)
+            cut = len(b64) - (len(b64) % 4)
+            self._b64 = [b64[cut:]]
+            self._decode(b64[:cut], out)
+
+        return ''.join(out)
+
+    def close(self):
+        """Finish decoding.
+
+        :Returns: string of any remaining data
+
+        :Exceptions:
+            - `PGPFormatError`: the text ended in the middle of a block
+        """
+        out = []
+
+        if self._line:
+            self._chew(self._line.strip(), out)
+            self._line = ''
+
+        if 'outside' != self._state:
+            raise PGPFormatError("Armored block (%s) ended early." % self.title)
+
+        return ''.join(out)
+
+    def _chew(self, line, out):
+        state = self._state
+
+        if 'data' == state:
+
+            if line.startswith('='): # base64 lines never start with pad
+                self._decode(''.join(self._b64), out)
+                self.chksum = STN.str2int(base64.decodestring(line[1:5]))
+                self._state = 'trailer'
+
+            elif line.startswith('-----END PGP'): # checksum is optional
+                self._decode(''.join(self._b64), out)
+                self._end()
+
+            else:
+                self._b64.append(line)
+
+        elif 'outside' == state:
+
+            if line in armor_header_lines and \
+               '-----BEGIN PGP SIGNED MESSAGE-----' != line:
+                # 15 ~ index after '-----BEGIN PGP '
+                self.title = line[15:].rstrip('-----')
+                self.headerlines = []
+                self.chksum = None
+                self._state = 'headers'
+
+        elif 'headers' == state:
+
+            if line:
+                self.headerlines.append(line)
+            else:
+                self._state = 'data'
+
+        elif line.startswith('-----END PGP'): # trailer, ignore anything else
+            self._end()
+
+    def _decode(self, b64, out):
+        self._b64 = []
+
+        if b64:
+            d = base64.decodestring(b64)
+            self._crc.update(d)
+            out.append(d)
+
+    def _end(self):
+        dsum = self._crc.crc
+        self._crc = CRC24()
+        self._state = 'outside'
+
+        if self.chksum is not None and dsum != self.chksum:
+            raise PGPFormatError("Data did not match chksum. Received chksum->(%s), Calculated chksum->(%s))" % (self.chksum, dsum))
 
 def list_armored(d):
     """Find ASCII-armored data in a string.
@@ -254,11 +429,7 @@ def apply_armor(target):
                     if alg_hash != text_sig.body.alg_hash:
                         raise PGPFormatError("Clearsigs require the same hash for each signature. 1st sig hash->(%s) conflicts with a following sig->(%s)" % (alg_hash, text_sig.body.alg_hash))
 
-                if HASH_SHA1 == alg_hash:
-                    hash_header = "Hash: SHA1"
-
-                elif HASH_MD5 == alg_hash:
-                    hash_header = "Hash: MD5"
+                hash_header = "Hash: %s" % HASH.armor_name(alg_hash)
 
                 header_line = os.linesep.join(["-----BEGIN PGP SIGNED MESSAGE-----", hash_header])
                 footer_line = os.linesep.join(sig_d_list)
@@ -296,8 +467,65 @@ def apply_armor(target):
             checksumline = ''
     else:
         armored_d = base64.encodestring(data)
-        checksumline = '=' + base64.encodestring(STN.int2str(crc24(data))) + os.linesep
+        checksumline = '=' + base64.encodestring(CRC24(data).digest()) + os.linesep
 
     _d = header_line + (os.linesep * 2) + armored_d + checksumline + footer_line + os.linesep
 
     return _d
+
+
+class ArmorWriter:
+    """Write an ASCII-armored block incrementally.
+
+    :IVariables:
+        - `header_line`: string armor header line
+        - `footer_line`: string armor footer line
+
+    Data written is encoded a line at a time, so only a partial line is held
+    between calls to `write()`. The output is the same as `apply_armor()`
+    would produce for the whole string. `close()` writes the checksum and
+    footer, but does not close the underlying file.
+    """
+    line_size = 57 # octets per base64.encodestring() line (76 characters)
+
+    def __init__(self, f, header_line="-----BEGIN PGP MESSAGE-----",
+                 footer_line="-----END PGP MESSAGE-----"):
+        """Initialize an armor writer.
+
+        :Parameters:
+            - `f`: file-like object with a ``write()`` method
+            - `header_line`: string armor header line
+            - `footer_line`: string armor footer line
+        """
+        self._f = f
+        self.header_line = header_line
+        self.footer_line = footer_line
+        self._crc = CRC24()
+        self._pending = ''
+        f.write(header_line + (os.linesep * 2))
+
+    def write(self, d):
+        """Armor and write a string.
+
+        :Parameters:
+            - `d`: string of data to armor
+        """
+        self._crc.update(d)
+        d = self._pending + d
+        cut = len(d) - (len(d) % self.line_size)
+        self._pending = d[cut:]
+
+        if cut:
+            self._f.write(base64.encodestring(d[:cut]))
+
+    def close(self):
+        """Write any remaining data, the checksum and the footer.
+        """
+        chksum_d = self._crc.digest()
+
+        if self._pending:
+            self._f.write(base64.encodestring(self._pending))
+            self._pending = ''
+
+        self._f.write('=' + base64.encodestring(chksum_d) + os.linesep)
+        self._f.write(self.footer_line + os.linesep)
@@ -43,6 +43,7 @@ sap --armor --sign                                           \\
 
 import os
 import sys
+import types
 import logging
 import optparse
 import getpass
@@ -51,6 +52,7 @@ from openpgp.code import *
 from api import sign_str, verify_str, encrypt_str, decrypt_str
 from armory import looks_armored, list_armored, apply_armor
 from list import list_pkts
+from stream import iter_pkts
 from util.tool import slice_pkt_str, cat_pkt_str
 
 sep = os.sep
@@ -147,6 +149,9 @@ class SapCmd:
         output.add_option("--deliteral",
                           action="store_true",
                           help="automatically stringify literal data output")
+        output.add_option("--headers-only",
+                          action="store_true",
+                          help="only show packet headers (with --show-packets)")
         self.cmdopt.add_option_group(output)
         # shared parameters
         params = optparse.OptionGroup(self.cmdopt, "parameters")
@@ -246,7 +251,15 @@ class SapCmd:
         for f in self.run_order:
             f()
 
-        print(self.output) # new convention meaning "I really want it printed"
+        if isinstance(self.output, types.GeneratorType): # see cmd_show_pkts()
+
+            for chunk in self.output:
+                sys.stdout.write(chunk)
+
+            print
+
+        else:
+            print(self.output) # new convention meaning "I really want it printed"
 
     def run_prompt(self):
         # use --prompt to fill opts.passphrase
@@ -297,20 +310,31 @@ def cmd_show_pkts(opts=None, args=None):
 
     The output is just eye candy, subject to change without notice.
 
+    Options
+    -------
+    - '--headers-only': only show packet headers, don't decode packet bodies
+
     ARGS: files containing packets to show
+
+    Files are read a packet at a time, and the output is returned as an
+    iterable of strings to be written as it comes.
     """
-    from openpgp.sap.util.tool import show_pkts
+    from openpgp.sap.util.tool import show_pkt
 
-    p = []
+    lazy = getattr(opts, 'headers_only', False)
+
+    for i, filename in enumerate(args):
+
+        if i:
+            yield linesep
 
-    for filename in args:
         f = file(filename, 'rb')
-        s = f.read()
-        f.close()
 
-        p.append(show_pkts(s))
+        for pkt in iter_pkts(f, lazy=lazy):
+            yield show_pkt(pkt, lazy) + linesep
 
-    return linesep.join(p)
+        f.close()
+        yield "Pau."
 
 def cmd_show_msgs(opts=None, args=None):
     """Show message information.
@@ -577,10 +601,11 @@ def cmd_slice_message(opts=None, args=None):
 
     ARGS: file to slice packets (or message) from (only the first file is used)
     """
-    msg_d = _cat_files([args[0]])
+    f = file(args[0], 'rb')
     slice_d = opts.slice_message
 
-    pkts = slice_pkt_str(msg_d, slice_d)
+    pkts = slice_pkt_str(iter_pkts(f), slice_d)
+    f.close()
 
     if getattr(opts, 'armor', False):
         s = apply_armor(pkts)
@@ -598,20 +623,31 @@ def cmd_cat_packets(opts=None, args=None):
     - '--armor': armor the output
 
     ARGS: files containing packets to concatenate
+
+    Without --armor, files are read a packet at a time, and the output is
+    returned as an iterable of strings to be written as it comes.
     """
-    p = []
+    if getattr(opts, 'armor', None):
+        p = []
 
-    for filename in args:
+        for filename in args:
+            f = file(filename, 'rb')
+            p.append(f.read())
+            f.close()
+
+        return cat_pkt_str(p, armor=True)
+
+    return _iter_rawstr(args)
+
+def _iter_rawstr(fnames):
+    "Iterate over the raw packet strings in a list of files."
+    for filename in fnames:
         f = file(filename, 'rb')
-        p.append(f.read())
-        f.close()
-   
-    if getattr(opts, 'armor', None):
-        armor = True
-    else:
-        armor = False
 
-    return cat_pkt_str(p, armor=armor)
+        for pkt in iter_pkts(f, lazy=True):
+            yield pkt.rawstr()
+
+        f.close()
 
 def _cat_files(fnames):
     sep = ''
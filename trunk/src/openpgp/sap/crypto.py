@@ -2,12 +2,11 @@
 
 CFB
 ---
-`crypt_CFB()` takes care of both encryption and decryption for all symmetric
-algorithms. Unfortunately, this function is a hand-made CFB machine which
-actually uses PyCrypto's ECB modes over and over again. This is because I
-didn't get PyCrypto's ``MODE_PGP`` (or ``MODE_CFB``) to do what I wanted.
-Another try is definitely warranted, but for now `crypt_CFB()` works so I'm
-sticking with it.
+`CFB` takes care of both encryption and decryption for all symmetric
+algorithms (`crypt_CFB()` and `crypt_CFB_str()` are stream and string
+wrappers). It is still a hand-made CFB machine on top of PyCrypto's ECB mode
+since PyCrypto's ``MODE_PGP`` (or ``MODE_CFB``) didn't do what I wanted, but it
+works a block (or a buffer of blocks) at a time instead of a byte at a time.
 
 Pseudo-random number generation 
 -------------------------------
@@ -33,46 +32,145 @@ ElGamal "k" Values
 store a hash of the ``k`` value used, which will mean opening this function up.
 For now, ``k`` is just forced to be a 128-bit prime.
 
-
-:todo: There's a lot of StringIO silliness here, which was short-lived attempt
-    at doing incremental read/writes which is being taken over in 'snap'. The
-    silliness should be removed.
+Verification cache
+------------------
+`verify()` remembers its outcomes in `verify_cache`, keyed by the raw
+signature packet, the signer's fingerprint and the hash of the signed
+context. The same signature checked against the same key and data is only
+checked once (the context still has to be hashed, but the public key math is
+skipped). Set ``verify_cache.maxsize`` or call ``verify_cache.clear()`` to
+bound or drop it.
+
+String-to-key cache
+-------------------
+Iterated S2Ks are meant to be slow. Nothing is kept by default, but setting
+``s2k_lifetime`` to some number of seconds has `string2key()` keep the keys
+it derives in `s2k_cache` for that long, so a key that is unlocked over and
+over only runs its S2K once in a while. Entries are keyed by the S2K
+parameters and an HMAC-SHA256 of the passphrase under a secret picked at
+random for the process, never the passphrase or a plain digest of it. Call
+``s2k_cache.clear()`` to drop them. `api.KeySession` unlocks its keys once
+and doesn't need the cache.
+
+Signature hashing
+-----------------
+`hash_context()` feeds the signed data straight to the hash object. Data that
+doesn't come in one piece (files, streams) can be hashed as it's read and the
+hash object handed to `sign()` or `verify()` as the ``hasher`` keyword, text
+can be canonicalized on the way with a `TextCanonicalizer`.
 """
 
-import sha
-import md5
+import os
+import hmac
+import time
+import struct
+import hashlib
 
-from StringIO import StringIO
+from binascii import hexlify, unhexlify
 
 import Crypto.Util.number as NUM
 
 from openpgp.code import *
 
 import openpgp.sap.util.strnum as STN
+import openpgp.sap.hashes as HASH
 
 from openpgp.sap.exceptions import *
 from openpgp.sap.pkt import MPI
 from openpgp.sap.pkt.Packet import create_Packet
 from openpgp.sap.pkt.Signature import create_SignatureBody
 from openpgp.sap.pkt.MPI import create_MPI
+from openpgp.sap.util.misc import LRUCache
+
+verify_cache = LRUCache(4096) # (sig, signer fingerprint, hash): outcome
+s2k_cache = LRUCache(64) # (S2K params, key size, passphrase HMAC): key
+s2k_lifetime = 0 # seconds a derived key is kept, 0 (default) to keep none
+_s2k_secret = os.urandom(32) # HMAC key for the passphrases in s2k_cache
+
+_S2K_CHUNK = 65536 # octets of salted passphrase hashed at a time
+
+class TextCanonicalizer:
+    """Canonical text for ``SIG_TEXT`` signatures, a chunk at a time.
+
+    Line endings become '\\r\\n' and whitespace at the very beginning and
+    end of the text is dropped, the same as::
+
+        d.replace('\\r\\n', '\\n').replace('\\n', '\\r\\n').strip()
+
+    Trailing whitespace in a chunk is held back until the next chunk shows
+    whether or not it's the end of the text, so only runs of whitespace are
+    ever kept in memory.
+    """
+    def __init__(self):
+        self._started = False # leading whitespace is gone
+        self._held = '' # whitespace that might be trailing
+
+    def update(self, d):
+        """Canonicalize a chunk of text.
+
+        :Parameters:
+            - `d`: string of text
+
+        :Returns: string of canonical text (possibly empty)
+        """
+        d = self._held + d
+
+        if not self._started:
+            d = d.lstrip()
+
+            if not d:
+                return ''
+
+            self._started = True
+
+        body = d.rstrip()
+        self._held = d[len(body):]
+
+        return body.replace('\r\n', '\n').replace('\n', '\r\n')
+
+    def final(self):
+        """Finish the text.
+
+        :Returns: string of canonical text (always empty, whatever was held
+            back was trailing whitespace)
+        """
+        self._held = ''
+        return ''
 
 # TODO unhashed_subpkts should include SIGSUB_SIGNERID?
 # TODO hashed_subpkts should include SIGSUB_CREATED?
 # TODO turn lazy int2str()[0] into if/else checks?
-def hash_context(version, hashalg, sigtype, sigcontext, target, primary):
+def hash_context(version, hashalg, sigtype, sigcontext, target, primary, hasher=None):
     """Perform the signature hash.
 
     :Parameters:
         - `version`: int signature version
         - `hashalg`: int hash code
         - `sigtype`: int signature type
-        - `sigcontext`: read()-able instance
+        - `sigcontext`: string signature context (what the signature itself
+          contributes to the hash) or read()-able instance
         - `target`: "appropriate" target (packet, message, etc..)
         - `primary`: primary key packet
+        - `hasher`: optional hash object (see `hashes`) that has already been
+          fed the signed data of a ``SIG_BINARY`` or ``SIG_TEXT`` signature
+          (canonicalized for text, see `TextCanonicalizer`), `target` is
+          ignored
 
     :Returns: string message hash
+
+    Everything is fed to the hash as it comes, signed data isn't gathered
+    into one string first.
     """
-    context = StringIO()
+    if hasattr(sigcontext, 'read'):
+        sigcontext = sigcontext.read()
+
+    if hasher and sigtype in [SIG_BINARY, SIG_TEXT]:
+        md = hasher.copy() # leave the original alone
+        md.update(sigcontext)
+        return md.digest()
+
+    md = HASH.new(hashalg)
+    update = md.update
 
     if primary:
         # verify secret key bindings w/ only public portion of the key
@@ -86,28 +184,36 @@ def hash_context(version, hashalg, sigtype, sigcontext, target, primary):
     if sigtype in [SIG_BINARY, SIG_TEXT]:
 
         if hasattr(target, 'literals'): # literal message exception
-            data = ''.join([x.body.data for x in target.literals])
+            chunks = [x.body.data for x in target.literals]
         elif target:
             try: # ..to use the data that comprises the message
-                data = target.rawstr()
+                chunks = [target.rawstr()]
             except AttributeError:
-                data = str(target)
+                chunks = [str(target)]
         else:
             raise NotImplementedError("Invalid signature target.")
 
         if SIG_TEXT == sigtype: # normalize, canonicalize, and strip
-            data = data.replace('\r\n', '\n').replace('\n', '\r\n').strip()
+            canon = TextCanonicalizer()
+
+            for chunk in chunks:
+                update(canon.update(chunk))
+
+            update(canon.final())
 
-        context.write(data)
+        else:
+
+            for chunk in chunks:
+                update(chunk)
 
     ## user ID sigs ..woulda thought cert revocs were on sig pkts
     elif sigtype in [SIG_GENERIC, SIG_PERSONA, SIG_CASUAL, SIG_POSITIVE,
                      SIG_CERTREVOC]:
 
         userpkt = target # user ID or user attribute packet
-        context.write('\x99')
-        context.write(primary_body_d_len)                       # bind primary
-        context.write(primary_body_d)                           # len & str
+        update('\x99')
+        update(primary_body_d_len)                              # bind primary
+        update(primary_body_d)                                  # len & str
 
         if version in [2, 3]:
             pass
@@ -115,17 +221,17 @@ def hash_context(version, hashalg, sigtype, sigcontext, target, primary):
         elif 4 == version:
 
             if PKT_USERID == userpkt.tag.type:                  # header
-                context.write('\xb4')
+                update('\xb4')
             elif PKT_USERATTR == userpkt.tag.type:
-                context.write('\xd1')
+                update('\xd1')
             elif PKT_SIGNATURE == userpkt.tag.type:
                 raise NotImplementedError("Signature revocation(?) in a quandry.")
             else:
                 raise NotImplementedError("Certifications only for user ID/attribute?")
 
-            context.write(STN.int2quadoct(userpkt.length.size)) # length
+            update(STN.int2quadoct(userpkt.length.size))        # length
 
-        context.write(userpkt.body._d)                          # data
+        update(userpkt.body._d)                                 # data
 
     ## key packet sigs
     elif sigtype in [SIG_SUBKEYBIND, SIG_SUBKEYREVOC, SIG_DIRECT]:
@@ -133,9 +239,9 @@ def hash_context(version, hashalg, sigtype, sigcontext, target, primary):
         keypkt = target # target key pkt, primary or otherwise
 
         if primary and primary != keypkt: # explicit primary (prevent doubles)
-            context.write('\x99')
-            context.write(primary_body_d_len)
-            context.write(primary_body_d)
+            update('\x99')
+            update(primary_body_d_len)
+            update(primary_body_d)
 
         # verify secret key bindings with only public portion of the key
         if keypkt.tag.type in [PKT_PRIVATEKEY, PKT_PRIVATESUBKEY]:
@@ -143,12 +249,12 @@ def hash_context(version, hashalg, sigtype, sigcontext, target, primary):
         else:
             keypkt_body_d = keypkt.body._d
 
-        context.write('\x99')
-        context.write(STN.int2quadoct(len(keypkt_body_d))[-2:])
-        context.write(keypkt_body_d)
+        update('\x99')
+        update(STN.int2quadoct(len(keypkt_body_d))[-2:])
+        update(keypkt_body_d)
 
     elif SIG_KEYREVOC == sigtype:
-        context.write(target.rawstr()) # the key (packet) being revoked
+        update(target.rawstr()) # the key (packet) being revoked
 
     ## weird sigs
     elif SIG_STANDALONE == sigtype:
@@ -160,22 +266,9 @@ def hash_context(version, hashalg, sigtype, sigcontext, target, primary):
     else:
         raise NotImplementedError, "Signature type->(%s) is not supported" % sigtype
 
-    context.write(sigcontext.read())
-    context.seek(0)
-
-    try:
-        if hashalg == HASH_MD5:
-            import md5
-            hashed_target = md5.new(context.read()).digest()
-        elif hashalg == HASH_SHA1:
-            import sha
-            hashed_target = sha.new(context.read()).digest()
-        else:
-            raise NotImplementedError, "Unsupported signature hash algorithm->(%s)" % sig.alg_hash
-    finally:
-        context.close()
+    update(sigcontext)
 
-    return hashed_target
+    return md.digest()
 
 # see gnupg/g10/seskey.c:do_encode_md() and GnuPG Notes below
 def pad_rsa(alg_hash, hashed_msg, rsa_n_bit_length):
@@ -188,13 +281,7 @@ def pad_rsa(alg_hash, hashed_msg, rsa_n_bit_length):
     
     :Returns: string hashed data padded according to rfc2440 5.2.2.
     """
-    # "full hash prefixes"
-    if HASH_MD5 == alg_hash:
-        prefix = '\x30\x20\x30\x0C\x06\x08\x2A\x86\x48\x86\xF7\x0D\x02\x05\x05\x00\x04\x10'
-    elif HASH_SHA1 == alg_hash:
-        prefix = '\x30\x21\x30\x09\x06\x05\x2b\x0E\x03\x02\x1A\x05\x00\x04\x14'
-    else:
-        raise NotImplementedError, "Prefix unassigned for RSA signature hash->(%s)" % sig.alg_hash
+    prefix = HASH.asn1_prefix(alg_hash) # "full hash prefix"
     padlen = ((rsa_n_bit_length + 7)/8) - len(prefix) - len(hashed_msg) - 3
     padding = ''.join(['\xff' for x in range(padlen)])
     return ''.join(['\x00\x01', padding, '\x00', prefix, hashed_msg])
@@ -225,6 +312,9 @@ def sign(sigtype, target, signer, *args, **kwords):
           signatures only**
         - `keyid`: string ID of signing key, **v3 signatures only**
         - `hashalg`: integer hash algorithm constant
+        - `hasher`: hash object (`hashalg`) that has already been fed the
+          signed data, **SIG_BINARY & SIG_TEXT only** - use this to sign data
+          that was hashed incrementally, `target` is ignored
 
     :Returns: signature packet instance
 
@@ -276,8 +366,8 @@ def sign(sigtype, target, signer, *args, **kwords):
 
 
     int2str = STN.int2str
-    ctx = StringIO() # signature context to hash
-    ctx_write = ctx.write
+    ctx = [] # signature context to hash
+    ctx_write = ctx.append
 
     if 3 == version:                                     ################### v3
         ctx_write(int2str(sigtype)[0])                   # signature type
@@ -291,16 +381,15 @@ def sign(sigtype, target, signer, *args, **kwords):
         subhash = ''.join([x._d for x in hashed_subpkts])
         ctx_write(STN.prepad(2, int2str(len(subhash))))  # hashed len
         ctx_write(subhash)                               # hashed subpkts
-        ctx_len = ctx.tell()
+        ctx_len = len(''.join(ctx))
         ctx_write('\x04\xff')                            # start trailer
         ctx_write(STN.int2quadoct(ctx_len)[-4:])         # hashed data length
     
     else:
         raise NotImplementedError("Signature version->(%s) is not supported." % version)
 
-    ctx.seek(0)
-    ctx_hash = hash_context(version, hashalg, sigtype, ctx, target, primary)
-    ctx.close()
+    ctx_hash = hash_context(version, hashalg, sigtype, ''.join(ctx), target,
+                            primary, kwords.pop('hasher', None))
 
     if keyalg in [ASYM_RSA_S, ASYM_RSA_EOS]:
         ctx_hash = pad_rsa(hashalg, ctx_hash, signer.body.RSA_n.bit_length)
@@ -330,7 +419,8 @@ def sign_DSA(msg, key_tuple, k=None):
     """Create a DSA signature.
 
     :Parameters:
-        - `msg`: string of data signature applies to 
+        - `msg`: string of data signature applies to (a hash longer
+          than q is cut down to q's length)
         - `key_tuple`: tuple of DSA integers (y, g, p, q, x)
           (see `DSA tuple`_)
         - `k`: random integer 2 < k < q (automatically generated by
@@ -349,6 +439,7 @@ def sign_DSA(msg, key_tuple, k=None):
         - `x`: integer DSA secret value
     """
     import Crypto.PublicKey.DSA as DSA
+    msg = msg[:len(STN.int2str(key_tuple[3]))] # leftmost q bits of the hash
     if k is None: # generate our own k value (2 < k < q)
         import Crypto.Util.number as NUM
         import Crypto.Util.randpool as RND
@@ -423,11 +514,50 @@ def verify(signature, target, signer, *args, **kwords):
     :Keywords:
         - `primary`: `OpenPGP.packet.PublicKey.PublicKey` instance
           for signatures that use a primary key in the hash
+        - `hasher`: hash object that has already been fed the signed data,
+          **SIG_BINARY & SIG_TEXT only** (see `sign()`), `target` is ignored
+        - `outcomes`: optional dictionary of outcomes already worked out,
+          keyed like `verify_cache` (see `prepare_verify()`), looked at
+          before the cache
 
     :Returns: integer 1 (successful verification) or 0 (failure)
 
     :note: If the signing key is a primary key packet, the keyword `primary`
         does not need to be given.
+    :note: Outcomes are cached in `verify_cache` (see the module notes).
+    """
+    outcomes = kwords.pop('outcomes', None)
+    cache_key, task = prepare_verify(signature, target, signer, **kwords)
+
+    if outcomes and cache_key in outcomes:
+        return outcomes[cache_key]
+
+    verified = verify_cache.get(cache_key)
+
+    if verified is None:
+        verified = verify_task(task)
+        verify_cache.set(cache_key, verified)
+
+    return verified
+
+def prepare_verify(signature, target, signer, **kwords):
+    """Do everything `verify()` does, except the public key math.
+
+    :Parameters:
+        - `signature`: `OpenPGP.packet.Signature.Signature` instance
+          signature to verify
+        - `target`: signed material (see `sign()` for details)
+        - `signer`: verifying public key or public subkey packet instance
+
+    :Keywords:
+        - `primary`: see `verify()`
+        - `hasher`: see `verify()`
+
+    :Returns: tuple (``cache_key``, ``task``) - the `verify_cache` key and a
+        tuple for `verify_task()`
+
+    The signed context is hashed here. The task only holds strings and
+    integers, so it can be sent to another process.
     """
     primary = kwords.get('primary')
     version = signature.body.version
@@ -441,9 +571,9 @@ def verify(signature, target, signer, *args, **kwords):
     if not primary and signer.tag.type in [PKT_PUBLICKEY, PKT_PRIVATEKEY]:
         primary = signer
 
-    ctx = StringIO(signature.body.hashed_data)
-    ctx_hash = hash_context(version, hashalg, sigtype, ctx, target, primary)
-    ctx.close()
+    ctx_hash = hash_context(version, hashalg, sigtype,
+                            signature.body.hashed_data, target, primary,
+                            kwords.get('hasher'))
  
     if keyalg in [ASYM_RSA_EOS, ASYM_RSA_S, ASYM_ELGAMAL_EOS]: # not DSA
         ctx_hash = pad_rsa(hashalg, ctx_hash, signer.body.RSA_n.bit_length)
@@ -454,6 +584,7 @@ def verify(signature, target, signer, *args, **kwords):
     try: 
 
         if keyalg in [ASYM_RSA_S, ASYM_RSA_EOS]:
+            sigtup = sig.RSA.value
             keytup = key.RSA_n.value, key.RSA_e.value
 
         elif ASYM_ELGAMAL_EOS == keyalg:
@@ -464,11 +595,28 @@ def verify(signature, target, signer, *args, **kwords):
             sigtup = sig.DSA_r.value, sig.DSA_s.value
             keytup = key.DSA_y.value, key.DSA_g.value, key.DSA_p.value, key.DSA_q.value
 
+        else:
+            raise NotImplementedError, "Unsupported public key alg->(%s)." % keyalg
+
     except AttributeError: # if sig alg != key alg, MPI attributes don't match
         raise AttributeError("Possible key/sig alg mismatch: sig alg->(%s) key alg->(%s)" % (keyalg, signer.body.alg))
 
+    cache_key = (signature.rawstr(), signer.body.fingerprint, ctx_hash)
+
+    return cache_key, (keyalg, ctx_hash, sigtup, keytup)
+
+def verify_task(task):
+    """Do the public key math for a prepared verification.
+
+    :Parameters:
+        - `task`: tuple returned by `prepare_verify()`
+
+    :Returns: integer 1 (successful verification) or 0 (failure)
+    """
+    keyalg, ctx_hash, sigtup, keytup = task
+
     if keyalg in [ASYM_RSA_S, ASYM_RSA_EOS]:
-        return verify_RSA(ctx_hash, sig.RSA.value, keytup)
+        return verify_RSA(ctx_hash, sigtup, keytup)
 
     elif ASYM_ELGAMAL_EOS == keyalg:
         return verify_ElGamal(ctx_hash, sigtup, keytup)
@@ -476,14 +624,12 @@ def verify(signature, target, signer, *args, **kwords):
     elif ASYM_DSA == keyalg:
         return verify_DSA(ctx_hash, sigtup, keytup)
 
-    else:
-        raise NotImplementedError, "Unsupported public key alg->(%s)." % key.alg_pubkey
-
 def verify_DSA(msg, sig_tuple, key_tuple):
     """Verify a DSA signature.
 
     :Parameters:
-        - `msg`: string of data signature applies to 
+        - `msg`: string of data signature applies to (a hash longer
+          than q is cut down to q's length)
         - `sig_tuple`: tuple of DSA signature integers (r, s)
           (see `DSA signature tuple`_)
         - `key_tuple`: tuple of DSA key integers (y, g, p, q)
@@ -508,6 +654,7 @@ def verify_DSA(msg, sig_tuple, key_tuple):
             - `q`: integer DSA order
     """
     import Crypto.PublicKey.DSA as DSA
+    msg = msg[:len(STN.int2str(key_tuple[3]))] # leftmost q bits of the hash
     dsa = DSA.construct(key_tuple) # note change in ordering
     return dsa.verify(msg, sig_tuple)
 
@@ -671,21 +818,36 @@ def _keysize(algorithm):
     else:
         raise NotImplementedError, "Unsupported symmetric key algorithm->(%s). Using GnuPG DUMMY?" % algorithm
 
-# The CFB block-size shifts depend on PyCrypto's predefined block size
-# per cipher. This function should be swapped out asap.
-#def crypt_CFB(algorithm, key, instream, register, direction):
-def crypt_CFB(instream, outstream, algorithm, key, register, direction):
-    """'Crypt a string in cipher-feedback mode.
+def _xor_str(a, b):
+    """XOR two equal-length strings in one shot.
 
     :Parameters:
-        - `instream`: StringIO/file incoming
-        - `outstream`: StringIO/file outgoing
-        - `algorithm`: integer symmetric cipher constant
-        - `key`: string encryption/decryption key
-        - `register`: string initialization vector (IV) to feed register
-        - `direction`: string 'encrypt' or 'decrypt' setting CFB mode
+        - `a`: string
+        - `b`: string (same length as `a`)
 
-    :Returns: string ciphertext or cleartext
+    :Returns: string `a` XOR `b`
+
+    The strings are run through long integers via their hex representations,
+    which keeps the per-byte work down in C instead of a Python loop.
+    """
+    n = len(a)
+
+    if 0 == n:
+        return ''
+
+    x = long(hexlify(a), 16) ^ long(hexlify(b), 16)
+    return unhexlify('%0*x' % (2 * n, x))
+
+
+# block size -> struct used to XOR a whole block as 64-bit words
+_cfb_words = {8:struct.Struct('>Q'), 16:struct.Struct('>QQ')}
+
+class CFB:
+    """OpenPGP cipher-feedback machine.
+
+    :IVariables:
+        - `block_size`: integer cipher block size (CFB shift)
+        - `direction`: string 'encrypt' or 'decrypt'
 
     OpenPGP performs CFB shifts on blocks of characters the same size
     as the block used by the symmetric cipher - for example, CAST5
@@ -693,47 +855,261 @@ def crypt_CFB(instream, outstream, algorithm, key, register, direction):
     a time (the remaining cleartext bytes that do not completely fill
     an 8-byte block at the end of a message are XOR'ed with the
     "left-most" bytes of the encrypted mask).
+
+    Data is handled a block at a time, never a byte at a time. Since the
+    decryption masks only depend on ciphertext that is already available,
+    `update()` computes all decryption masks for a buffer with a single ECB
+    call and applies them with a single XOR. Encryption has to feed each
+    ciphertext block back into the register, so it walks the buffer block by
+    block.
+
+    Usage::
+
+        cfb = CFB(algorithm, key, iv, 'decrypt')
+        cleartext = cfb.update(chunk_1) + cfb.update(chunk_2) + cfb.final()
+
+    Incomplete trailing blocks are held over until more data arrives or
+    `final()` is called. After `final()` the instance should not be fed any
+    more data.
     """
-    ciphermod = _import_cipher(algorithm)
-    cipher = ciphermod.new(key, ciphermod.MODE_ECB)
-    encrypt = cipher.encrypt
-    shift = ciphermod.block_size # number of bytes to process (normally 8)
+    def __init__(self, algorithm, key, register=None, direction='decrypt'):
+        """Initialize a CFB machine.
 
-    # after tweaking, there's still not much difference in speed (~2% max)
-    int2str = STN.int2str
-    str2int = STN.str2int
-    apply_mask = lambda c,m: int2str(str2int(c) ^ str2int(m))
- 
-    if register is None:
-        register = STN.prepad(shift) # use an IV full of 0x00
+        :Parameters:
+            - `algorithm`: integer symmetric cipher constant
+            - `key`: string encryption/decryption key
+            - `register`: string initialization vector (IV) to feed
+              register (default None, an IV full of 0x00)
+            - `direction`: string 'encrypt' or 'decrypt' setting CFB mode
+        """
+        ciphermod = _import_cipher(algorithm)
+        self._encrypt = ciphermod.new(key, ciphermod.MODE_ECB).encrypt
+        self.block_size = bs = ciphermod.block_size
+
+        if register is None:
+            register = STN.prepad(bs) # use an IV full of 0x00
+
+        if bs > len(register):
+            raise PGPCryptoError, "CFB shift amount->(%s) can't be larger than the feedback register->(%s)." % (bs, len(register))
+
+        if direction not in ['encrypt', 'decrypt']:
+            raise PGPCryptoError("Unknown CFB direction->(%s)." % direction)
+
+        if bs not in _cfb_words:
+            raise NotImplementedError("Unsupported cipher block size->(%s)." % bs)
+
+        self.direction = direction
+        self._words = _cfb_words[bs]
+        self._register = register[:bs]
+        self._pending = ''
+
+    def update(self, d):
+        """Process a string, returning output for all complete blocks.
+
+        :Parameters:
+            - `d`: string cleartext (encrypt) or ciphertext (decrypt)
+
+        :Returns: string output for as many complete blocks as are
+            available (possibly an empty string)
+        """
+        if self._pending:
+            d = self._pending + d
+
+        bs = self.block_size
+        cut = len(d) - (len(d) % bs)
+        self._pending = d[cut:]
+
+        if cut:
+            return self._crypt(d[:cut])
+
+        return ''
+
+    def final(self):
+        """Process any incomplete trailing block.
+
+        :Returns: string output for the remaining (short) block
+        """
+        d, self._pending = self._pending, ''
+
+        if d:
+            return self._crypt(d)
+
+        return ''
+
+    def _crypt(self, d):
+        bs = self.block_size
+        encrypt = self._encrypt
+
+        if 'decrypt' == self.direction:
+            n = len(d)
+            tail = n % bs # only ever non-zero for the last block
+
+            if tail:
+                regs = self._register + d[:n - tail]
+            else:
+                regs = self._register + d[:n - bs]
+                self._register = d[n - bs:]
+
+            return _xor_str(d, encrypt(regs)[:n])
+
+        else: # each block depends on the last, no way around a loop
+            out = []
+            register = self._register
+            n = len(d)
+            whole = n - (n % bs)
+            words = self._words
+            unpack, pack = words.unpack, words.pack
+
+            if 8 == bs: # 64-bit blocks
+                for i in xrange(0, whole, bs):
+                    register = pack(unpack(d[i:i+bs])[0] ^ unpack(encrypt(register))[0])
+                    out.append(register)
+
+            else: # 128-bit blocks
+                for i in xrange(0, whole, bs):
+                    c = unpack(d[i:i+bs])
+                    m = unpack(encrypt(register))
+                    register = pack(c[0] ^ m[0], c[1] ^ m[1])
+                    out.append(register)
+
+            if whole < n: # short last block
+                register = _xor_str(d[whole:], encrypt(register)[:n - whole])
+                out.append(register)
+
+            self._register = register
+            return ''.join(out)
+
+
+def crypt_CFB_str(d, algorithm, key, register=None, direction='decrypt'):
+    """'Crypt a string in cipher-feedback mode.
+
+    :Parameters:
+        - `d`: string cleartext (encrypt) or ciphertext (decrypt)
+        - `algorithm`: integer symmetric cipher constant
+        - `key`: string encryption/decryption key
+        - `register`: string initialization vector (IV) to feed register
+        - `direction`: string 'encrypt' or 'decrypt' setting CFB mode
+
+    :Returns: string ciphertext or cleartext
+
+    See `CFB` for details.
+    """
+    cfb = CFB(algorithm, key, register, direction)
+    return cfb.update(d) + cfb.final()
+
+#def crypt_CFB(algorithm, key, instream, register, direction):
+def crypt_CFB(instream, outstream, algorithm, key, register, direction, bufsize=65536):
+    """'Crypt a stream in cipher-feedback mode.
+
+    :Parameters:
+        - `instream`: StringIO/file incoming
+        - `outstream`: StringIO/file outgoing
+        - `algorithm`: integer symmetric cipher constant
+        - `key`: string encryption/decryption key
+        - `register`: string initialization vector (IV) to feed register
+        - `direction`: string 'encrypt' or 'decrypt' setting CFB mode
+        - `bufsize`: integer number of bytes to read per pass (rounded
+          down to a multiple of the cipher block size)
+
+    :Returns: None, output is written to `outstream`
+
+    This is a file-like wrapper around `CFB`.
+    """
+    cfb = CFB(algorithm, key, register, direction)
+    bs = cfb.block_size
+    bufsize = max(bs, bufsize - (bufsize % bs))
 
-    if shift > len(register):
-        raise PGPCryptoError, "CFB shift amount->(%s) can't be larger than the feedback register->(%s)." % (shift, len(register))
-  
     while True:
-        inblock = instream.read(shift) # block size = shift size
-        chunk = StringIO()
+        inblock = instream.read(bufsize)
 
         if inblock:
-            mask = encrypt(register)
-            chunk.seek(0)
+            outstream.write(cfb.update(inblock))
+        else:
+            break
+
+    outstream.write(cfb.final())
+
+def decrypt_session(sespkt, passphrase='', keypkt=None, seckeys=None):
+    """Recover the symmetric algorithm and key from a session key packet.
+
+    :Parameters:
+        - `sespkt`: public key or symmetric key encrypted session key packet
+          (types 1 & 3)
+        - `passphrase`: string passphrase used to decrypt `keypkt` or to
+          build the symmetric key
+        - `keypkt`: secret key packet (required for public key encrypted
+          session keys)
+        - `seckeys`: optional tuple of `keypkt`'s secret key values, as
+          returned by `decrypt_secret_key()` (`keypkt` isn't decrypted again)
+
+    :Returns: tuple (integer symmetric algorithm, string session key)
+
+    :Exceptions:
+        - `PGPCryptoError`: session key decryption failed
+    """
+    ses = sespkt.body
+
+    if PKT_PUBKEYSESKEY == sespkt.tag.type:
+
+        if ses.keyid == keypkt.body.id:
+
+            if seckeys is None:
+
+                try:
+                    seckeys = decrypt_secret_key(keypkt, passphrase)
+
+                except PGPError: # catch MPI value error due to ..
+                    raise PGPCryptoError("Public key encrypted session key checksum failed.")
+
+            if keypkt.body.alg in [ASYM_RSA_E, ASYM_RSA_EOS]:
+                cipher_tuple = (ses.RSA_me_modn.value,)
+                key_tuple = (keypkt.body.RSA_n.value, seckeys[0])
+
+            elif keypkt.body.alg in [ASYM_ELGAMAL_E, ASYM_ELGAMAL_EOS]:
+                cipher_tuple = (ses.ELGAMAL_gk_modp.value, ses.ELGAMAL_myk_modp.value)
+                key_tuple = (keypkt.body.ELGAMAL_p.value, seckeys[0])
+
+            else:
+                raise NotImplementedError("Unsupported public encryption algorithm->(%s)." % keypkt.body.alg)
+
+        else: # shouldn't happen, programmer error
+            raise PGPCryptoError("The public encryption key did not match the session key target.")
 
-            for i, c in enumerate(inblock):
-                chunk.write(apply_mask(c, mask[i]))
+        # should be ready to decrypt session key with key tuple
+        padded_key = decrypt_public(ses.alg_pubkey, key_tuple, cipher_tuple)
 
-            chunk.truncate()
-            chunk.seek(0)
-            outblock = chunk.read()
+        if '\x02' == padded_key[0]: # handle EME-PKCS1-v1_5 encoding
+            idx = padded_key.find('\x00') # 0x00 used as padding separator
 
-            if 'encrypt' == direction:
-                register = outblock
-            elif 'decrypt' == direction:
-                register = inblock
+            if -1 != idx and 8 <= idx:
+                message = padded_key[idx+1:]
+                algorithm = STN.str2int(message[0]) # required for both..
+                chksum = STN.str2int(message[-2:])
+                key = message[1:len(message)-2] # ..symencdata and symencintdata
 
-            outstream.write(outblock)
+                if chksum != STN.checksum(key):
+                    raise PGPCryptoError("Public Key encrypted session key checksum failed.")
+
+            else:
+                raise PGPCryptoError("Misplaced \\x00 in session key padding, located at index->(%s)." % idx)
 
         else:
-            break
+            raise PGPCryptoError("Session key didn't start with \\x02, received->()." % hex(ord(padded_key[0])))
+
+    elif PKT_SYMKEYSESKEY == sespkt.tag.type: # using symmetric key session key
+        algorithm = ses.alg
+        key = string2key(ses.s2k, algorithm, passphrase)
+
+        if ses.has_key:
+            iv = STN.prepad(_import_cipher(algorithm).block_size)
+            padded_key = decrypt_symmetric(algorithm, key, ses._enc_d, iv)
+            algorithm = STN.str2int(padded_key[0])
+            key = padded_key[1:]
+
+    else:
+        raise NotImplementedError("Unrecognized session key type-(%s)." % sespkt.tag.type)
+
+    return algorithm, key
 
 # A common function could be used for MPI parsing, but then it would have to
 # maintain (non-existent) secure data handling as well.
@@ -741,7 +1117,7 @@ def crypt_CFB(instream, outstream, algorithm, key, register, direction):
 # preceding packets with undefined length. This is inextricably tied to the
 # SHA1 requirement of v1 integrity & MDC packets.
 # TODO We could use some condensing here.
-def decrypt(encpkt, passphrase='', sespkt=None, keypkt=None):
+def decrypt(encpkt, passphrase='', sespkt=None, keypkt=None, seckeys=None):
     """Decrypt messages in symmetrically encrypted packets (types 9 & 18).
 
     :Parameters:
@@ -750,6 +1126,8 @@ def decrypt(encpkt, passphrase='', sespkt=None, keypkt=None):
         - `passphrase`: string decryption passphrase (see below)
         - `sespkt`: optional session key packet
         - `keypkt`: optional public key packet
+        - `seckeys`: optional tuple of already decrypted secret key values
+          (see `decrypt_session()`)
 
     :Returns: string cleartext
 
@@ -771,68 +1149,10 @@ def decrypt(encpkt, passphrase='', sespkt=None, keypkt=None):
     layer to automate things like "if compressed, decompress" or "if
     signed, verify."
     """
-    result = key = algorithm = None # key & algo set to force integrity failure 
+    key = algorithm = None # key & algo set to force integrity failure 
 
     if sespkt:
-        ses = sespkt.body
-
-        if PKT_PUBKEYSESKEY == sespkt.tag.type:
-
-            if ses.keyid == keypkt.body.id:
-
-                try:
-                    seckeys = decrypt_secret_key(keypkt, passphrase)
-
-                except PGPError: # catch MPI value error due to ..
-                    raise PGPCryptoError("Public key encrypted session key checksum failed.")
-
-                if keypkt.body.alg in [ASYM_RSA_E, ASYM_RSA_EOS]:
-                    cipher_tuple = (ses.RSA_me_modn.value,)
-                    key_tuple = (keypkt.body.RSA_n.value, seckeys[0])
-
-                elif keypkt.body.alg in [ASYM_ELGAMAL_E, ASYM_ELGAMAL_EOS]:
-                    cipher_tuple = (ses.ELGAMAL_gk_modp.value, ses.ELGAMAL_myk_modp.value)
-                    key_tuple = (keypkt.body.ELGAMAL_p.value, seckeys[0])
-
-                else:
-                    raise NotImplementedError("Unsupported public encryption algorithm->(%s)." % keypkt.body.alg)
-
-            else: # shouldn't happen, programmer error
-                raise PGPCryptoError("The public encryption key did not match the session key target.")
-
-            # should be ready to decrypt session key with key tuple
-            padded_key = decrypt_public(ses.alg_pubkey, key_tuple, cipher_tuple)
-
-            if '\x02' == padded_key[0]: # handle EME-PKCS1-v1_5 encoding
-                idx = padded_key.find('\x00') # 0x00 used as padding separator
-
-                if -1 != idx and 8 <= idx:
-                    message = padded_key[idx+1:]
-                    algorithm = STN.str2int(message[0]) # required for both..
-                    chksum = STN.str2int(message[-2:])
-                    key = message[1:len(message)-2] # ..symencdata and symencintdata
-
-                    if chksum != STN.checksum(key):
-                        raise PGPCryptoError("Public Key encrypted session key checksum failed.")
-
-                else:
-                    raise PGPCryptoError("Misplaced \\x00 in session key padding, located at index->(%s)." % idx)
-
-            else:
-                raise PGPCryptoError("Session key didn't start with \\x02, received->()." % hex(ord(padded_key[0])))
-
-        elif PKT_SYMKEYSESKEY == sespkt.tag.type: # using symmetric key session key
-            algorithm = ses.alg
-            key = string2key(ses.s2k, algorithm, passphrase)
-
-            if ses.has_key:
-                iv = STN.prepad(_import_cipher(algorithm).block_size)
-                padded_key = decrypt_symmetric(algorithm, key, ciphertext, iv)
-                algorithm = padded_key[0]
-                key = padded_key[1:]
-
-        else:
-            raise NotImplementedError("Unrecognized session key type-(%s)." % sespkt.tag.type)
+        algorithm, key = decrypt_session(sespkt, passphrase, keypkt, seckeys)
 
     # 'algorithm' & 'key' should be set, it's time to decrypt the message
     if PKT_SYMENCINTDATA == encpkt.tag.type:
@@ -844,13 +1164,13 @@ def decrypt(encpkt, passphrase='', sespkt=None, keypkt=None):
         mdc_d = cleartext[-22:]
         mdc = mdc_d[-20:]
 
-        if mdc != sha.new(''.join([prefix, clearmsg_d, '\xd3\x14'])).digest():
+        if mdc != HASH.new(HASH_SHA1, ''.join([prefix, clearmsg_d, '\xd3\x14'])).digest():
             raise PGPCryptoError("Integrity hash check failed.")
 
     elif PKT_SYMENCDATA == encpkt.tag.type:
 
         if None == key == algorithm: # non-integrity allows default key & alg
-            key = md5.new(passphrase).digest
+            key = HASH.new(HASH_MD5, passphrase).digest()
             algorithm = SYM_IDEA
 
         clearmsg_d = decrypt_symmetric_resync(algorithm, key, encpkt.body.data)
@@ -959,7 +1279,7 @@ def decrypt_secret_key(keypkt, passphrase=''):
                     k = string2key(keypkt.body.s2k, alg, passphrase)
 
                 else:
-                    k = md5.new(passphrase).digest()
+                    k = HASH.new(HASH_MD5, passphrase).digest()
 
                 # extra work required since MPIs integers are encrypted w/out
                 # their lengths
@@ -991,9 +1311,9 @@ def decrypt_secret_key(keypkt, passphrase=''):
 
             if keypkt.body.alg in [ASYM_RSA_E, ASYM_RSA_EOS, ASYM_RSA_S]:
                 RSA_d, idx = MPI.strcalc_mpi(sec_d, 0)
-                RSA_p, idx = MPI.strcalc_mpi(sec_d[idx:], idx)
-                RSA_q, idx = MPI.strcalc_mpi(sec_d[idx:], idx)
-                RSA_u, idx = MPI.strcalc_mpi(sec_d[idx:], idx)
+                RSA_p, idx = MPI.strcalc_mpi(sec_d, idx)
+                RSA_q, idx = MPI.strcalc_mpi(sec_d, idx)
+                RSA_u, idx = MPI.strcalc_mpi(sec_d, idx)
                 key_tuple = (RSA_d.value, RSA_p.value, RSA_q.value, RSA_u.value)
 
             elif keypkt.body.alg in [ASYM_ELGAMAL_E, ASYM_ELGAMAL_EOS]:
@@ -1013,7 +1333,7 @@ def decrypt_secret_key(keypkt, passphrase=''):
         # check integrity
         if 254 == keypkt.body.s2k_usg:
 
-            if sec_d[idx:] != sha.new(sec_d[:idx]).digest():
+            if sec_d[idx:] != HASH.new(HASH_SHA1, sec_d[:idx]).digest():
                 raise PGPCryptoError("Integrity hash check failed.")
 
         elif 255 == keypkt.body.s2k_usg:
@@ -1046,18 +1366,7 @@ def decrypt_symmetric(algorithm, key, ciphertext, iv=None):
         - v4 SHA1 hash verification
         - checksum verification
     """
-    cipherstream = StringIO()
-    clearstream = StringIO()
-    
-    cipherstream.write(ciphertext) # thwart cStringIO read-only restriction
-    cipherstream.seek(0)
-    crypt_CFB(cipherstream, clearstream, algorithm, key, iv, 'decrypt')
-
-    clearstream.seek(0)
-
-    clrtxt = clearstream.read()
-
-    return clrtxt
+    return crypt_CFB_str(ciphertext, algorithm, key, iv, 'decrypt')
 
 def decrypt_symmetric_resync(algorithm, key, ciphertext):
     """Decrypt symmetrically encrypted data and "re-sync" after prefix.
@@ -1084,23 +1393,10 @@ def decrypt_symmetric_resync(algorithm, key, ciphertext):
     ciphermod = _import_cipher(algorithm)
     bs = ciphermod.block_size
 
-    clearprefix, cipherprefix = StringIO(), StringIO()
-    cipherprefix.write(ciphertext[:bs+2])
-    cipherprefix.seek(0)
-    crypt_CFB(cipherprefix, clearprefix, algorithm, key, None, 'decrypt')
-
-    clearprefix.seek(0)
-    clear_prefix = clearprefix.read()
+    clear_prefix = crypt_CFB_str(ciphertext[:bs+2], algorithm, key, None, 'decrypt')
 
     if clear_prefix[-2:] == clear_prefix[bs-2:bs]: # "resync"
-        clearstream, cipherstream = StringIO(), StringIO()
-        cipherstream.write(ciphertext[bs+2:])
-        cipherstream.seek(0)
-        crypt_CFB(cipherstream, clearstream, algorithm, key, ciphertext[2:bs+2], 'decrypt')
-
-        clearstream.seek(0)
-        cleartext = clearstream.read()
-        return cleartext
+        return crypt_CFB_str(ciphertext[bs+2:], algorithm, key, ciphertext[2:bs+2], 'decrypt')
     else:
         raise PGPCryptoError("Re-sync check failed.")
 
@@ -1125,23 +1421,9 @@ def encrypt_integrity(algorithm, key, msg):
     rnd = RND.RandomPool(bs)
     prefix = rnd.get_bytes(bs)
 
-    clearstream = StringIO()
-    cipherstream = StringIO()
-
-    clearstream.write(prefix)
-    clearstream.write(prefix[-2:])
-    clearstream.write(msg)
-    clearstream.write('\xd3\x14')
-    clearstream.write(sha.new(clearstream.getvalue()).digest()) # hash previous
-    clearstream.seek(0) # again, magic .read() should handle this in crypt_CFB()
-
-    cipherstream.write('\x01')
-    cipherstream.seek(0, 2)
-    clearstream.seek(0)
-    crypt_CFB(clearstream, cipherstream, algorithm, key, None, 'encrypt')
-
-    cipherstream.seek(0)
-    ciphertext = cipherstream.read()
+    clear_d = ''.join([prefix, prefix[-2:], msg, '\xd3\x14'])
+    clear_d = clear_d + HASH.new(HASH_SHA1, clear_d).digest() # hash previous
+    ciphertext = '\x01' + crypt_CFB_str(clear_d, algorithm, key, None, 'encrypt')
 
     return create_Packet(PKT_SYMENCINTDATA, ciphertext)
 
@@ -1300,17 +1582,14 @@ def string2key(s2k, k_sym, passphrase):
         - `passphrase`: string passphrase
 
     :Returns: string encryption key
-    """
-    if HASH_MD5 == s2k.alg_hash:
-        hasher = md5
-    elif HASH_SHA1 == s2k.alg_hash:
-        hasher = sha
-    else:
-        raise NotImplementedError("Unsupported hash algorithm->(%s)." % s2k.alg_hash)
 
+    The salted passphrase is repeated into `_S2K_CHUNK` sized blocks which
+    are fed to the hash, so iterated S2Ks with large counts never build the
+    whole hashed stream. Derived keys are kept in `s2k_cache` if
+    `s2k_lifetime` is set (see the module notes).
+    """
     if None == passphrase:
         passphrase = ''
-    len_passphrase = len(passphrase)
 
     if s2k.type in [1, 3]:
         salt = s2k.salt
@@ -1321,38 +1600,42 @@ def string2key(s2k, k_sym, passphrase):
         count = s2k.count
     else:
         count = 0
+
     keysize = _keysize(k_sym)
 
-    pos, run, result = 0, 0, ''
-    while pos < keysize:
-        md = [] # reset message digest "hash context" every run
-        done = 0
-        for i in range(run): # preloaded 0x00s depending on iteration "run"
-            md.append('\x00')
-        if count < (len_passphrase + len(salt)):
-            count = len_passphrase + len(salt)
-        while (count - done) > (len_passphrase + len(salt)):
-            if (len(salt) > 0):
-                md.append(salt)
-            md.append(passphrase)
-            done = done + len_passphrase + len(salt)
-        for i in range(len(salt)):
-            if done < count:
-                md.append(salt[i])
-                done += 1
-        for i in range(len_passphrase):
-            if done < count:
-                md.append(passphrase[i]) 
-                done += 1
-        hash = hasher.new(''.join(md)).digest()
-        size = len(hash)
-        if (pos + size) > keysize:
-            size = keysize - pos
-        result = ''.join([result[:pos], hash[0:size]])
-        pos += size
-        run += 1
-    return result
+    if s2k_lifetime:
+        cache_key = (s2k.type, s2k.alg_hash, salt, count, keysize,
+                     hmac.new(_s2k_secret, passphrase, hashlib.sha256).digest())
+        key = s2k_cache.get(cache_key)
+
+        if key is not None:
+            return key
 
+    d = salt + passphrase
+    count = max(count, len(d)) # the salted passphrase is hashed at least once
+
+    if d: # a chunk holds whole copies so the next one picks up in step
+        chunk = d * max(1, _S2K_CHUNK // len(d))
+    else: # nothing to hash but the 0x00s
+        chunk, count = '', 0
+
+    hashed, run = [], 0
+
+    while len(hashed) * HASH.digest_size(s2k.alg_hash) < keysize:
+        md = HASH.new(s2k.alg_hash, '\x00' * run) # preloaded 0x00s by run
+        left = count
+
+        while left > len(chunk):
+            md.update(chunk)
+            left -= len(chunk)
+
+        md.update(chunk[:left])
+        hashed.append(md.digest())
+        run += 1
 
+    key = ''.join(hashed)[:keysize]
 
+    if s2k_lifetime:
+        s2k_cache.set(cache_key, key, time.time() + s2k_lifetime)
 
+    return key
@@ -0,0 +1,133 @@
+"""Hash algorithm registry
+
+OpenPGP refers to hash algorithms by number (the ``HASH_*`` constants in
+`openpgp.code`). Everything that hashes - signature contexts, string-to-key
+specifiers, RSA signature padding, key fingerprints and modification detection
+codes - looks the algorithm up here instead of importing a hash module of its
+own::
+
+    md = new(HASH_SHA256, d)
+    md.update(more_d)
+    digest = md.digest()
+
+Each algorithm is registered with a constructor, its digest size, the ASN.1
+"full hash prefix" used to pad RSA signatures (RFC 2440 5.2.2) and the name
+used in ``Hash:`` armor headers. MD5, SHA-1 and SHA-224/256/384/512 come from
+`hashlib` (OpenSSL when it's there). RIPEMD-160 is registered if `hashlib`
+supports it, or else if PyCrypto does.
+
+Other algorithms can be added with `register()`.
+"""
+import hashlib
+
+from openpgp.code import *
+
+_registry = {} # algorithm: (constructor, digest size, ASN.1 prefix, name)
+
+def register(alg, constructor, prefix, name):
+    """Add (or replace) a hash algorithm.
+
+    :Parameters:
+        - `alg`: integer hash algorithm constant
+        - `constructor`: callable taking an optional string and returning a
+          hash object with ``update()``, ``digest()``, ``hexdigest()`` and
+          ``copy()`` methods (like ``hashlib.sha1``)
+        - `prefix`: string ASN.1 prefix for RSA signature padding
+        - `name`: string name used in ``Hash:`` armor headers
+    """
+    _registry[alg] = (constructor, len(constructor().digest()), prefix, name)
+
+def _lookup(alg):
+    try:
+        return _registry[alg]
+    except KeyError:
+        raise NotImplementedError("Unsupported hash algorithm->(%s)." % alg)
+
+def new(alg, d=''):
+    """Start a hash.
+
+    :Parameters:
+        - `alg`: integer hash algorithm constant
+        - `d`: optional string to start hashing
+
+    :Returns: hash object (see `register()`)
+
+    :Exceptions:
+        - `NotImplementedError`: `alg` isn't registered
+    """
+    return _lookup(alg)[0](d)
+
+def digest_size(alg):
+    """Get the size of an algorithm's digests.
+
+    :Parameters:
+        - `alg`: integer hash algorithm constant
+
+    :Returns: integer octet count
+    """
+    return _lookup(alg)[1]
+
+def asn1_prefix(alg):
+    """Get an algorithm's ASN.1 prefix for RSA signature padding.
+
+    :Parameters:
+        - `alg`: integer hash algorithm constant
+
+    :Returns: string prefix
+    """
+    return _lookup(alg)[2]
+
+def armor_name(alg):
+    """Get an algorithm's name for ``Hash:`` armor headers.
+
+    :Parameters:
+        - `alg`: integer hash algorithm constant
+
+    :Returns: string name
+    """
+    return _lookup(alg)[3]
+
+def supported(alg):
+    """Tell whether an algorithm is registered.
+
+    :Parameters:
+        - `alg`: integer hash algorithm constant
+
+    :Returns: boolean
+    """
+    return alg in _registry
+
+register(HASH_MD5, hashlib.md5,
+         '\x30\x20\x30\x0c\x06\x08\x2a\x86\x48\x86\xf7\x0d\x02\x05\x05\x00\x04\x10',
+         'MD5')
+register(HASH_SHA1, hashlib.sha1,
+         '\x30\x21\x30\x09\x06\x05\x2b\x0e\x03\x02\x1a\x05\x00\x04\x14',
+         'SHA1')
+register(HASH_SHA224, hashlib.sha224,
+         '\x30\x2d\x30\x0d\x06\x09\x60\x86\x48\x01\x65\x03\x04\x02\x04\x05\x00\x04\x1c',
+         'SHA224')
+register(HASH_SHA256, hashlib.sha256,
+         '\x30\x31\x30\x0d\x06\x09\x60\x86\x48\x01\x65\x03\x04\x02\x01\x05\x00\x04\x20',
+         'SHA256')
+register(HASH_SHA384, hashlib.sha384,
+         '\x30\x41\x30\x0d\x06\x09\x60\x86\x48\x01\x65\x03\x04\x02\x02\x05\x00\x04\x30',
+         'SHA384')
+register(HASH_SHA512, hashlib.sha512,
+         '\x30\x51\x30\x0d\x06\x09\x60\x86\x48\x01\x65\x03\x04\x02\x03\x05\x00\x04\x40',
+         'SHA512')
+
+try:
+    hashlib.new('ripemd160')
+    _ripemd160 = lambda d='': hashlib.new('ripemd160', d)
+
+except ValueError: # OpenSSL without RIPEMD-160
+
+    try:
+        from Crypto.Hash.RIPEMD import new as _ripemd160
+    except ImportError:
+        _ripemd160 = None
+
+if _ripemd160:
+    register(HASH_RIPEMD160, _ripemd160,
+             '\x30\x21\x30\x09\x06\x05\x2b\x24\x03\x02\x01\x05\x00\x04\x14',
+             'RIPEMD160')
@@ -0,0 +1,435 @@
+"""Indexed keyring files
+
+The API functions accept keys as strings, and every call parses all of them
+(packets, messages, blocks and all) just to pick out the one or two keys it
+needs. That's fine for a handful of keys, not for a keyring with tens of
+thousands of them. A `Keyring` parses a keyring file once, noting
+where each key message starts along with its key IDs, fingerprints and user
+IDs, and saves that in an index file next to the keyring. After that, only
+the key messages that match a lookup are parsed.
+
+Keyring instances can be used in place of key strings in the API::
+
+    keyring = Keyring('pubring.gpg')
+    encrypt_str(d, keys=keyring, use_userid=[(None, 'tester@example.com')])
+
+Index files
+-----------
+The index (``<keyring>.idx`` by default) is a binary file that is
+memory-mapped when the keyring is opened, so opening a keyring doesn't
+parse anything or build a table per key. After a fixed header (see
+`INDEX_MAGIC` and `INDEX_VERSION`) come, in order:
+
+    - the offset and size of each key message in the keyring
+    - (key ID, key message number) records sorted by key ID, and the same
+      for fingerprints, so lookups are binary searches
+    - the offsets and key message numbers of the user IDs, and the user IDs
+      themselves separated by newlines
+    - for an ASCII-armored keyring, the dearmored packet data
+
+Numbers are big-endian. The header records the size and CRC-32 of the
+keyring the index was made from, and the index is rebuilt whenever they
+don't match, so a keyring updated by another program is picked up
+automatically.
+
+Armored keyrings are dearmored once, when the index is built. From then on
+key messages are parsed from the packet data kept in the index, the armored
+text is only read to check that it hasn't changed.
+"""
+import os
+import sys
+import mmap
+import zlib
+import array
+import bisect
+import struct
+
+from openpgp.code import *
+
+from openpgp.sap.exceptions import *
+from openpgp.sap.armory import list_armored
+from openpgp.sap.list import list_pkts, list_msgs, find_keys
+from openpgp.sap.pkt.Packet import Tag, pktclass
+
+INDEX_MAGIC = 'SAPKRIDX'
+INDEX_VERSION = 2
+
+# magic, version, keyring size, keyring CRC-32, key message count, key
+# packet count, user ID count, user ID data size, packet data size
+_header = struct.Struct('>8sHQIIIIIQ')
+_entry = struct.Struct('>QI') # offset, size
+_keyid = struct.Struct('>16sI') # key ID, key message number
+_fprint = struct.Struct('>40sI') # fingerprint (padded), key message number
+_number = struct.Struct('>I')
+
+def scan_keyring(d):
+    """Find key messages and their IDs in native keyring data.
+
+    :Parameters:
+        - `d`: string of native OpenPGP data or an `mmap.mmap` instance
+          mapping such data
+
+    :Returns: list of tuples (offset, size, [(key ID, fingerprint), ..],
+        [user ID, ..]) for each key message
+
+    Packets are listed lazily (see `openpgp.sap.list.list_pkts()`) and only
+    the bodies of key and user ID packets are parsed, signatures aren't
+    touched. A key message starts with a primary key packet and ends where
+    the next one starts. Packets in front of the first primary key are
+    skipped.
+    """
+    entries = []
+    entry = None
+    idx = 0
+    len_d = len(d)
+
+    while idx < len_d:
+        tag = Tag(d[idx])
+        pkt = pktclass(tag.type)()
+        pkt.fill(d, idx, True)
+
+        if tag.type in [PKT_PUBLICKEY, PKT_PRIVATEKEY]:
+
+            if entry:
+                entry[1] = idx - entry[0]
+
+            entry = [idx, None, [], []]
+            entries.append(entry)
+
+        if entry:
+
+            if tag.type in PKT_KEYS:
+                entry[2].append((pkt.body.id, pkt.body.fingerprint))
+
+            elif PKT_USERID == tag.type:
+                entry[3].append(pkt.body.value)
+
+        idx = idx + pkt.size
+
+    if entry:
+        entry[1] = len_d - entry[0]
+
+    return [tuple(e) for e in entries]
+
+
+class Keyring:
+    """A keyring file with an index of its keys.
+
+    :IVariables:
+        - `filename`: string keyring file name
+        - `index_filename`: string index file name
+
+    Key messages are parsed when a lookup first needs them and are kept
+    afterwards, so repeated lookups don't parse anything.
+    """
+    def __init__(self, filename, index_filename=None):
+        """Open a keyring, building its index if necessary.
+
+        :Parameters:
+            - `filename`: string native or ASCII-armored keyring file name
+            - `index_filename`: optional string index file name (defaults to
+              `filename` + '.idx')
+
+        :Exceptions:
+            - `PGPFormatError`: the keyring is neither native nor armored
+              OpenPGP data
+        """
+        self.filename = filename
+        self.index_filename = index_filename or filename + '.idx'
+        self._f = file(filename, 'rb')
+        self._idx_f, self._idx = None, ''
+
+        if os.fstat(self._f.fileno()).st_size:
+            self._src = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._armored = not 0x80 & ord(self._src[0])
+
+            if self._armored and -1 == self._src.find('-----BEGIN PGP'):
+                self.close()
+                raise PGPFormatError("Keyring %s isn't OpenPGP data." % filename)
+
+        else: # mmap won't map an empty file
+            self._src, self._armored = '', False
+
+        # keyring checksum, the index must have been made from the same data
+        self._sum = zlib.crc32(self._src) & 0xffffffff
+        self._loaded = {} # entry number: [key messages]
+
+        if not self._read_index():
+            self.reindex()
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        """Close the keyring and index files.
+        """
+        self._close_index()
+
+        if isinstance(self._src, mmap.mmap):
+            self._src.close()
+
+        self._f.close()
+
+    def reindex(self):
+        """Scan the keyring and write a new index file.
+
+        :Exceptions:
+            - `PGPFormatError`: the index that was written can't be read
+        """
+        if self._armored: # once, the packet data goes in the index
+            pkt_d = ''.join([a.data for a in list_armored(self._src[:])])
+        else:
+            pkt_d = self._src
+
+        entries = scan_keyring(pkt_d)
+        keyids, fprints, uid_starts, uid_entries, uids = [], [], [], [], []
+        start = 0
+
+        for n in range(len(entries)):
+
+            for keyid, fprint in entries[n][2]:
+                keyids.append((keyid, n))
+                fprints.append((fprint.ljust(40), n))
+
+            for userid in entries[n][3]:
+                uids.append(userid)
+                uid_starts.append(start)
+                uid_entries.append(n)
+                start = start + len(userid) + 1
+
+        uid_d = '\n'.join(uids)
+        keyids.sort()
+        fprints.sort()
+
+        if not self._armored:
+            pkt_d = ''
+
+        d = [_header.pack(INDEX_MAGIC, INDEX_VERSION, len(self._src),
+                          self._sum, len(entries), len(keyids), len(uids),
+                          len(uid_d), len(pkt_d))]
+        d.extend([_entry.pack(e[0], e[1]) for e in entries])
+        d.extend([_keyid.pack(*r) for r in keyids])
+        d.extend([_fprint.pack(*r) for r in fprints])
+        d.extend([_number.pack(i) for i in uid_starts])
+        d.extend([_number.pack(i) for i in uid_entries])
+        d.append(uid_d)
+        d.append(pkt_d)
+
+        tmpname = self.index_filename + '.tmp'
+        f = file(tmpname, 'wb')
+        f.write(''.join(d))
+        f.close()
+        self._close_index() # a mapped file can't be replaced on Windows
+
+        if os.path.exists(self.index_filename): # rename() won't on Windows
+            os.remove(self.index_filename)
+
+        os.rename(tmpname, self.index_filename)
+
+        if not self._read_index():
+            raise PGPFormatError("Couldn't read new keyring index %s." % self.index_filename)
+
+    def list_keys(self, keyids=None):
+        """List the key messages containing certain keys.
+
+        :Parameters:
+            - `keyids`: optional list of key IDs or fingerprints (16 or 40
+              char caps hex) - if None, all key messages are listed
+
+        :Returns: list of key message instances, in keyring order
+        """
+        if keyids is None:
+            found = range(self._count)
+
+        else:
+            found = self._match_keyids(keyids)
+
+        return self._load(found)
+
+    def find_keys(self, **kw):
+        """Find keys based on actions or IDs.
+
+        :Keywords:
+            - `action`: optional 'sign' or 'encrypt'
+            - `userids`: list of matchable tuples [(str primary, str userid)]
+            - `keyids`: list of matchable key IDs or fingerprints
+              [(primary, keyid)]
+
+        :Returns: list of (key, [matching_fprint, ..]) tuples, see
+            `openpgp.sap.list.find_keys()`
+
+        The index narrows things down to the key messages that could match,
+        and only those are parsed and handed to
+        `openpgp.sap.list.find_keys()`.
+        """
+        found = None # any key
+
+        if kw.get('keyids'):
+            ids = []
+
+            for p, t in kw['keyids']:
+
+                if t or p:
+                    ids.append(t or p)
+
+                else: # (None, None) matches anything
+                    ids = None
+                    break
+
+            if ids is not None:
+                found = self._match_keyids(ids)
+
+        if kw.get('userids'):
+            uid_found = {}
+
+            for p, u in kw['userids']:
+
+                if u:
+                    uid_found.update(dict.fromkeys(self._match_userid(u)))
+
+                else:
+                    uid_found = None
+                    break
+
+            if uid_found is not None:
+
+                if found is None:
+                    found = sorted(uid_found.keys())
+
+                else:
+                    found = [n for n in found if n in uid_found]
+
+        if found is None:
+            found = range(self._count)
+
+        return find_keys(self._load(found), **kw)
+
+    def _load(self, found):
+        keys = []
+
+        for n in found:
+
+            if n not in self._loaded:
+                offset, size = _entry.unpack_from(self._idx, self._entries_at + n * _entry.size)
+                offset = offset + self._pkts_at
+                msgs = list_msgs(list_pkts(self._pkts[offset:offset + size]))
+                self._loaded[n] = [m for m in msgs if m.type in MSG_KEYS]
+
+            keys.extend(self._loaded[n])
+
+        return keys
+
+    def _match_keyids(self, keyids):
+        found = {}
+
+        for keyid in keyids:
+
+            if 16 == len(keyid):
+                found.update(dict.fromkeys(self._search(self._keyids_at, _keyid, keyid)))
+
+            elif len(keyid) <= 40:
+                found.update(dict.fromkeys(self._search(self._fprints_at, _fprint, keyid.ljust(40))))
+
+        return sorted(found.keys())
+
+    # Binary search of the sorted (ID, key message number) records starting
+    # at position `at` in the index, returns the numbers for `key`.
+    def _search(self, at, record, key):
+        d, width = self._idx, len(key)
+        lo, hi = 0, self._id_count
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = at + mid * record.size
+
+            if d[pos:pos + width] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        found = []
+
+        while lo < self._id_count:
+            pos = at + lo * record.size
+
+            if d[pos:pos + width] != key:
+                break
+
+            found.append(record.unpack_from(d, pos)[1])
+            lo = lo + 1
+
+        return found
+
+    # User IDs are searched as one string so that substrings are found at C
+    # speed. A query that contains the '\n' separator could match across two
+    # user IDs, which find_keys() then weeds out.
+    def _match_userid(self, userid):
+        found = {}
+        i = self._uid_d.find(userid)
+
+        while -1 != i:
+            line = bisect.bisect_right(self._uid_starts, i) - 1
+            found[self._uid_entries[line]] = True
+            i = self._uid_d.find(userid, i + 1)
+
+        return sorted(found.keys())
+
+    def _read_index(self):
+        try:
+            f = file(self.index_filename, 'rb')
+
+        except IOError:
+            return False
+
+        size = os.fstat(f.fileno()).st_size
+
+        if size < _header.size:
+            f.close()
+            return False
+
+        d = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, src_size, src_sum, count, id_count, uid_count, \
+            uid_len, pkts_len = _header.unpack_from(d)
+        at = _header.size + count * _entry.size
+        uids_at = at + id_count * (_keyid.size + _fprint.size)
+        uid_d_at = uids_at + 2 * uid_count * _number.size
+
+        if (magic, version, src_size, src_sum, size) != \
+           (INDEX_MAGIC, INDEX_VERSION, len(self._src), self._sum,
+            uid_d_at + uid_len + pkts_len): # stale or foreign
+            d.close()
+            f.close()
+            return False
+
+        self._close_index()
+        self._idx_f, self._idx = f, d
+        self._count, self._id_count = count, id_count
+        self._entries_at = _header.size
+        self._keyids_at = at
+        self._fprints_at = at + id_count * _keyid.size
+        self._uid_starts = self._numbers(uids_at, uid_count)
+        self._uid_entries = self._numbers(uids_at + uid_count * _number.size, uid_count)
+        self._uid_d = d[uid_d_at:uid_d_at + uid_len]
+
+        if self._armored:
+            self._pkts, self._pkts_at = d, uid_d_at + uid_len
+        else:
+            self._pkts, self._pkts_at = self._src, 0
+
+        return True
+
+    # a run of big-endian numbers in the index as an array
+    def _numbers(self, at, count):
+        a = array.array('I', self._idx[at:at + count * _number.size])
+
+        if 'little' == sys.byteorder:
+            a.byteswap()
+
+        return a
+
+    def _close_index(self):
+        if self._idx_f:
+            self._pkts = self._src # don't leave it pointing at a closed index
+            self._idx.close()
+            self._idx_f.close()
+            self._idx_f, self._idx = None, ''
@@ -1,9 +1,9 @@
 """If you're looking for something, you'll find it here.
 """
 #TODO: pgpwarn() is ugly. Kill it. Same goes for EXCEPT, WARN, and SUPRESS
+import bisect
 import logging
 import StringIO
-import copy
 
 from os import linesep
 
@@ -15,7 +15,7 @@ import openpgp.sap.pkt as PKT
 import openpgp.sap.text as TXT
 import openpgp.sap.crypto as CRYPT
 
-from openpgp.sap.armory import looks_armored, list_armored
+from openpgp.sap.armory import looks_armored, list_armored, ArmorDecoder
 from openpgp.sap.msg.CompressedMsg import CompressedMsg
 from openpgp.sap.msg.EncryptedMsg import EncryptedMsg
 from openpgp.sap.msg.KeyMsg import SecretKeyMsg
@@ -23,7 +23,7 @@ from openpgp.sap.msg.KeyMsg import StoredKeyMsg
 from openpgp.sap.msg.KeyMsg import PublicKeyMsg
 from openpgp.sap.msg.LiteralMsg import LiteralMsg
 from openpgp.sap.msg.SignedMsg import SignedMsg
-from openpgp.sap.pkt.Packet import Tag, pktclass
+from openpgp.sap.pkt.Packet import Tag, pktclass, tag_types
 from openpgp.sap.util.misc import unique_order, intersect_order
 
 
@@ -82,6 +82,12 @@ def deliteralize(msgs):
 # return all the packets sent to them, including those that matched the
 # sequence, and a warning will be issued. The packets will be returned as
 # leftovers. This way, all messages that are returned are complete and capable.
+#
+# The find_*_msg() functions return leftovers as a list for convenience, the
+# work is done by their _find_*_msg(pkts, idx) counterparts. These look for a
+# message starting at pkts[idx] and return the message (or None) and the index
+# following it (or idx), so that a packet list can be worked through without
+# slicing it over and over.
 def find_msg(pkts):
     """Find a single OpenPGP message in a list of packets.
 
@@ -95,46 +101,52 @@ def find_msg(pkts):
     beginning of the packet list will invalidate all potential messages
     following it.
     """
-    msg, leftovers = None, pkts
+    msg, idx = _find_msg(pkts, 0)
+    return msg, pkts[idx:]
+
+def _find_msg(pkts, idx, lazy=False):
+    msg = None
 
-    if len(pkts) != 0:
+    #try:
+    #    msg_type = pkts[idx].tag.type
 
-        #try:
-        #    msg_type = pkts[0].tag.type
+    #except AttributeError: # catch non-existent pkts[idx].tag.type
+    #    pgpwarn(PGPMessageWarning, "find_msg() found a list item which does not resemble a packet instance.")
 
-        #except AttributeError: # catch non-existent pkts[0].tag.type
-        #    pgpwarn(PGPMessageWarning, "find_msg() found a list item which does not resemble a packet instance.")
+    # let AttributeError fly, since should be a
+    # good packet list to begin with
+    try:
+        msg_type = pkts[idx].tag.type
 
-        # let AttributeError fly, since should be a
-        # good packet list to begin with
-        msg_type = pkts[0].tag.type
+    except IndexError: # no packets left
+        return msg, idx
 
-        # match encrypted message
-        if msg_type in [PKT_SYMENCDATA, PKT_SYMENCINTDATA, PKT_PUBKEYSESKEY, PKT_SYMKEYSESKEY]:
-            msg, leftovers = find_encrypted_msg(pkts)
+    # match encrypted message
+    if msg_type in [PKT_SYMENCDATA, PKT_SYMENCINTDATA, PKT_PUBKEYSESKEY, PKT_SYMKEYSESKEY]:
+        msg, idx = _find_encrypted_msg(pkts, idx)
 
-        # match signed message
-        elif msg_type in [PKT_SIGNATURE, PKT_ONEPASS]:
-            msg, leftovers = find_signed_msg(pkts)
+    # match signed message
+    elif msg_type in [PKT_SIGNATURE, PKT_ONEPASS]:
+        msg, idx = _find_signed_msg(pkts, idx)
 
-        # match compressed message
-        elif msg_type in [PKT_COMPRESSED]:
-            msg, leftovers = find_compressed_msg(pkts)
+    # match compressed message
+    elif msg_type in [PKT_COMPRESSED]:
+        msg, idx = _find_compressed_msg(pkts, idx)
 
-        # match literal message
-        elif msg_type in [PKT_LITERAL]:
-            msg, leftovers = find_literal_msg(pkts)
+    # match literal message
+    elif msg_type in [PKT_LITERAL]:
+        msg, idx = _find_literal_msg(pkts, idx)
 
-        # match public, secret, and stored keys
-        elif msg_type in [PKT_PUBLICKEY, PKT_PRIVATEKEY]:
-            msg, leftovers = find_key_msg(pkts)
+    # match public, secret, and stored keys
+    elif msg_type in [PKT_PUBLICKEY, PKT_PRIVATEKEY]:
+        msg, idx = _find_key_msg(pkts, idx, lazy)
 
-        elif pkts[0].tag.type in [PKT_MARKER]: # hacky-poo
-            msg = DummyMsg()
-            msg._seq = pkts[0]
-            leftovers = pkts[1:]
+    elif msg_type in [PKT_MARKER]: # hacky-poo
+        msg = DummyMsg()
+        msg._seq = pkts[idx]
+        idx += 1
 
-    return msg, leftovers
+    return msg, idx
 
 def find_compressed_msg(pkts):
     """Find a compressed OpenPGP message in a list of packets.
@@ -148,19 +160,20 @@ def find_compressed_msg(pkts):
             - `leftover_pkts`: list of packets that did not contribute to
               the message
     """
-    if PKT_COMPRESSED == pkts[0].tag.type:
+    msg, idx = _find_compressed_msg(pkts, 0)
+    return msg, pkts[idx:]
+
+def _find_compressed_msg(pkts, idx):
+
+    if PKT_COMPRESSED == pkts[idx].tag.type:
         msg = CompressedMsg()
-        msg._seq = [pkts[0]]
-        msg.compressed = pkts[0]
-        return msg, pkts[1:]
+        msg._seq = [pkts[idx]]
+        msg.compressed = pkts[idx]
+        return msg, idx + 1
 
     else:
-        return None, pkts
+        return None, idx
 
-# Tacking on the '_type' attribute to be able to distinguish target symmetric
-# session keys from public key session keys seems pretty ugly, but it's more
-# obvious than using a unique attribute like 's2k'.
-# Also, the if/elif can be rearranged to avoid repetition.
 def find_encrypted_msg(pkts):
     """Find an encrypted OpenPGP message in a list of packets.
 
@@ -172,23 +185,30 @@ def find_encrypted_msg(pkts):
             - `EncryptedMsg_instance`: instance of the EncryptedMsg class
             - `leftover_pkts`: list of packets that did not contribute to
     """
-    first_pkt_type = pkts[0].tag.type
+    msg, idx = _find_encrypted_msg(pkts, 0)
+    return msg, pkts[idx:]
+
+# Tacking on the '_type' attribute to be able to distinguish target symmetric
+# session keys from public key session keys seems pretty ugly, but it's more
+# obvious than using a unique attribute like 's2k'.
+# Also, the if/elif can be rearranged to avoid repetition.
+def _find_encrypted_msg(pkts, idx):
+    first_pkt_type = pkts[idx].tag.type
     encmsg = EncryptedMsg()
 
     if (first_pkt_type in [PKT_SYMENCDATA, PKT_SYMENCINTDATA]):
         encmsg.targets = None
-        encmsg._seq = [pkts[0]]
-        #encmsg.ciphertext = pkts[0].body.data
-        encmsg.encrypted = pkts[0]
-        #if PKT_SYMENCDATA == pkts[0].tag.type:
+        encmsg._seq = [pkts[idx]]
+        #encmsg.ciphertext = pkts[idx].body.data
+        encmsg.encrypted = pkts[idx]
+        #if PKT_SYMENCDATA == pkts[idx].tag.type:
         #    encmsg.integrity = 0
-        #elif PKT_SYMENCINTDATA == pkts[0].tag.type:
+        #elif PKT_SYMENCINTDATA == pkts[idx].tag.type:
         #    encmsg.integrity = 1
-        return encmsg, pkts[1:]
+        return encmsg, idx + 1
 
     elif first_pkt_type in [PKT_PUBKEYSESKEY, PKT_SYMKEYSESKEY]:
         seq = []
-        idx = 0
 
         try:
             encmsg.targets = []
@@ -208,7 +228,7 @@ def find_encrypted_msg(pkts):
                 elif PKT_SYMENCINTDATA == pkts[idx].tag.type:
                     encmsg.integrity = 1
 
-                return encmsg, pkts[idx+1:]
+                return encmsg, idx + 1
 
             else:
                 raise PGPMessageWarning("No encrypted data followed session keys.")
@@ -216,7 +236,7 @@ def find_encrypted_msg(pkts):
         except IndexError, AttributeError:
             raise PGPMessageWarning("Encrypted message is missing critical packets.")
     
-    return None, pkts
+    return None, idx
 
 def find_key_msg(pkts):
     """Find a public key message (or derivative) in a list of packets.
@@ -236,26 +256,47 @@ def find_key_msg(pkts):
     public subkey is not verified as a signature which *binds the
     subkey to the primary public key*.
     """
-    if PKT_PRIVATEKEY == pkts[0].tag.type:
-        keymsg = SecretKeyMsg(pkts)
+    msg, idx = _find_key_msg(pkts, 0)
+    return msg, pkts[idx:]
+
+# Trust packets are only looked for up to the next primary key, they don't
+# belong to any other key message. Lazy key messages are set up to build their
+# blocks as they're needed (see PublicKeyMsg).
+def _find_key_msg(pkts, idx, lazy=False):
+    first_pkt_type = pkts[idx].tag.type
 
-    elif PKT_PUBLICKEY == pkts[0].tag.type and PKT_TRUST in [x.tag.type for x in pkts]:
-        keymsg = StoredKeyMsg(pkts)
+    if PKT_PRIVATEKEY == first_pkt_type:
+        keymsg = SecretKeyMsg(pkts, idx=idx, lazy=lazy)
 
-    elif PKT_PUBLICKEY == pkts[0].tag.type:
-        keymsg = PublicKeyMsg(pkts)
+    elif PKT_PUBLICKEY == first_pkt_type:
+        stored = False
+        i = idx + 1
+
+        try:
+            while pkts[i].tag.type not in [PKT_PUBLICKEY, PKT_PRIVATEKEY]:
+
+                if PKT_TRUST == pkts[i].tag.type:
+                    stored = True
+                    break
+
+                i += 1
+
+        except IndexError:
+            pass
+
+        if stored:
+            keymsg = StoredKeyMsg(pkts, idx=idx, lazy=lazy)
+        else:
+            keymsg = PublicKeyMsg(pkts, idx=idx, lazy=lazy)
 
     else:
-        return None, pkts
+        return None, idx
 
-    leftovers = pkts[len(keymsg.seq()):]
+    if lazy:
+        return keymsg, idx + len(keymsg._pkts)
 
-    return keymsg, leftovers 
+    return keymsg, idx + len(keymsg.seq())
 
-# set 'data' attribute
-# TODO reconcile LiteralMsg = (LITERAL + LITERAL + LITERAL + ...)
-#      right now this still uses the single literal packet to define
-#      the literal message
 def find_literal_msg(pkts):
     """Find a literal OpenPGP message in a list of packets.
 
@@ -267,20 +308,31 @@ def find_literal_msg(pkts):
         class and ``leftover_pkts`` is a list of packets that did not
         contribute to the message
     """
+    msg, idx = _find_literal_msg(pkts, 0)
+    return msg, pkts[idx:]
+
+# set 'data' attribute
+# TODO reconcile LiteralMsg = (LITERAL + LITERAL + LITERAL + ...)
+#      right now this still uses the single literal packet to define
+#      the literal message
+def _find_literal_msg(pkts, idx):
     lit = LiteralMsg()
     lit.literals, lit._seq = [], []
-    idx = 0
 
-    while 0 != len(pkts[idx:]) and PKT_LITERAL == pkts[idx].tag.type:
-        lit._seq.append(pkts[idx]) # redundant, yes, just preserving _seq-ness
-        lit.literals.append(pkts[idx])
-        idx += 1
+    try:
+        while PKT_LITERAL == pkts[idx].tag.type:
+            lit._seq.append(pkts[idx]) # redundant, yes, just preserving _seq-ness
+            lit.literals.append(pkts[idx])
+            idx += 1
+
+    except IndexError:
+        pass
 
     if 1 <= len(lit.literals):
-        return lit, pkts[idx:]
+        return lit, idx
 
     else:
-        return None, pkts
+        return None, idx
 
 # Right now, a "signed message" according to this function is defined by
 # rfc2440 10.2. However, according to the signature types in 5.2.1, there are
@@ -341,52 +393,57 @@ def find_signed_msg(pkts):
             - `leftover_pkts`: list of packets that did not contribute to
               the `SignedMsg` instance
     """
+    msg, idx = _find_signed_msg(pkts, 0)
+    return msg, pkts[idx:]
+
+def _find_signed_msg(pkts, idx):
+    start = idx
     sigmsg = SignedMsg()
     sigmsg._seq = []
     sigmsg.sigs = []
-    first_pkt_type = pkts[0].tag.type
+    first_pkt_type = pkts[idx].tag.type
 
     if PKT_SIGNATURE == first_pkt_type:
-        sigmsg.sigs.append(pkts[0])
-        sigmsg._seq.append(pkts[0])
-        msg, leftovers = find_msg(pkts[1:])
+        sigmsg.sigs.append(pkts[idx])
+        sigmsg._seq.append(pkts[idx])
+        msg, idx = _find_msg(pkts, idx + 1)
 
         if msg is not None:
             sigmsg.msg = msg
             sigmsg._seq.append(msg)
-            return sigmsg, leftovers
+            return sigmsg, idx
 
         else: # no message follows, must be detached - handle elsewhere
-            return None, pkts
+            return None, start
 
     elif PKT_ONEPASS == first_pkt_type:
-        sigmsg.onepass = pkts[0]
-        sigmsg._seq.append(pkts[0])
-        msg, leftovers = find_msg(pkts[1:])
+        sigmsg.onepass = pkts[idx]
+        sigmsg._seq.append(pkts[idx])
+        msg, idx = _find_msg(pkts, idx + 1)
 
         if msg is not None:
             sigmsg.msg = msg
             sigmsg._seq.append(msg)
 
             try: # the one-pass message must be followed by a signature..
-                if PKT_SIGNATURE == leftovers[0].tag.type:
-                    sigmsg.sigs.append(leftovers[0])
-                    sigmsg._seq.append(leftovers[0])
-                    return sigmsg, leftovers[1:]
+                if PKT_SIGNATURE == pkts[idx].tag.type:
+                    sigmsg.sigs.append(pkts[idx])
+                    sigmsg._seq.append(pkts[idx])
+                    return sigmsg, idx + 1
 
-            except IndexError, AttributeError: # catch non-existent leftovers[0].tag.type
+            except IndexError, AttributeError: # catch non-existent pkts[idx].tag.type
                 pgpwarn(PGPMessageWarning, "Dismissing one-pass signed message: missing trailing signature.")
 
         # ..otherwise abort
         pgpwarn(PGPMessageWarning, "Dismissing one-pass signed message: missing signed message.")
         
-    return None, pkts
+    return None, start
 
 def find_keys(keys, **kw):
     """Find keys based on actions or IDs.
 
     :Parameters:
-        - `keys`: list of key message instances
+        - `keys`: list of key message instances or a `KeyIndex` instance
 
     :Keywords:
         - `action`: optional 'sign' or 'encrypt' to target only keys of a
@@ -400,50 +457,189 @@ def find_keys(keys, **kw):
 
     :note: 'None' will will match in both the primary or and keyid in a list of
         them.
+    :note: A list of keys is indexed on every call. Index them once with
+        `KeyIndex` when searching the same keys repeatedly.
     """
-    action = kw.get('action')
-    uids = kw.get('userids', [])
-    keyids = kw.get('keyids', [])
-    keytargets = []
+    if not isinstance(keys, KeyIndex):
+        keys = KeyIndex(keys)
 
-    for key in keys:
-        _pids = [None, False, '', key.primary_id, key.primary_fprint]
+    return keys.find(**kw)
 
-        if uids: 
-            _uids = [u for u in key._b_userids.keys() if
-                        [(p,i) for (p,i) in uids if p in _pids and i in u]]
+class KeyIndex:
+    """Lookup tables for a list of key messages.
 
-            if not _uids:
-                continue
+    :IVariables:
+        - `keys`: list of key message instances
+        - `keypkts`: list of lists of key packets (primary first, then
+          subkeys) for each key message in `keys`
+        - `signing`: list of lists of the key packets in `keypkts` with
+          `ASYM_SIGNING` algorithms
+        - `encrypting`: list of lists of the key packets in `keypkts` with
+          `ASYM_ENCRYPTING` algorithms
+
+    Key messages are referred to by their position in `keys`. Key IDs,
+    fingerprints and primary IDs are looked up in dictionaries. User IDs are
+    searched as a single string, which keeps the substring matching of
+    `find_keys()` without scanning each user ID in Python.
+    """
+    def __init__(self, keys):
+        """Index key messages.
+
+        :Parameters:
+            - `keys`: list of key message instances
+        """
+        self.keys = keys
+        self.keypkts, self.signing, self.encrypting = [], [], []
+        self._ids = {} # key ID or fingerprint: [(key number, keypkt), ..]
+        self._primaries = {} # primary ID or fingerprint: [key number, ..]
+        uids, self._uid_starts, self._uid_keys = [], [], []
+        start = 0
+
+        for n in range(len(keys)):
+            key = keys[n]
+            keypkts = [key._b_primary.leader]
+            keypkts.extend([b.leader for b in key._b_subkeys.list()])
+            self.keypkts.append(keypkts)
+            self.signing.append([p for p in keypkts
+                                 if p.body.alg in ASYM_SIGNING])
+            self.encrypting.append([p for p in keypkts
+                                    if p.body.alg in ASYM_ENCRYPTING])
+
+            for keyid in [key.primary_id, key.primary_fprint]:
+                self._primaries.setdefault(keyid, []).append(n)
 
-        keypkts = [key._b_primary.leader] # organize all the key packets
-        keypkts.extend([b.leader for b in key._b_subkeys.list()])
+            for keypkt in keypkts:
 
-        if action: # hang on to all keypkts which match the action algorithms
+                for keyid in [keypkt.body.id, keypkt.body.fingerprint]:
+                    self._ids.setdefault(keyid, []).append((n, keypkt))
 
-            if 'sign' == action:
-                keypkts = [p for p in keypkts if p.body.alg in ASYM_SIGNING]
+            for userid in key._b_userids.keys():
+                uids.append(userid)
+                self._uid_starts.append(start)
+                self._uid_keys.append(n)
+                start = start + len(userid) + 1
 
-            elif 'encrypt' == action:
-                keypkts = [p for p in keypkts if p.body.alg in ASYM_ENCRYPTING]
+        self._uid_d = '\n'.join(uids)
 
-        if keyids:
-            _keypkts = []
+    def find(self, **kw):
+        """Find keys based on actions or IDs.
 
-            for keypkt in keypkts:
-                _target_ids = [None, keypkt.body.id, keypkt.body.fingerprint]
+        See `find_keys()`, this takes the same keywords and returns the same
+        list.
+        """
+        action = kw.get('action')
+        uids = kw.get('userids', [])
+        keyids = kw.get('keyids', [])
+        found = None # key numbers, None for all of them
 
-                for p, t in keyids:
-        
-                    if p in _pids and t in _target_ids:
-                        _keypkts.append(keypkt)
+        if keyids and not [1 for p, t in keyids if not (p or t)]:
+            found = {}
+
+            for p, t in keyids:
+
+                if t:
+                    found.update(dict.fromkeys([n for n, k in self._ids.get(t, [])]))
+                else:
+                    found.update(dict.fromkeys(self._primaries.get(p, [])))
+
+        if uids:
+            uid_found = {}
+
+            for p, i in uids:
+
+                for n in self.find_userid(i):
+
+                    if p in self._pids(n):
+                        uid_found[n] = True
+
+            if found is not None:
+                uid_found = dict([(n, True) for n in found if n in uid_found])
+
+            found = uid_found
+
+        if found is None:
+            found = range(len(self.keys))
+        else:
+            found = sorted(found.keys())
+
+        if 'sign' == action:
+            keypkts_list = self.signing
+        elif 'encrypt' == action:
+            keypkts_list = self.encrypting
+        else:
+            keypkts_list = self.keypkts
+
+        keytargets = []
+
+        for n in found:
+            keypkts = keypkts_list[n]
+
+            if keyids:
+                _pids = self._pids(n)
+                _keypkts = []
 
-            keypkts = _keypkts
+                for keypkt in keypkts:
+                    _target_ids = [None, keypkt.body.id, keypkt.body.fingerprint]
 
-        if keypkts:
-            keytargets.append((key, [p.body.fingerprint for p in keypkts]))
+                    for p, t in keyids:
 
-    return keytargets
+                        if p in _pids and t in _target_ids:
+                            _keypkts.append(keypkt)
+
+                keypkts = _keypkts
+
+            if keypkts:
+                keytargets.append((self.keys[n], [p.body.fingerprint for p in keypkts]))
+
+        return keytargets
+
+    def find_userid(self, userid):
+        """Find the keys with a user ID containing a string.
+
+        :Parameters:
+            - `userid`: string user ID or part of one
+
+        :Returns: list of key numbers (positions in `keys`)
+        """
+        if not userid: # matches any key with a user ID
+            return sorted(dict.fromkeys(self._uid_keys).keys())
+
+        found = {}
+        i = self._uid_d.find(userid)
+
+        while -1 != i:
+            line = bisect.bisect_right(self._uid_starts, i) - 1
+
+            if line + 1 < len(self._uid_starts): # don't match across two
+                uid_end = self._uid_starts[line + 1] - 1
+            else:
+                uid_end = len(self._uid_d)
+
+            if i + len(userid) <= uid_end:
+                found[self._uid_keys[line]] = True
+
+            i = self._uid_d.find(userid, i + 1)
+
+        return sorted(found.keys())
+
+    def list_keys(self, keyids):
+        """List the key messages containing certain keys.
+
+        :Parameters:
+            - `keyids`: list of key IDs or fingerprints
+
+        :Returns: list of key message instances, in order
+        """
+        found = {}
+
+        for keyid in keyids:
+            found.update(dict.fromkeys([n for n, k in self._ids.get(keyid, [])]))
+
+        return [self.keys[n] for n in sorted(found.keys())]
+
+    def _pids(self, n):
+        key = self.keys[n]
+        return [None, False, '', key.primary_id, key.primary_fprint]
 
 # Primary, user IDs user attribute blocks are scanned for preference
 # information. This is a vote-processing deal that follows these rules:
@@ -552,62 +748,155 @@ def list_msgs(pkts, **kw):
         - `leftover`: a list used to append extraneous packets found after
           those which comprised valid messages. If no valid messages are found,
           the the entire packet sequence will be `leftover`.
+        - `lazy`: optional True or False (default False), set to True to
+          have key messages build their blocks only as they're needed (see
+          `openpgp.sap.msg.KeyMsg.PublicKeyMsg`)
 
     :Returns: list of OpenPGP message instances
 
-    :todo: Double check (and hopefully eliminate) the deepcopy() of `pkts`.
+    Messages share packet instances with `pkts` (nothing is copied).
     """
-    pkts = copy.deepcopy(pkts) # see if this is necessary
-    leftover = kw.get('leftover', [])
     code = kw.get('code', None)
-    msgs = []
-    i = 0
-    m, l = find_msg(pkts)
+    msgs = list(iter_msgs(pkts, leftover=kw.get('leftover', []),
+                          lazy=kw.get('lazy', False)))
+
+    if code:
+        msgs = filter(lambda m: m.type == code, msgs)
+
+    return msgs
+
+def iter_msgs(pkts, **kw):
+    """Iterate over the OpenPGP messages in a sequence of packet instances.
+
+    :Parameters:
+        - `pkts`: list or any other iterable of packet instances (see
+          `openpgp.sap.stream.iter_pkts()`)
+
+    :Keywords:
+        - `leftover`: a list used to append extraneous packets found after
+          those which comprised valid messages (see `list_msgs()`), extended
+          once the messages have run out
+        - `lazy`: optional True or False (default False), see `list_msgs()`
+
+    :Returns: iterator yielding OpenPGP message instances
+
+    Packets are grouped in a single pass. If `pkts` isn't a list, packets are
+    pulled from it only as they're needed and let go of once their message
+    has been handed out, so that a large key export can be worked through a
+    message at a time.
+    """
+    leftover = kw.get('leftover', [])
+    lazy = kw.get('lazy', False)
+
+    if not isinstance(pkts, list):
+        pkts = _PacketWindow(pkts)
+
+    m, idx = _find_msg(pkts, 0, lazy)
 
     while m is not None:
 
-        msgs.append(m)
+        if isinstance(pkts, _PacketWindow):
+            pkts.advance(idx)
 
-        if 0 == len(l):
-            break
-        else:
-            m, l = find_msg(l)
+        yield m
+        m, idx = _find_msg(pkts, idx, lazy)
 
-    if code:
-        msgs = filter(lambda m: m.type == code, msgs)
+    if isinstance(pkts, _PacketWindow):
+        leftover.extend(pkts.rest(idx))
+    else:
+        leftover.extend(pkts[idx:])
 
-    if l:
-        leftover.extend(l)
+class _PacketWindow(list):
+    """Packet list filled from an iterator as packets are indexed.
 
-    return msgs
+    Indexes are positions in the whole packet sequence. `advance()` lets go of
+    packets before a position, which can't be indexed afterwards. This is
+    just enough of a list for the _find_*_msg() functions and key message
+    constructors, which index packets one at a time until they hit an
+    IndexError.
+    """
+    def __init__(self, pkts):
+        list.__init__(self)
+        self._pkts = iter(pkts)
+        self._start = 0
+
+    def __getitem__(self, i):
+        i = i - self._start
+
+        while len(self) <= i and self._pkts is not None:
+
+            try:
+                self.append(self._pkts.next())
+            except StopIteration:
+                self._pkts = None
+
+        if i < 0:
+            raise IndexError("Packet %s has been let go of." % (i + self._start))
+
+        return list.__getitem__(self, i)
+
+    def advance(self, idx):
+        del self[:idx - self._start]
+        self._start = idx
+
+    def rest(self, idx):
+        "Return a list of all packets from `idx` on."
+        self.advance(idx)
+        l = list(self)
+
+        if self._pkts is not None:
+            l.extend(self._pkts)
+            self._pkts = None
+
+        return l
+
+_ARMOR_CHUNK = 65536 # armored text decoded per pass in list_pkts()
 
 def list_pkts(s, **kw):
     """Create a list of OpenPGP packet instances given a string of data.
 
     :Parameters:
-        - `s`: string of native OpenPGP data (native or ASCII-armored)
+        - `s`: string of native OpenPGP data (native or ASCII-armored) or
+          an `mmap.mmap` instance mapping such data
 
     :Keywords:
         - `code`: optional packet type code to match listed packets
+        - `lazy`: set to True to create packet bodies on first access (see
+          `openpgp.sap.pkt.Packet.Packet.fill()`) - useful when only packet
+          headers are needed
 
     :Returns: list of packet instances
 
     `list_pkts()` will return all OpenPGP packets found as various packet type
     instances.
 
+    Packets are parsed in place, by offset, so only the octets a packet keeps
+    are copied out of `s`. Large native files (keyring dumps, for example)
+    can be listed without reading them into memory first::
+
+        f = file('pubring.gpg', 'rb')
+        m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        pkts = list_pkts(m)
+
+    Armored text is decoded a chunk at a time with an
+    `openpgp.sap.armory.ArmorDecoder`, so only the decoded data is copied.
+
     :TODO: It looks like an incomplete packet may be returned at the end of the
         list. Check this.
     """
     code = kw.get('code', None)
+    lazy = kw.get('lazy', False)
 
     if looks_armored(s):
+        # all armored data is caught, including clearsigned sigs
+        # clearsigned text is ignored
+        decoder = ArmorDecoder()
         arm_d = [] # native data
 
-        for arm in list_armored(s):
-            # all armored data is caught, including clearsigned sigs
-            # clearsigned text is ignored
-            arm_d.append(arm.data)
+        for i in xrange(0, len(s), _ARMOR_CHUNK): # no text copy of an mmap
+            arm_d.append(decoder.feed(s[i:i + _ARMOR_CHUNK]))
 
+        arm_d.append(decoder.close())
         s = ''.join(arm_d)
 
     pkts = []
@@ -615,8 +904,13 @@ def list_pkts(s, **kw):
     len_d = len(s)
 
     while idx < len_d:
-        tag = Tag(s[idx]) # assume first octet starts packet tag (header)
-        packet = pktclass(tag.type)(s[idx:]) 
+        pkttype = tag_types[ord(s[idx])] # assume first octet starts packet tag
+
+        if pkttype is None:
+            Tag(s[idx]) # raises the PGPFormatError
+
+        packet = pktclass(pkttype)()
+        packet.fill(s, idx, lazy) # only slices what the packet keeps
         idx = idx + packet.size
         pkts.append(packet)
 
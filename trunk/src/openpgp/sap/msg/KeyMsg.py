@@ -19,38 +19,66 @@ class PublicKeyMsg(KeyMsg):
         - `primary_id`: string primary key ID
         - `primary_fprint`: string primary key fingerprint
         - `_b_primary`: Block instance primary key block
-        - `_b_userids`: dictionary of user ID blocks, keyed by user ID
+        - `_b_userids`: ordered dictionary (`openpgp.sap.util.ordict`) of
+          user ID blocks, keyed by user ID
         - `_b_userattrs`: list of blocks
-        - `_b_subkeys`: dictionary of subkey blocks, keyed by subkey ID
+        - `_b_subkeys`: ordered dictionary of subkey blocks, keyed by subkey
+          ID
  
     :CVariables:
         - `type`: constant MSG_PUBLICKEY (see OpenPGP.constant.messages)
+
+    Lazy key messages (see `__init__()`) only note where each block starts
+    and ends. A block is built, and its signatures sorted, the first time
+    it's needed: `get_block()` and `get_keypkt()` build the blocks they look
+    through, `list_keyids()` builds the subkey blocks, and the first access
+    to one of the `_b_*` attributes (as `list_blocks()` and `seq()` do)
+    builds all of the blocks of that kind.
     """
     type = MSG_PUBLICKEY
+    _lazy_attrs = {'_b_primary': [PKT_PUBLICKEY, PKT_PRIVATEKEY],
+                   '_b_userids': [PKT_USERID],
+                   '_b_userattrs': [PKT_USERATTR],
+                   '_b_subkeys': [PKT_PUBLICSUBKEY, PKT_PRIVATESUBKEY]}
+
     def __init__(self, pkts=None, *args, **kwords):
         """Initialize public key message.
 
         :Parameters:
             - `pkts`: *optional* list of packets to build message with
 
+        :Keywords:
+            - `idx`: integer, where the message begins in `pkts` (default 0)
+            - `lazy`: optional True or False (default False), set to True
+              to leave the blocks to be built as they're needed
+
         :Exceptions:
             - `PGPKeyMsgError`: first block is not a primary key block
+
+        :note: A lazy key message runs up to the next primary key. A
+            sub-block without a local binding is left out of it when it's
+            built, instead of ending the message there.
         """
         import openpgp.sap.util.ordict as ORD
 
+        if isinstance(pkts, list) and kwords.get('lazy'):
+            self.__find_blocks(pkts, kwords.get('idx') or 0)
+            return
+
         self._b_primary = None
         self._b_subkeys = ORD.ordict()
         self._b_userids = ORD.ordict()
         self._b_userattrs = []
        
         if isinstance(pkts, list):
+            idx = kwords.get('idx') or 0
 
-            if pkts[0].tag.type in [PKT_PUBLICKEY, PKT_PRIVATEKEY]:
+            if pkts[idx].tag.type in [PKT_PUBLICKEY, PKT_PRIVATEKEY]:
 
                 # first block must be a public key or secret key
-                block = Block(pkts[0].body.id, pkts, idx=0)
+                block = Block(pkts[idx].body.id, pkts, idx=idx)
                 self.new_primary(block) # no signatures are required for primary
-                idx = len(block.seq())
+                idx += len(block.seq())
 
                 try:
                     while pkts[idx].tag.type not in [PKT_PUBLICKEY,
@@ -69,6 +97,115 @@ class PublicKeyMsg(KeyMsg):
             else:
                 raise PGPKeyMsgError("First block to key message must be primary or secret key.")
 
+    def __getattr__(self, name):
+        # lazy key messages build their blocks on first access (see __init__)
+        if name in self._lazy_attrs and '_pkts' in self.__dict__:
+
+            if '_b_primary' == name:
+                self.new_primary(self.__block(0))
+
+            else:
+                import openpgp.sap.util.ordict as ORD
+
+                if '_b_userattrs' == name:
+                    self._b_userattrs = []
+                else:
+                    self.__dict__[name] = ORD.ordict()
+
+                for n in self.__list_blocks(name):
+                    block = self.__block(n)
+
+                    if block:
+                        self.add_subblock(block)
+
+            return self.__dict__[name]
+
+        raise AttributeError(name)
+
+    # Note the packet range of each block, in a lazy key message.
+    def __find_blocks(self, pkts, idx):
+        leader = pkts[idx]
+
+        if leader.tag.type not in [PKT_PUBLICKEY, PKT_PRIVATEKEY]:
+            raise PGPKeyMsgError("First block to key message must be primary or secret key.")
+
+        self.primary_id = leader.body.id
+        self.primary_fprint = leader.body.fingerprint
+        self._ranges = [] # (leader type, first packet, end) for each block
+        self._blocks = {} # block number: Block (or None, see __block())
+        subblock_pkts = [PKT_USERID, PKT_USERATTR, PKT_PUBLICSUBKEY,
+                         PKT_PRIVATESUBKEY]
+        start, i = idx, idx + 1
+
+        try:
+            while 1:
+                pkt_type = pkts[i].tag.type
+
+                if pkt_type in [PKT_SIGNATURE, PKT_TRUST]:
+                    i += 1
+                    continue
+
+                self._ranges.append((pkts[start].tag.type, start - idx, i - idx))
+
+                if pkt_type in subblock_pkts:
+                    start, i = i, i + 1
+                elif pkt_type in [PKT_PUBLICKEY, PKT_PRIVATEKEY]:
+                    break
+                else:
+                    raise PGPBlockLeaderError("Unacceptable block leader.")
+
+        except IndexError:
+            self._ranges.append((pkts[start].tag.type, start - idx, i - idx))
+
+        self._pkts = [pkts[j] for j in range(idx, i)]
+
+    # Build block number `n` of a lazy key message, or None if it's a
+    # sub-block without a local binding.
+    def __block(self, n):
+        if n not in self._blocks:
+            block = Block(self.primary_id, self._pkts, idx=self._ranges[n][1])
+
+            if n and not block.local_bindings:
+                block = None # subblocks require a primary key binding
+
+            self._blocks[n] = block
+
+        return self._blocks[n]
+
+    # Whether `_b_*` attribute `name` is still to be built.
+    def __lazy(self, name):
+        return '_pkts' in self.__dict__ and name not in self.__dict__
+
+    # Block numbers of the blocks for `_b_*` attribute `name`.
+    def __list_blocks(self, name):
+        types = self._lazy_attrs[name]
+        return [n for n in range(len(self._ranges)) if self._ranges[n][0] in types]
+
+    # Build only the blocks for `_b_*` attribute `name` whose leaders
+    # `match()` and return the first one the attribute would hold, or None.
+    # A later block replaces an earlier one with the same user ID or key ID
+    # (see `add_subblock()`).
+    def __find_block(self, name, match):
+        keys, found = [], {}
+
+        for n in self.__list_blocks(name):
+
+            if match(self._pkts[self._ranges[n][1]]) and self.__block(n):
+                block = self.__block(n)
+
+                if PKT_USERID == block.type:
+                    key = block.leader.body.value
+                else:
+                    key = block.leader.body.id
+
+                if key not in found:
+                    keys.append(key)
+
+                found[key] = block
+
+        if keys:
+            return found[keys[0]]
+
     def add_block(self, block):
         """Add a block to the key message.
 
@@ -145,11 +282,14 @@ class PublicKeyMsg(KeyMsg):
         target_upper = target.upper()
 
         if 'key' == blocktype:
-            primary = self._b_primary.leader
 
-            if target_upper in [primary.body.fingerprint, primary.body.id]:
+            if target_upper in [self.primary_fprint, self.primary_id]:
                 return self._b_primary
-            
+
+            if self.__lazy('_b_subkeys'):
+                return self.__find_block('_b_subkeys', lambda pkt:
+                                         target_upper in [pkt.body.fingerprint, pkt.body.id])
+
             for block in self._b_subkeys.values():
                 ids = [block.leader.body.fingerprint, block.leader.body.id]
 
@@ -158,6 +298,10 @@ class PublicKeyMsg(KeyMsg):
 
         elif 'userid' == blocktype:
 
+            if self.__lazy('_b_userids'):
+                return self.__find_block('_b_userids', lambda pkt:
+                                         target in pkt.body.value)
+
             for block in self._b_userids.values():
 
                 if target in block.leader.body.value:
@@ -202,6 +346,13 @@ class PublicKeyMsg(KeyMsg):
         if keyid in [self.primary_id, self.primary_fprint]:
             return self._b_primary.leader
 
+        elif self.__lazy('_b_subkeys'):
+            block = self.__find_block('_b_subkeys', lambda pkt:
+                                      keyid in [pkt.body.id, pkt.body.fingerprint])
+
+            if block:
+                return block.leader
+
         else:
 
             for keypkt in [b.leader for b in self._b_subkeys.values()]:
@@ -225,7 +376,8 @@ class PublicKeyMsg(KeyMsg):
     def list_keyids(self):
         """Retrieve the entire list of key IDs in a key message.
 
-        :Returns: list of key ID strings
+        :Returns: list of key ID strings, primary first and then the
+            subkeys in message order
 
         Since the primary key and subkeys are in different blocks,
         this function allows an easy check to see if a key ID exists
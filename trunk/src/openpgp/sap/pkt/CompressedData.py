@@ -31,6 +31,7 @@ from openpgp.code import *
 class CompressedData(Packet):
     __doc__ = """Compressed Data Packet
     """ + Packet._ivars
+    __slots__ = ()
 
     def __init__(self, *args, **kwords):
         try:
@@ -15,6 +15,7 @@ from openpgp.sap.exceptions import *
 class LiteralData(Packet):
     __doc__ = """Literal Data Packet
     """ + Packet._ivars
+    __slots__ = ()
 
     def __init__(self, *args, **kwords):
         try:
@@ -27,8 +27,7 @@ from openpgp.sap.exceptions import *
 # refers to the size of the entire object in question (here, the
 # entire MPI object) and 'length' specifies the length of "internal" 
 # components.
-# TODO leftover ugliness in check()
-class MPI:
+class MPI(object):
     """Multi-Precision Integer
 
     :IVariables:
@@ -41,7 +40,15 @@ class MPI:
           specifier + integer)
         - `_d`: string used to build the MPI
         - `_int_d`: MPI integer data string
+
+    An MPI keeps a reference to the string it was filled from and its
+    offset there, instead of its own copies of the data, since a key or
+    signature body holds several of them. `_d`, `_int_d` and `_length_d`
+    are sliced out when asked for and `value` is converted the first time
+    it's asked for.
     """
+    __slots__ = ('_buf', '_idx', 'length', 'bit_length', 'size', '_value')
+
     def __init__(self, *args, **kwords):
         if kwords.has_key('int'):
             self.__create(kwords['int'])
@@ -51,29 +58,17 @@ class MPI:
             except IndexError:
                 pass
 
-    # TODO no sleep ~ questionable tactics
-    def fill(self, d):
-        import struct
-        idx = 0
-        self._length_d, idx = STN.strcalc(None, d[idx:idx+2], idx)
-
-        self.bit_length = STN.str2int(self._length_d)
-        self.length = STN.mpilen2int(self._length_d)
-
-        self._d = d[0:2+self.length]
-        self._int_d = d[idx:idx+self.length]
-        self.size = len(self._d) # explicitly..
-
-        i = struct.unpack('>'+str(len(self._int_d))+'s', self._int_d)[0]
-        self.value = STN.str2int(i) 
-
-        if self.check():
-            pass
-        else:
-            raise self.err[0], self.err[1]
+    def fill(self, d, idx=0):
+        length_d = d[idx:idx+2]
+        self.bit_length = STN.str2int(length_d)
+        self.length = STN.mpilen2int(length_d)
+        self._buf, self._idx = d, idx
+        self.size = min(len(d) - idx, 2 + self.length)
+        self._value = None
+        self.check()
 
     def check(self):
-        int_len = len(self._int_d)
+        int_len = max(0, self.size - 2)
 
         if int_len == self.length:
 
@@ -88,6 +83,18 @@ class MPI:
 
         raise PGPFormatError(m)
 
+    _d = property(lambda self: self._buf[self._idx:self._idx+self.size])
+    _int_d = property(lambda self: self._buf[self._idx+2:self._idx+self.size])
+    _length_d = property(lambda self: self._buf[self._idx:self._idx+2])
+
+    def _get_value(self):
+        if self._value is None:
+            self._value = STN.str2int(self._int_d)
+
+        return self._value
+
+    value = property(_get_value)
+
 def create_MPI(i):
     """Create an MPI out of an integer.
 
@@ -96,38 +103,19 @@ def create_MPI(i):
 
     :Returns: `MPI` instance
     """
-    d = []
-    i_d = STN.int2str(i)
-    i_length = len(i_d)
-    bit_count = STN.sigbits(i_d[0]) + (8 * (i_length - 1))
-    i_length_str = STN.int2str(bit_count)
-
-    if 2 < len(i_length_str):
-        raise ValueError, "int is larger than two octets can specify - int occupies %s octets" % str(i_length)
-
-    elif 1 == len(i_length_str):
-        i_length_str = ''.join(['\x00', i_length_str])
-
-    d.append(i_length_str)
-    d.append(i_d)
-
-    return MPI(''.join(d))
+    return MPI(STN.int2mpi(i))
 
-# TODO Slice-copying large chunks of the data string (taking place
-# right before this function is called) could be replaced by
-# piecing things together with the complete data string, using the
-# index along the way, then only slicing that which was used for the
-# instance.
 def strcalc_mpi(d, idx):
     """Return a MPI instance and an incremented index.
 
     :Parameters:
-        - `d`: string of data starting with the first octet of the MPI
-        - `idx`: integer position in external data string
+        - `d`: string of data containing the MPI
+        - `idx`: integer position of the first octet of the MPI in `d`
 
     :Returns:
         - tuple (MPI_instance, new_index):
             - `MPI_instance`: MPI instance created using string `d`
+              from position `idx`
             - `new_index`: integer original `idx` parameter
               incremented by the octet length of the S2K instance
 
@@ -142,5 +130,6 @@ def strcalc_mpi(d, idx):
         used to build the MPI instance, but boy would it make the calling
         code look ugly.
     """
-    mpi = MPI(d)
+    mpi = MPI()
+    mpi.fill(d, idx)
     return mpi, idx + mpi.size
@@ -9,6 +9,7 @@ from Packet import Packet
 class Marker(Packet):
     __doc__ = """Marker Packet
     """ + Packet._ivars
+    __slots__ = ()
 
     def __init__(self, *args, **kwords):
         try:
@@ -9,6 +9,7 @@ from Packet import Packet
 class ModificationDetectionCode(Packet):
     __doc__ = """Modification Detection Code Packet
     """ + Packet._ivars
+    __slots__ = ()
 
     def __init__(self, *args, **kwords):
         try:
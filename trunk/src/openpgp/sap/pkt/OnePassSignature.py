@@ -15,6 +15,7 @@ from openpgp.sap.exceptions import *
 class OnePassSignature(Packet):
     __doc__ = """One-Pass Signature Packet
     """ + Packet._ivars
+    __slots__ = ()
 
     def __init__(self, *args, **kwords):
         try:
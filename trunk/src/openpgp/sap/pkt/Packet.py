@@ -26,6 +26,30 @@ pktclasses = {0:"Reserved",
               19:"ModificationDetectionCode",
               60:"TestPGP"}
 
+# packet type code by tag octet, None where the octet isn't a valid tag
+tag_types = tuple([None] * 128 + [(o & 60) >> 2 for o in range(128, 192)] +
+                  [o & 63 for o in range(192, 256)])
+
+_pkttable = [] # packet classes indexed by type code, see _load_pktclasses()
+_registered = {} # type code: class, see register_pktclass()
+
+def _load_pktclasses():
+    """Fill the packet class table.
+
+    The packet modules import this one, so their classes are imported the
+    first time a class is asked for instead of when this module loads.
+    """
+    table = [None] * 64 # a tag has six bits of type
+
+    for i, cn in pktclasses.items():
+        mod = __import__("openpgp.sap.pkt.%s" % cn, None, None, [cn])
+        table[i] = mod.__dict__[cn]
+
+    for i, cls in _registered.items():
+        table[i] = cls
+
+    _pkttable[:] = table
+
 def pktclass(i):
     """Return an OpenPGP packet class given packet type code.
 
@@ -34,24 +58,56 @@ def pktclass(i):
 
     :Returns: `OpenPGP.packet.Packet` subclass
 
-    See rfc2440 4.3.
+    :Exceptions:
+        - `NotImplementedError`: there is no class for packet type `i`
+
+    See rfc2440 4.3. Classes are looked up in a table indexed by type code,
+    filled once (see `register_pktclass()` for private/experimental types).
 
     Example:
 
         >>> userid = pktclass(13)()
         >>> userid.value = "Some Name <somename@email.com>"
     """
-    if i in pktclasses:
-        cn = pktclasses[i]
-        mod = __import__("openpgp.sap.pkt.%s" % cn, None, None, [cn])
-        pktclass = mod.__dict__[cn]
-        return pktclass
+    if not 0 <= i < 64: # a tag has six bits of type
+        raise NotImplementedError("Unsupported packet type->(%s)." % i)
+
+    if not _pkttable:
+        _load_pktclasses()
+
+    cls = _pkttable[i]
+
+    if cls is None:
+        raise NotImplementedError("Unsupported packet type->(%s)." % i)
+
+    return cls
+
+def register_pktclass(i, cls):
+    """Use a class for a private/experimental packet type.
+
+    :Parameters:
+        - `i`: integer packet type code, 60 through 63
+        - `cls`: `Packet` subclass to use for type `i`, or None to go back
+          to the default (`TestPGP` for 60, nothing for 61 through 63)
 
+    :Exceptions:
+        - `ValueError`: `i` isn't a private/experimental type
+
+    Types 60 through 63 are set aside for private or experimental use (rfc2440
+    4.3), the rest belong to the standard and can't be replaced.
+    """
+    if not 60 <= i <= 63:
+        raise ValueError("Only private/experimental packet types (60-63) can be registered. Received %s" % i)
+
+    if cls is None:
+        _registered.pop(i, None)
     else:
-        from Unknown import Unknown
-        return Unknown
+        _registered[i] = cls
 
-class Tag:
+    if _pkttable:
+        _load_pktclasses()
+
+class Tag(object):
     """OpenPGP Packet Tag Class
 
     :IVariables: 
@@ -61,6 +117,7 @@ class Tag:
         - `length_type`: (0,1,2,3) set only if packet tag is "old"
         - `_d`: data string used to create `Tag` instance
     """
+    __slots__ = ('version', 'type', 'length_type', '_d')
     
     def __init__(self, *args, **kwords):
         try:
@@ -110,13 +167,14 @@ class Tag:
             raise PGPFormatError("Invalid tag data. Check len(d)=1, (ord(d) & 128)==128. Received->(%s)" % d)
 
 
-class OldLength:
+class OldLength(object):
     """OpenPGP "Old Length" Class
 
     :IVariables:
         - `size`: integer number of octets occupied by packet body
         - `_d`: data string used to create `OldLength` instance
     """
+    __slots__ = ('_d', 'size')
 
     def __init__(self, *args, **kwords):
         try:
@@ -154,13 +212,14 @@ class OldLength:
             raise PGPFormatError, "Old packet length data must come in 0, 1, 2, or 4 octets. Received->(%s octets)." % (str(len(d)))
 
 
-class NewLength:
+class NewLength(object):
     """OpenPGP "New Length" Class
 
     :IVariables:
         - `size`: integer number of octets occupied by packet body
         - `_d`: data string used to create `NewLength` instance
     """
+    __slots__ = ('_d', 'size')
 
     def __init__(self, *args, **kwords):
         try:
@@ -253,7 +312,7 @@ class NewLength:
         return size, length_list
 
 
-class Packet:
+class Packet(object):
     _ivars = """
     :IVariables:
         - `tag`: packet tag object (see `OpenPGP.packet.Tag`)
@@ -265,7 +324,15 @@ class Packet:
         - `size`: integer octet count of entire packet
     """
     __doc__ = """OpenPGP Packet Class
+
+    Packets filled with `lazy` set (see `fill()`) hold on to their body data
+    and only create `body` the first time it is accessed.
+
+    Packets and their tags and lengths have no instance dictionary (see
+    `__slots__`), a keyring can hold a great many of them. Subclasses
+    declare empty `__slots__` to keep it that way.
     """ + _ivars
+    __slots__ = ('tag', 'length', 'body', 'size', 'err', '_body_d')
 
     def __init__(self, *args, **kwords):
         try:
@@ -275,10 +342,31 @@ class Packet:
 
     def rawstr(self):
         try:
-            return ''.join([self.tag._d, self.length._d, self.body._d])
+            return ''.join([self.tag._d, self.length._d, self._body_data()])
         except:
             raise PGPFormatError("Packet data is incomplete, cannot return raw string.")
 
+    def __getattr__(self, name):
+        # lazy packets create their body on first access (see fill())
+        if 'body' == name:
+            body_d = getattr(self, '_body_d', None)
+
+            if body_d is not None:
+                self._body_d = None
+                self.fill_body(body_d)
+                return self.body
+
+        raise AttributeError(name)
+
+    # raw body data, without creating a lazy packet's body
+    def _body_data(self):
+        body_d = getattr(self, '_body_d', None)
+
+        if body_d is None:
+            return self.body._d
+        else:
+            return body_d
+
     #def __getattr__(self, name):
     #    if '_d' == name:
     #        try:
@@ -291,11 +379,16 @@ class Packet:
     def __nonzero__(self): # egads
         return True
 
-    def fill(self, d):
+    def fill(self, d, idx=0, lazy=False):
         """Set the Packet instances's data, filling its attributes.
 
         :Parameters:
             - `d`: string of OpenPGP packet data
+            - `idx`: optional integer offset of the packet tag in `d`
+              (default 0)
+            - `lazy`: optional True or False (default False), set to True to
+              parse only the tag and length now and leave the body to be
+              created the first time `body` is accessed
 
         :Returns: Nothing
  
@@ -303,6 +396,10 @@ class Packet:
         (tag, length, body, and possibly partial length/body 
         interlacing).
 
+        Only the octets used by the packet are sliced out of `d`, so `d`
+        may be a large buffer (or a memory-mapped file, see
+        `openpgp.sap.list.list_pkts()`) of many packets.
+
         Example:
 
             >>> tag = chr(0xb4) # old version, user id (type 13), single octet length
@@ -320,19 +417,20 @@ class Packet:
         # is determined after the fact and must match up with the body
         # data recovered in order to pass a selfcheck().
         # TODO see how much of the new length logic can use NewLength.data2size.
-        self.tag = Tag(d[0:1])
+        self.tag = Tag(d[idx:idx+1])
+        idx = idx + 1
+
         if 0 == self.tag.version: # old
             lo = [1, 2, 4, 0][self.tag.length_type] # [length octs][length type]
-            idx = 1 + lo
-            self.length = OldLength(d[1:idx])
+            self.length = OldLength(d[idx:idx+lo])
+            idx = idx + lo
 
             if 'UNDEFINED' == self.length.size:
-                self.fill_body(d[idx:])
+                body_d = d[idx:]
             else:
-                self.fill_body(d[idx:idx+self.length.size])
+                body_d = d[idx:idx+self.length.size]
 
         elif 1 == self.tag.version: # new
-            idx = 1
             bodydata, lengthdata = [], []
             L1 = d[idx:idx+1]
             L1_ord = ord(L1)
@@ -368,9 +466,15 @@ class Packet:
             else:
                 raise PGPError, "Extreme weirdness. Fix source."
             self.length = NewLength(''.join(lengthdata))
-            self.fill_body(''.join(bodydata))
+            body_d = ''.join(bodydata)
+
+        if lazy:
+            self._body_d = body_d
+        else:
+            self._body_d = None
+            self.fill_body(body_d)
 
-        self.size = len(self.tag._d) + len(self.length._d) + len(self.body._d)
+        self.size = len(self.tag._d) + len(self.length._d) + len(self._body_data())
 
         if self.check():
             return 1
@@ -392,7 +496,7 @@ class Packet:
         """
         if 0x80 == 0x80 & ord(self.tag._d): 
             if 1 == len(self.tag._d): 
-                if len(self.body._d) == self.length.size or 'UNDEFINED' == self.length.size: 
+                if len(self._body_data()) == self.length.size or 'UNDEFINED' == self.length.size: 
                     return 1
                 else:
                     self.err = (PGPValueError, "Packet length size doesn't match body size.")
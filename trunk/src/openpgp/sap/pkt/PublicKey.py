@@ -9,10 +9,8 @@ their respective keys physically appear in the packet (same goes for
 secret keys, in fact it's more important since the order must be known
 to decrypt them properly).
 """
-import sha
-import md5
-
 import openpgp.sap.util.strnum as STN
+import openpgp.sap.hashes as HASH
 
 from openpgp.code import *
 from openpgp.sap.exceptions import *
@@ -24,6 +22,7 @@ from Packet import Packet
 class PublicKey(Packet):
     __doc__ = """Public Key Packet
     """ + Packet._ivars
+    __slots__ = ()
 
     def __init__(self, *args, **kwords):
         try:
@@ -34,7 +33,7 @@ class PublicKey(Packet):
     def fill_body(self, d):
         self.body = PublicKeyBody(d)
 
-class PublicKeyBody:
+class PublicKeyBody(object):
     _title = """Public Key
     """
     _ivars = """ 
@@ -44,7 +43,8 @@ class PublicKeyBody:
         - `alg`: integer public key algorithm (rfc2440 9.1)
         - `fingerprint`: string key fingerprint in hexidecimal (all capitals)
         - `id`: string key id hexidecimal (all capitals)
-        - `_mpi_d`: string of all raw MPI data (in order)
+        - `_mpi_d`: string of all raw MPI data (in order), sliced out of
+          `_d` when asked for
         - `_d`: string of raw packet body data
         - `expires`: **version 2 & 3 only** int days until expiration
         - `RSA_n`: **RSA keys only** MPI instance "n", RSA public modulus
@@ -64,6 +64,10 @@ class PublicKeyBody:
     `pubkey.ELGAMAL_y.value`.
     """
     __doc__ = ''.join([_title, _ivars, _notes])
+    __slots__ = ('_d', 'version', 'created', 'expires', 'alg', 'fingerprint',
+                 'id', '_mpi_idx', '_mpi_end', 'RSA_n', 'RSA_e', 'DSA_p',
+                 'DSA_q', 'DSA_g', 'DSA_y', 'ELGAMAL_p', 'ELGAMAL_g',
+                 'ELGAMAL_y')
 
     def __init__(self, *args, **kwords):
         try:
@@ -71,6 +75,8 @@ class PublicKeyBody:
         except IndexError:
             pass
 
+    _mpi_d = property(lambda self: self._d[self._mpi_idx:self._mpi_end])
+
     def __set_v4(self, created=0):
         d = []
         d.append('\x04')
@@ -108,35 +114,35 @@ class PublicKeyBody:
             self.created, idx = STN.strcalc(STN.str2int, __created_d, idx)
 
             if self.version in [2, 3]:
-                self.__expires_d = d[idx:idx+2]
-                self.expires, idx = STN.strcalc(STN.str2int, self.__expires_d, idx)
+                __expires_d = d[idx:idx+2]
+                self.expires, idx = STN.strcalc(STN.str2int, __expires_d, idx)
 
             __alg_d = d[idx:idx+1]
             self.alg, idx = STN.strcalc(STN.str2int, __alg_d, idx)
+            self._mpi_idx = idx
 
             # resolve MPIs
             if self.alg in [ASYM_RSA_EOS, ASYM_RSA_E, ASYM_RSA_S]:
-                self.RSA_n, idx = MPI.strcalc_mpi(d[idx:], idx)
-                self.RSA_e, idx = MPI.strcalc_mpi(d[idx:], idx)
-                self._mpi_d = self.RSA_n._d + self.RSA_e._d
+                self.RSA_n, idx = MPI.strcalc_mpi(d, idx)
+                self.RSA_e, idx = MPI.strcalc_mpi(d, idx)
             elif ASYM_DSA == self.alg:
-                self.DSA_p, idx = MPI.strcalc_mpi(d[idx:], idx)
-                self.DSA_q, idx = MPI.strcalc_mpi(d[idx:], idx)
-                self.DSA_g, idx = MPI.strcalc_mpi(d[idx:], idx)
-                self.DSA_y, idx = MPI.strcalc_mpi(d[idx:], idx)
-                self._mpi_d = self.DSA_p._d + self.DSA_q._d + self.DSA_g._d + self.DSA_y._d
+                self.DSA_p, idx = MPI.strcalc_mpi(d, idx)
+                self.DSA_q, idx = MPI.strcalc_mpi(d, idx)
+                self.DSA_g, idx = MPI.strcalc_mpi(d, idx)
+                self.DSA_y, idx = MPI.strcalc_mpi(d, idx)
             elif self.alg in [ASYM_ELGAMAL_E, ASYM_ELGAMAL_EOS]:
-                self.ELGAMAL_p, idx = MPI.strcalc_mpi(d[idx:], idx)
-                self.ELGAMAL_g, idx = MPI.strcalc_mpi(d[idx:], idx)
-                self.ELGAMAL_y, idx = MPI.strcalc_mpi(d[idx:], idx)
-                self._mpi_d = self.ELGAMAL_p._d + self.ELGAMAL_g._d + self.ELGAMAL_y._d
+                self.ELGAMAL_p, idx = MPI.strcalc_mpi(d, idx)
+                self.ELGAMAL_g, idx = MPI.strcalc_mpi(d, idx)
+                self.ELGAMAL_y, idx = MPI.strcalc_mpi(d, idx)
             else:
                 raise NotImplementedError("Unsupported key algorithm. Received alg->(%s)" % self.alg)
 
+            self._mpi_end = idx
+
             # set fingerprint
             if self.version in [2, 3]:
                 integer_data = self.RSA_n._int_d + self.RSA_e._int_d
-                self.fingerprint = md5.new(integer_data).hexdigest().upper()
+                self.fingerprint = HASH.new(HASH_MD5, integer_data).hexdigest().upper()
                 # see fingerprint/id notes in doc/NOTES.txt
                 self.id = STN.str2hex(self.RSA_n._int_d[-8:])
             elif 4 == self.version:
@@ -147,7 +153,7 @@ class PublicKeyBody:
                 lo = (chr(0xff & length)) # low order packet length
                 f.append(hi + lo) 
                 f.append(f_data)
-                self.fingerprint = sha.new(''.join(f)).hexdigest().upper()
+                self.fingerprint = HASH.new(HASH_SHA1, ''.join(f)).hexdigest().upper()
                 # see fingerprint/id notes in doc/NOTES.txt
                 self.id = self.fingerprint[-16:]
 
@@ -19,6 +19,7 @@ from Packet import Packet
 class PublicKeyEncryptedSessionKey(Packet):
     __doc__ = """Public Key Encrypted Session Key Packet
     """ + Packet._ivars
+    __slots__ = ()
 
     def __init__(self, *args, **kwords):
         try:
@@ -55,11 +56,11 @@ class PublicKeyEncryptedSessionKeyBody:
         self.alg_pubkey, idx = STN.strcalc(STN.str2int, d[idx:idx+1], idx)
 
         if self.alg_pubkey in [ASYM_RSA_EOS, ASYM_RSA_E, ASYM_RSA_S]:
-            self.RSA_me_modn, idx = MPI.strcalc_mpi(d[idx:], idx)
+            self.RSA_me_modn, idx = MPI.strcalc_mpi(d, idx)
 
         elif ASYM_ELGAMAL_E == self.alg_pubkey:
-            self.ELGAMAL_gk_modp, idx = MPI.strcalc_mpi(d[idx:], idx)
-            self.ELGAMAL_myk_modp, idx = MPI.strcalc_mpi(d[idx:], idx)
+            self.ELGAMAL_gk_modp, idx = MPI.strcalc_mpi(d, idx)
+            self.ELGAMAL_myk_modp, idx = MPI.strcalc_mpi(d, idx)
 
         else:
             raise PGPValueError, "Unsupported public key algorithm. Received alg_pubkey->(%s)" % self.alg_pubkey
@@ -9,6 +9,7 @@ from PublicKey import PublicKey, PublicKeyBody
 class PublicSubkey(PublicKey):
     __doc__ = """Public Subkey Packet
     """ + PublicKey._ivars
+    __slots__ = ()
 
     def __init__(self, *args, **kwords):
         try:
@@ -27,6 +28,7 @@ class PublicSubkeyBody(PublicKeyBody):
     _notes = PublicKeyBody._notes 
     __doc__ = ''.join([_title, _ivars, _notes])
     # please excuse the __doc__ voodoo
+    __slots__ = ()
     
     def __init__(self, *args, **kwords):
         try:
@@ -19,6 +19,7 @@ from Packet import Packet
 
 
 class Reserved(Packet):
+    __slots__ = ()
 
     def __init__(self, *args, **kwords):
         try:
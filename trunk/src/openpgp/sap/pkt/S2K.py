@@ -34,10 +34,10 @@ class S2K:
         except IndexError:
             pass
 
-    def fill(self, d):
+    def fill(self, d, idx=0):
         """
         """
-        idx = 0
+        start = idx
         self.type, idx = STN.strcalc(STN.str2int, d[idx:idx+1], idx)
         self.alg_hash, idx = STN.strcalc(STN.str2int, d[idx:idx+1], idx)
 
@@ -49,7 +49,7 @@ class S2K:
                 self.count_code = c
                 self.count = (16 + (c & 15)) << ((c >> 4) + 6)
 
-        self._d = d[0:idx]
+        self._d = d[start:idx]
         #hexify = lambda s: ''.join(['\\x%s' % hex(ord(c))[2:].zfill(2) for c in s])
         #print hexify(self._d)
         self.size = len(self._d)
@@ -109,18 +109,13 @@ def create_S2K(*args, **kwords):
             d.append('\x63') # 99
     return S2K(''.join(d))
 
-# TODO Slice-copying large chunks of the data string (taking place
-# right before this function is called) could be replaced by
-# piecing things together with the complete data string, using the
-# index along the way, then only slicing that which was used for the
-# instance.
 def strcalc_s2k(d, idx):
     """Return a S2K instance and an incremented index.
 
     :Parameters:
-        - `d`: string of data starting with the first octet of the
-          string-to-key specifier
-        - `idx`: integer position in external data string
+        - `d`: string of data containing the string-to-key specifier
+        - `idx`: integer position of the first octet of the string-to-key
+          specifier in `d`
 
     :Returns: tuple (S2K_instance, new_index) (see `S2K tuple`_)
 
@@ -128,7 +123,8 @@ def strcalc_s2k(d, idx):
 
     S2K tuple:
 
-        - `S2K_instance`: S2K instance created using string `d`
+        - `S2K_instance`: S2K instance created using string `d` from
+          position `idx`
         - `new_index`: integer original `idx` parameter
           incremented by the octet length of the S2K instance
 
@@ -143,5 +139,6 @@ def strcalc_s2k(d, idx):
         used to build the S2K instance, but boy would it make the calling
         code look ugly.
     """
-    s2k = S2K(d)
+    s2k = S2K()
+    s2k.fill(d, idx)
     return s2k, idx + s2k.size
@@ -38,6 +38,7 @@ from PublicKey import PublicKey, PublicKeyBody
 class SecretKey(PublicKey):
     __doc__ = """Secret Key Packet
     """ + PublicKey._ivars
+    __slots__ = ()
 
     def __init__(self, *args, **kwords):
         try:
@@ -105,7 +106,7 @@ class SecretKeyBody(PublicKeyBody):
 
             if self.s2k_usg in [254, 255]: # encrypted MPIs
                 self.alg_sym, idx = STN.strcalc(STN.str2int, d[idx:idx+1], idx)
-                self.s2k, idx = S2K.strcalc_s2k(d[idx:], idx)
+                self.s2k, idx = S2K.strcalc_s2k(d, idx)
 
                 if 0 == self.alg_sym: # plaintext or unencrypted data
                     self.__resolve_secmpi(idx)
@@ -155,18 +156,18 @@ class SecretKeyBody(PublicKeyBody):
         d = self._d
         # 1:RSA (Encrypt or Sign), 2:RSA Encrypt-Only, 3:RSA Sign-Only
         if self.alg in [1, 2, 3]:
-            self.RSA_d, idx = MPI.strcalc_mpi(d[idx:], idx)
-            self.RSA_p, idx = MPI.strcalc_mpi(d[idx:], idx)
-            self.RSA_q, idx = MPI.strcalc_mpi(d[idx:], idx)
-            self.RSA_u, idx = MPI.strcalc_mpi(d[idx:], idx)
+            self.RSA_d, idx = MPI.strcalc_mpi(d, idx)
+            self.RSA_p, idx = MPI.strcalc_mpi(d, idx)
+            self.RSA_q, idx = MPI.strcalc_mpi(d, idx)
+            self.RSA_u, idx = MPI.strcalc_mpi(d, idx)
             self._secmpi_d = self.RSA_d._d + self.RSA_p._d + self.RSA_q._d + self.RSA_u._d
         # 17:DSA (Digital Signature Algorithm)
         elif 17 == self.alg:
-            self.DSA_x, idx = MPI.strcalc_mpi(d[idx:], idx)
+            self.DSA_x, idx = MPI.strcalc_mpi(d, idx)
             self._secmpi_d = self.DSA_x._d
         # 16:Elgamal (Encrypt-Only), 20:Elgamal (Encrypt or Sign)
         elif self.alg in [16, 20]:
-            self.ELGAMAL_x, idx = MPI.strcalc_mpi(d[idx:], idx)
+            self.ELGAMAL_x, idx = MPI.strcalc_mpi(d, idx)
             self._secmpi_d = self.ELGAMAL_x._d
         else:
             self.err = (ValueError, "Unsupported key algorithm. Received alg->(%s)" % (str(self.alg)))
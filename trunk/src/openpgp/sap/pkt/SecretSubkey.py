@@ -10,6 +10,7 @@ from SecretKey import SecretKey, SecretKeyBody
 class SecretSubkey(SecretKey):
     __doc__ = """Secret Subkey Packet
     """ + SecretKey._ivars
+    __slots__ = ()
 
     def __init__(self, *args, **kwords):
         try:
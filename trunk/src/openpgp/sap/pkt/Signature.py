@@ -1,5 +1,6 @@
 "Signature packets RFC 2440.5.2"
 
+import struct
 import binascii
 
 import openpgp.sap.util.strnum as STN
@@ -15,6 +16,7 @@ class SignatureSubpacketValueError(PGPError): pass
 class Signature(Packet):
     __doc__ = """Signature Packet
     """ + Packet._ivars
+    __slots__ = ()
 
     def __init__(self, *args, **kwords):
         try:
@@ -26,7 +28,7 @@ class Signature(Packet):
         self.body = SignatureBody(d)
 
 # TODO Exception for v3 w/ hash_len != 5, right now it's just passed over.
-class SignatureBody:
+class SignatureBody(object):
     """Signature Body
 
     :IVariables:
@@ -43,7 +45,8 @@ class SignatureBody:
         - `hash_frag`: string of first (high) 2 octets in signed hash
           value 
         - `hashed_data`: string of data used in signature hashes (from
-          version to the end of the hashed subpackets)
+          version to the end of the hashed subpackets), made from `_d`
+          when asked for
         - `_d`: string of raw packet body data
         - `hashed_subpkts`: list of `SignatureSubpacket` instances
           (empty for version 3 signatures)
@@ -57,22 +60,36 @@ class SignatureBody:
         - `ELGAMAL_b`: **ElGamal keys only** MPI instance ElGamal
           value "b"
     """
+    __slots__ = ('_d', 'version', 'type', 'keyid', 'created', 'alg_pubkey',
+                 'alg_hash', 'hash_frag', '_hashed_end', 'hashed_subpkts',
+                 'unhashed_subpkts', 'RSA', 'DSA_r', 'DSA_s', 'ELGAMAL_a',
+                 'ELGAMAL_b')
+
     def __init__(self, *args, **kwords):
         try:
             self.fill(args[0])
         except IndexError:
             pass
 
+    def _get_hashed_data(self):
+        if 4 == self.version: # with the trailer
+            hashed_d = self._d[:self._hashed_end]
+            bigend = struct.pack('>i', len(hashed_d))[-4:]
+            return ''.join([hashed_d, self._d[0], '\xff', bigend])
+        else:
+            return self._d[2:self._hashed_end]
+
+    hashed_data = property(_get_hashed_data)
+
     def fill(self, d):
         self._d = d
-        version_d = d[0]
         self.version, idx = STN.strcalc(STN.str2int, d[0], 0)
 
         if self.version in [2, 3]:
             hash_len, idx = STN.strcalc(STN.str2int, d[idx:idx+1], idx)
             self.type, idx = STN.strcalc(STN.str2int, d[idx:idx+1], idx)
             self.created, idx = STN.strcalc(STN.str2int, d[idx:idx+4], idx)
-            self.hashed_data = d[2:idx]
+            self._hashed_end = idx
             self.keyid, idx = STN.strcalc(STN.str2hex, d[idx:idx+8], idx)
             self.alg_pubkey, idx = STN.strcalc(STN.str2int, d[idx:idx+1], idx)
             self.alg_hash, idx = STN.strcalc(STN.str2int, d[idx:idx+1], idx)
@@ -80,22 +97,19 @@ class SignatureBody:
             self.unhashed_subpkts = [] #
 
         elif 4 == self.version:
-            import struct
             _type_d, idx = STN.strcalc(None, d[idx:idx+1], idx)
             self.type = STN.str2int(_type_d)
             self.alg_pubkey, idx = STN.strcalc(STN.str2int, d[idx:idx+1], idx)
             self.alg_hash, idx = STN.strcalc(STN.str2int, d[idx:idx+1], idx)
             # hashed subpackets
             subpkts_len, idx = STN.strcalc(STN.str2int, d[idx:idx+2], idx)
-            self.hashed_subpkts = self.__resolve_subpkts(d[idx:idx+subpkts_len])
-            # hashed data & trailer - should '>i' ever return more than 4 chars?
-            hashed_data = d[0:idx+subpkts_len]
-            bigend = struct.pack('>i', len(hashed_data))[-4:] 
-            self.hashed_data = ''.join([hashed_data, version_d, '\xff', bigend])
+            self.hashed_subpkts = self.__resolve_subpkts(d, idx, idx+subpkts_len)
+            # hashed data (see hashed_data)
+            self._hashed_end = idx + subpkts_len
             idx = idx + subpkts_len
             # unhashed subpackets
             subpkts_len, idx = STN.strcalc(STN.str2int, d[idx:idx+2], idx)
-            self.unhashed_subpkts = self.__resolve_subpkts(d[idx:idx+subpkts_len])
+            self.unhashed_subpkts = self.__resolve_subpkts(d, idx, idx+subpkts_len)
             idx = idx + subpkts_len
             # attribute convenience
             self.keyid = self.__set_subpkt_attr(SIGSUB_SIGNERID) or ''
@@ -107,15 +121,15 @@ class SignatureBody:
         self.hash_frag, idx = STN.strcalc(None, d[idx:idx+2], idx)
 
         if self.alg_pubkey in [ASYM_RSA_S, ASYM_RSA_EOS]:
-            self.RSA, idx = MPI.strcalc_mpi(d[idx:], idx)
+            self.RSA, idx = MPI.strcalc_mpi(d, idx)
 
         elif ASYM_DSA == self.alg_pubkey:
-            self.DSA_r, idx = MPI.strcalc_mpi(d[idx:], idx)
-            self.DSA_s, idx = MPI.strcalc_mpi(d[idx:], idx)
+            self.DSA_r, idx = MPI.strcalc_mpi(d, idx)
+            self.DSA_s, idx = MPI.strcalc_mpi(d, idx)
 
         elif self.alg_pubkey in [ASYM_ELGAMAL_EOS]:
-            self.ELGAMAL_a, idx = MPI.strcalc_mpi(d[idx:], idx)
-            self.ELGAMAL_b, idx = MPI.strcalc_mpi(d[idx:], idx)
+            self.ELGAMAL_a, idx = MPI.strcalc_mpi(d, idx)
+            self.ELGAMAL_b, idx = MPI.strcalc_mpi(d, idx)
 
         else:
             raise PGPValueError("Unsupported public-key algorithm (%d)." % self.alg_pubkey)
@@ -135,20 +149,19 @@ class SignatureBody:
 
         return None
 
-    # Do everything required to extract a field of subpackets.
-    def __resolve_subpkts(self, d):
-        idx = 0
+    # Do everything required to extract a field of subpackets (d[idx:end]).
+    def __resolve_subpkts(self, d, idx, end):
         subpkt_list = []
-        subpkt_data_len = len(d)
 
-        while idx < subpkt_data_len:
-            subpkt = SignatureSubpacket(d[idx:])
+        while idx < end:
+            subpkt = SignatureSubpacket()
+            subpkt.fill(d, idx)
             subpkt_list.append(subpkt)
-            idx += len(subpkt._d)
+            idx = subpkt._end
 
         return subpkt_list
 
-class SignatureSubpacket:
+class SignatureSubpacket(object):
     """Signature Subpacket
 
     :IVariables:
@@ -156,11 +169,15 @@ class SignatureSubpacket:
         - `value`: value of subpacket (see source)
         - `critical`: integer 0 or 1 indicating whether the subpacket
           deserves special attention (1) or not (0)
-        - `_d`: string data used to build instance
+        - `_d`: string data used to build instance, sliced out of the
+          string the subpacket was filled from when asked for
 
     It's safe to call this class with more data than is required by
     the subpacket.
     """
+    __slots__ = ('_buf', '_idx', '_end', 'type', 'critical', 'value')
+
+    _d = property(lambda self: self._buf[self._idx:self._end])
     def __init__(self, *args, **kwords):
         try:
             self.fill(args[0])
@@ -168,29 +185,37 @@ class SignatureSubpacket:
             pass
 
     # TODO should SIGSUB_CREATED, SIGSUB_REVOCABLE, etc. be a float? ..not yet
-    def fill(self, d):
-        ord_d = ord(d[0])
+    def fill(self, d, idx=0):
+        """Set the subpacket's data, filling its attributes.
+
+        :Parameters:
+            - `d`: string of data starting with the subpacket
+            - `idx`: optional integer offset of the subpacket in `d`
+              (default 0)
+
+        :Returns: Nothing
+        """
+        ord_d = ord(d[idx])
 
         if ord_d < 192:
-            slice = d[0]
+            len_slice = 1
             size = ord_d
 
         elif 192 <= ord_d < 255:
-            slice = d[:2]
-            #size = size + STN.doubleoct2int(slice)
-            size = STN.doubleoct2int(slice)
+            len_slice = 2
+            size = STN.doubleoct2int(d[idx:idx+2])
 
         elif 255 == ord_d:
-            slice = d[:5]
-            #size = size + STN.pentoct2int(slice)
-            size = STN.pentoct2int(slice)
+            len_slice = 5
+            size = STN.pentoct2int(d[idx:idx+5])
 
-        len_slice = len(slice)
-        self._d = d[:len_slice+size]
-        type_d = d[len_slice:len_slice+1]
+        start = idx + len_slice
+        self._buf, self._idx = d, idx
+        self._end = min(len(d), start + size)
+        type_d = d[start:start+1]
         self.type = 127 & ord(type_d)
         self.critical = 128 & ord(type_d)
-        value_d = d[len_slice+1:len_slice+size]
+        value_d = d[start+1:start+size]
 
         if SIGSUB_SIGNERID == self.type:
             self.value = STN.str2hex(value_d[:8])
@@ -43,6 +43,7 @@ class SymmetricKeyEncryptedSessionKey(Packet):
         - `has_key`: True or False, depending on whether or not the
           session key exists
     """
+    __slots__ = ()
 
     def __init__(self, *args, **kwords):
         try:
@@ -87,7 +88,7 @@ class SymmetricKeyEncryptedSessionKeyBody:
         idx = 0
         self.version, idx = STN.strcalc(STN.str2int, d[idx:idx+1], idx)
         self.alg, idx = STN.strcalc(STN.str2int, d[idx:idx+1], idx)
-        self.s2k, idx = S2K.strcalc_s2k(d[idx:], idx)
+        self.s2k, idx = S2K.strcalc_s2k(d, idx)
         # now we can't see packet size information from here, so the
         # SymmetricKeyEncryptedSessionKey class takes over in
         # fill_body to see if we have an encrypted session key
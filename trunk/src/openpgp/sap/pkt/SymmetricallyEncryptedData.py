@@ -16,6 +16,7 @@ from Packet import Packet
 class SymmetricallyEncryptedData(Packet):
     __doc__ = """Symmetrically Encrypted Data Packet
     """ + Packet._ivars
+    __slots__ = ()
 
     def __init__(self, *args, **kwords):
         try:
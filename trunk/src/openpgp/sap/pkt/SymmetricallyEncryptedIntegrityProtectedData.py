@@ -27,6 +27,7 @@ import openpgp.sap.util.strnum as STN
 class SymmetricallyEncryptedIntegrityProtectedData(Packet):
     __doc__ = """Symmetrically Encrypted, Integrity Protected Data Packet 
     """ + Packet._ivars
+    __slots__ = ()
 
     def __init__(self, *args, **kwords):
         try:
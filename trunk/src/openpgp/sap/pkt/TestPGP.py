@@ -14,6 +14,7 @@ Example::
 import Packet
 
 class TestPGP(Packet.Packet):
+    __slots__ = ()
 
     def __init__(self, *args, **kwords):
         try:
@@ -10,6 +10,7 @@ from Packet import Packet
 class Trust(Packet):
     __doc__ = """Trust Packet
     """ + Packet._ivars
+    __slots__ = ()
 
     def __init__(self, *args, **kwords):
         try:
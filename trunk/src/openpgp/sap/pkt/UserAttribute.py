@@ -9,6 +9,7 @@ from Packet import Packet
 class UserAttribute(Packet):
     __doc__ = """User Attribute Packet
     """ + Packet._ivars
+    __slots__ = ()
 
     def __init__(self, *args, **kwords):
         try:
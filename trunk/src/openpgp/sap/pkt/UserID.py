@@ -14,6 +14,7 @@ from Packet import Packet
 class UserID(Packet):
     __doc__ = """User ID Packet
     """ + Packet._ivars
+    __slots__ = ()
 
     def __init__(self, *args, **kwords):
         try:
@@ -25,13 +26,15 @@ class UserID(Packet):
         self.body = UserIDBody(d)
 
 
-class UserIDBody:
+class UserIDBody(object):
     """User ID
 
     :IVariables:
         - `value`: string User ID value
         - `_d`: string data used to fill UserID body
     """
+    __slots__ = ('_d', 'value')
+
     def __init__(self, *args, **kwords):
         try:
             self.fill(args[0])
@@ -39,7 +42,7 @@ class UserIDBody:
             pass
 
     def desc(self):
-        if 'value' in self.__dict__:
+        if hasattr(self, 'value'):
             return ["value:%s" % self.value]
         else:
             return [""]
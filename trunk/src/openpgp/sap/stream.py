@@ -0,0 +1,817 @@
+"""Incremental (file-like) packet handling
+
+The rest of the package works on complete strings: a packet is built from a
+string containing all of its data, a message from a list of complete packets.
+That's fine until the data is larger than memory. The readers here work on
+file-like objects instead, handing out data a buffer at a time so that memory
+use is bounded by the buffer size (`BUFSIZE` by default) and not the size of
+the message.
+
+Readers
+-------
+All readers share the same minimal file-like interface - ``read(size)``
+returns up to `size` bytes and an empty string at the end of the data. They
+can be stacked: a `BodyReader` reads one packet body (partial lengths and
+all) from a file, a `DecryptReader` decrypts another reader, a
+`DecompressReader` inflates another reader, and so on. Since a decrypted or
+decompressed body is just another packet stream, `read_header()` and
+`BodyReader` work on top of any of them. `iter_pkts()` uses them to hand out
+complete packet instances one at a time, `read_literal()` and `read_signed()`
+to pass literal data on to a sink.
+
+Writers
+-------
+The writers go the other way, ``write(d)`` takes data as it comes and
+``close()`` finishes the output. A `PacketWriter` emits a single new packet
+using partial body lengths (since the total size isn't known up front), a
+`CompressWriter` compresses, an `EncryptWriter` encrypts with integrity
+protection. Writers don't close whatever they write to - the caller closes
+each of them in order, which leaves room to write more packets into a stream
+after one is closed (a signature after its literal, for example).
+
+Integrity
+---------
+The modification detection code in an integrity protected packet can only be
+checked once all of the data has been read, which means cleartext will have
+been handed out before a modification is detected. The check failure is
+raised as a `PGPCryptoError` when the end of the data is reached - callers
+writing cleartext somewhere must be prepared to throw it away.
+
+ASCII-armored input is decoded as it's read by an `ArmorReader`, see
+`native_reader()`.
+"""
+import zlib
+
+from openpgp.code import *
+
+import openpgp.sap.util.strnum as STN
+import openpgp.sap.hashes as HASH
+
+from openpgp.sap.exceptions import *
+from openpgp.sap.armory import ArmorDecoder
+from openpgp.sap.crypto import CFB, crypt_CFB_str, gen_random, _import_cipher
+from openpgp.sap.crypto import TextCanonicalizer
+from openpgp.sap.pkt.Packet import Tag, create_Tag, create_NewLength, pktclass
+from openpgp.sap.pkt.LiteralData import LiteralDataBody
+
+BUFSIZE = 65536
+
+def _read(f, size):
+    """Read exactly `size` bytes from a file-like object (or less at EOF).
+    """
+    d = f.read(size)
+
+    if len(d) < size and d: # some file-likes return short reads
+        l = [d]
+        have = len(d)
+
+        while have < size:
+            d = f.read(size - have)
+
+            if not d:
+                break
+
+            l.append(d)
+            have = have + len(d)
+
+        d = ''.join(l)
+
+    return d
+
+def read_new_length(f):
+    """Read a new packet length from a file-like object.
+
+    :Parameters:
+        - `f`: file-like object positioned at a new length header
+
+    :Returns: tuple (integer size, boolean partial, string length data)
+
+    :Exceptions:
+        - `PGPFormatError`: length data was incomplete
+    """
+    L1 = _read(f, 1)
+
+    if not L1:
+        raise PGPFormatError("Missing new packet length.")
+
+    L1_ord = ord(L1)
+
+    if L1_ord < 192:
+        return L1_ord, False, L1
+
+    elif 192 <= L1_ord <= 223:
+        length_d = L1 + _read(f, 1)
+
+        if 2 != len(length_d):
+            raise PGPFormatError("Incomplete double octet packet length.")
+
+        return STN.doubleoct2int(length_d), False, length_d
+
+    elif 255 == L1_ord:
+        length_d = L1 + _read(f, 4)
+
+        if 5 != len(length_d):
+            raise PGPFormatError("Incomplete five octet packet length.")
+
+        return STN.pentoct2int(length_d), False, length_d
+
+    else: # 224 <= L1_ord <= 254, partial
+        return STN.partial2int(L1), True, L1
+
+def read_header(f):
+    """Read a packet header (tag and length) from a file-like object.
+
+    :Parameters:
+        - `f`: file-like object positioned at the start of a packet
+
+    :Returns: tuple (`Tag` instance, integer size of the first body chunk or
+        None for an old packet of indeterminate length, boolean partial,
+        string header data) or None if `f` is at EOF
+
+    :Exceptions:
+        - `PGPFormatError`: invalid or incomplete header data
+
+    The header is the tag octet and only the first length specifier. If
+    partial is True, more length specifiers are interlaced in the body (see
+    `BodyReader`).
+    """
+    tag_d = _read(f, 1)
+
+    if not tag_d:
+        return None
+
+    tag = Tag(tag_d)
+
+    if 0 == tag.version: # old
+        lo = [1, 2, 4, 0][tag.length_type]
+        length_d = _read(f, lo)
+
+        if lo != len(length_d):
+            raise PGPFormatError("Incomplete old packet length.")
+
+        if lo:
+            size = STN.str2int(length_d)
+        else:
+            size = None
+
+        return tag, size, False, tag_d + length_d
+
+    else: # new
+        size, partial, length_d = read_new_length(f)
+
+        if partial and 512 > size:
+            raise PGPFormatError("First partial length MUST be at least 512 octets long. Received: length.size->(%s)" % size)
+
+        return tag, size, partial, tag_d + length_d
+
+
+class Reader:
+    """Base class for incremental readers.
+
+    :IVariables:
+        - `bufsize`: integer maximum number of bytes produced per pass
+
+    Subclasses provide `_more()`, which returns the next chunk of data (no
+    more than about `bufsize` bytes, possibly an empty string) or None when
+    the data is exhausted.
+    """
+    def __init__(self, bufsize=BUFSIZE):
+        self.bufsize = bufsize
+        self._buf = ''
+        self._done = False
+
+    def read(self, size=-1):
+        """Read up to `size` bytes (all remaining bytes if `size` < 0).
+
+        :Parameters:
+            - `size`: integer number of bytes to read
+
+        :Returns: string data, shorter than `size` only at the end of the
+            data
+        """
+        l = [self._buf]
+        have = len(self._buf)
+
+        while (size < 0 or have < size) and not self._done:
+            d = self._more()
+
+            if d is None:
+                self._done = True
+            elif d:
+                l.append(d)
+                have = have + len(d)
+
+        d = ''.join(l)
+
+        if 0 <= size:
+            self._buf = d[size:]
+            return d[:size]
+
+        self._buf = ''
+        return d
+
+    def unread(self, d):
+        """Push data back onto the reader.
+
+        :Parameters:
+            - `d`: string data to be returned by the next `read()`
+        """
+        self._buf = d + self._buf
+
+    def drain(self):
+        """Read and discard the rest of the data, a buffer at a time.
+        """
+        while self.read(self.bufsize):
+            pass
+
+    def _more(self):
+        raise NotImplementedError
+
+
+class BodyReader(Reader):
+    """Read a single packet body.
+
+    :IVariables:
+        - `tag`: `Tag` instance of the packet being read
+
+    Partial body lengths are read as they're reached. Old packets with an
+    indeterminate length are read to the end of the underlying file.
+    """
+    def __init__(self, f, header, bufsize=BUFSIZE):
+        """Initialize a body reader.
+
+        :Parameters:
+            - `f`: file-like object positioned just after `header`
+            - `header`: tuple returned by `read_header()`
+            - `bufsize`: integer maximum number of bytes read per pass
+        """
+        Reader.__init__(self, bufsize)
+        self._f = f
+        self.tag, self._left, self._partial = header[:3]
+
+    def _more(self):
+        if self._left is None: # indeterminate, read until there's no more
+            return _read(self._f, self.bufsize) or None
+
+        while 0 == self._left:
+
+            if self._partial:
+                self._left, self._partial, length_d = read_new_length(self._f)
+            else:
+                return None
+
+        d = _read(self._f, min(self._left, self.bufsize))
+
+        if not d:
+            raise PGPFormatError("Packet body ended early, %s octets missing." % self._left)
+
+        self._left = self._left - len(d)
+        return d
+
+
+class ArmorReader(Reader):
+    """Read the data in ASCII-armored text.
+
+    The text is decoded by an `openpgp.sap.armory.ArmorDecoder` a buffer at a
+    time (see its notes on multiple blocks and clearsigned text). A checksum
+    mismatch raises `PGPFormatError` when the end of its block is read.
+    """
+    def __init__(self, f, bufsize=BUFSIZE):
+        """Initialize an armor reader.
+
+        :Parameters:
+            - `f`: file-like object containing ASCII-armored text
+            - `bufsize`: integer maximum number of bytes read per pass
+        """
+        Reader.__init__(self, bufsize)
+        self._f = f
+        self._decoder = ArmorDecoder()
+
+    def _more(self):
+        if self._decoder is None:
+            return None
+
+        d = self._f.read(self.bufsize)
+
+        if d:
+            return self._decoder.feed(d)
+
+        d = self._decoder.close()
+        self._decoder = None
+        return d
+
+
+class DecryptReader(Reader):
+    """Decrypt a symmetrically encrypted packet body.
+
+    :IVariables:
+        - `algorithm`: integer symmetric cipher constant
+        - `integrity`: boolean, True for integrity protected data (type 18)
+
+    The reader expects the encrypted data itself, for integrity protected
+    packets that means the version octet has to be read off first.
+
+    The random prefix is decrypted and checked right away, so that a wrong
+    key is caught before any data is handed out. For integrity protected data
+    the trailing modification detection packet is held back and checked at
+    the end of the data.
+    """
+    def __init__(self, f, algorithm, key, integrity=True, bufsize=BUFSIZE):
+        """Initialize a decrypting reader.
+
+        :Parameters:
+            - `f`: file-like object (normally a `BodyReader`) with encrypted
+              data
+            - `algorithm`: integer symmetric cipher constant
+            - `key`: string session key
+            - `integrity`: boolean, True for integrity protected data
+            - `bufsize`: integer maximum number of bytes read per pass
+
+        :Exceptions:
+            - `PGPCryptoError`: the prefix check failed (probably the wrong
+              key), in which case the prefix has been pushed back onto `f` if
+              `f` supports ``unread()``
+        """
+        Reader.__init__(self, bufsize)
+        bs = _import_cipher(algorithm).block_size
+        self._f = f
+        self.algorithm = algorithm
+        self.integrity = integrity
+
+        if integrity: # one pass, grab enough to cover the prefix
+            cipher_prefix = _read(f, 2 * bs)
+            cfb = CFB(algorithm, key, None, 'decrypt')
+            prefix = cfb.update(cipher_prefix)
+        else:
+            cipher_prefix = _read(f, bs + 2)
+            prefix = crypt_CFB_str(cipher_prefix, algorithm, key, None, 'decrypt')
+
+        if len(prefix) < bs + 2 or prefix[bs:bs+2] != prefix[bs-2:bs]:
+
+            if hasattr(f, 'unread'):
+                f.unread(cipher_prefix)
+
+            raise PGPCryptoError("Session key check failed.")
+
+        if integrity: # hash everything (but the hash)
+            self._cfb = cfb
+            self._hash = HASH.new(HASH_SHA1, prefix[:bs+2])
+            self._held = prefix[bs+2:]
+
+        else: # "resync"
+            self._cfb = CFB(algorithm, key, cipher_prefix[2:bs+2], 'decrypt')
+
+    def _more(self):
+        if self._cfb is None:
+            return None
+
+        d = self._f.read(self.bufsize)
+
+        if d:
+            d = self._cfb.update(d)
+        else:
+            d = self._cfb.final()
+            self._cfb = None
+
+        if self.integrity:
+            d = self._held + d
+            self._held = d[-22:] # MDC packet (tag, length & SHA-1 hash)
+            d = d[:-22]
+            self._hash.update(d)
+
+            if self._cfb is None:
+                self._check()
+
+        return d
+
+    def _check(self):
+        mdc_d = self._held
+
+        if 22 != len(mdc_d) or '\xd3\x14' != mdc_d[:2]:
+            raise PGPCryptoError("Missing modification detection code.")
+
+        self._hash.update(mdc_d[:2])
+
+        if mdc_d[2:] != self._hash.digest():
+            raise PGPCryptoError("Integrity hash check failed.")
+
+
+class DecompressReader(Reader):
+    """Decompress a compressed data packet body.
+
+    The body's leading algorithm octet must already have been read. Output is
+    limited to `bufsize` bytes per pass no matter how well the data
+    compressed.
+    """
+    def __init__(self, f, algorithm, bufsize=BUFSIZE):
+        """Initialize a decompressing reader.
+
+        :Parameters:
+            - `f`: file-like object with compressed data
+            - `algorithm`: integer compression algorithm constant
+            - `bufsize`: integer maximum number of bytes produced per pass
+        """
+        Reader.__init__(self, bufsize)
+        self._f = f
+
+        if COMP_UNCOMPRESSED == algorithm:
+            self._dc = None
+        elif COMP_ZIP == algorithm:
+            self._dc = zlib.decompressobj(-15)
+        elif COMP_ZLIB == algorithm:
+            self._dc = zlib.decompressobj()
+        else:
+            raise NotImplementedError("Unsupported compression algorithm->(%s)" % algorithm)
+
+        self._uncompressed = COMP_UNCOMPRESSED == algorithm
+
+    def _more(self):
+        if self._uncompressed:
+            return self._f.read(self.bufsize) or None
+
+        dc = self._dc
+
+        if dc is None:
+            return None
+
+        if dc.unconsumed_tail:
+            return dc.decompress(dc.unconsumed_tail, self.bufsize)
+
+        d = self._f.read(self.bufsize)
+
+        if d:
+            return dc.decompress(d, self.bufsize)
+
+        self._dc = None
+        return dc.flush()
+
+
+def _read_literal_head(body):
+    """Read the format, filename and time in front of literal data.
+
+    :Parameters:
+        - `body`: `BodyReader` instance positioned at the start of a literal
+          data packet body
+
+    :Returns: `LiteralDataBody` instance with empty `data`
+    """
+    head_d = body.read(2)
+
+    if 2 != len(head_d):
+        raise PGPFormatError("Incomplete literal data header.")
+
+    head_d = head_d + body.read(ord(head_d[1]) + 4)
+
+    if len(head_d) != ord(head_d[1]) + 6:
+        raise PGPFormatError("Incomplete literal data header.")
+
+    return LiteralDataBody(head_d)
+
+def read_literal(f, sink, bufsize=BUFSIZE):
+    """Write the literal data in a (cleartext) packet stream to a sink.
+
+    :Parameters:
+        - `f`: file-like object positioned at the start of a packet
+        - `sink`: object with a ``write()`` method, receives literal data
+          a chunk at a time
+        - `bufsize`: integer maximum number of bytes read per pass
+
+    :Returns: `LiteralDataBody` instance holding the first literal packet's
+        format, filename and modification time (its `data` is empty) or None
+        if no literal data was found
+
+    Compressed packets are decompressed on the way, all other packets
+    (one-pass signatures, signatures, ..) are skipped. `f` is read until it's
+    exhausted.
+    """
+    literal = None
+
+    while True:
+        header = read_header(f)
+
+        if header is None:
+            break
+
+        body = BodyReader(f, header, bufsize)
+
+        if PKT_COMPRESSED == body.tag.type:
+            alg_d = body.read(1)
+
+            if not alg_d:
+                raise PGPFormatError("Empty compressed data packet.")
+
+            found = read_literal(DecompressReader(body, ord(alg_d), bufsize), sink, bufsize)
+
+            if literal is None:
+                literal = found
+
+        elif PKT_LITERAL == body.tag.type:
+            head = _read_literal_head(body)
+
+            if literal is None:
+                literal = head
+
+            while True:
+                d = body.read(bufsize)
+
+                if d:
+                    sink.write(d)
+                else:
+                    break
+
+        body.drain()
+
+    return literal
+
+def read_signed(f, sink, bufsize=BUFSIZE):
+    """Write the literal data in a signed message to a sink, hashing it for
+    the signatures on the way.
+
+    :Parameters:
+        - `f`: file-like object positioned at the start of a signed message
+          (native OpenPGP)
+        - `sink`: object with a ``write()`` method, receives literal data
+          a chunk at a time
+        - `bufsize`: integer maximum number of bytes read per pass
+
+    :Returns: tuple (`LiteralDataBody` instance or None, see
+        `read_literal()`, list of signature packets, dictionary of hash
+        objects fed the signed data keyed by (signature type, hash algorithm))
+
+    :Exceptions:
+        - `NotImplementedError`: a signature uses an unsupported hash
+          algorithm
+
+    The signature types and hash algorithms are announced ahead of the
+    literal data by one-pass signature packets (or by the signatures
+    themselves in old-style signed messages), so one hash per announced
+    (type, algorithm) pair is started before the data arrives. Binary and
+    text signatures are hashed, text canonicalized as it goes (see
+    `openpgp.sap.crypto.TextCanonicalizer`). The hash objects can be handed
+    to `openpgp.sap.crypto.verify()` as its ``hasher`` keyword.
+
+    Compressed packets are decompressed on the way, other packets (markers,
+    ..) are skipped. `f` is read until it's exhausted. Only the signature
+    packets are kept whole, memory use doesn't depend on the size of the
+    literal data.
+    """
+    readers = [(f, None)] # compressed packets stack (reader, body) on top
+    literal = None
+    sigs = []
+    hashers = {} # (sigtype, hashalg): (canonicalizer or None, hash)
+
+    while readers:
+        header = read_header(readers[-1][0])
+
+        if header is None:
+            compressed = readers.pop()[1]
+
+            if compressed:
+                compressed.drain()
+
+            continue
+
+        body = BodyReader(readers[-1][0], header, bufsize)
+        pkttype = body.tag.type
+
+        if PKT_COMPRESSED == pkttype:
+            alg_d = body.read(1)
+
+            if not alg_d:
+                raise PGPFormatError("Empty compressed data packet.")
+
+            readers.append((DecompressReader(body, ord(alg_d), bufsize), body))
+            continue
+
+        elif pkttype in [PKT_ONEPASS, PKT_SIGNATURE]:
+            pkt = pktclass(pkttype)(header[3] + body.read())
+
+            if PKT_SIGNATURE == pkttype:
+                sigs.append(pkt)
+
+            hashed = (pkt.body.type, pkt.body.alg_hash)
+
+            if literal is None and hashed not in hashers and \
+               pkt.body.type in [SIG_BINARY, SIG_TEXT]:
+
+                if SIG_TEXT == pkt.body.type:
+                    canon = TextCanonicalizer()
+                else:
+                    canon = None
+
+                hashers[hashed] = (canon, HASH.new(pkt.body.alg_hash))
+
+        elif PKT_LITERAL == pkttype:
+            head = _read_literal_head(body)
+
+            if literal is None:
+                literal = head
+
+            hashing = hashers.values()
+
+            while True:
+                d = body.read(bufsize)
+
+                if not d:
+                    break
+
+                sink.write(d)
+
+                for canon, md in hashing:
+
+                    if canon:
+                        md.update(canon.update(d))
+                    else:
+                        md.update(d)
+
+        body.drain()
+
+    for canon, md in hashers.values():
+
+        if canon:
+            md.update(canon.final())
+
+    return literal, sigs, dict([(k, v[1]) for k, v in hashers.items()])
+
+def native_reader(f, bufsize=BUFSIZE):
+    """Prepare a file-like object for reading packets.
+
+    :Parameters:
+        - `f`: file-like object containing native or ASCII-armored OpenPGP
+          data
+        - `bufsize`: integer maximum number of bytes read per pass
+
+    :Returns: `Reader` instance producing native OpenPGP data
+
+    ASCII-armored input is recognized by its first octet (a packet tag always
+    has its high bit set) and is wrapped in an `ArmorReader`.
+    """
+    f = BodyReader(f, (None, None, False), bufsize) # for unread()
+    d = f.read(1)
+    f.unread(d)
+
+    if d and not 0x80 & ord(d):
+        f = ArmorReader(f, bufsize)
+
+    return f
+
+def iter_pkts(f, bufsize=BUFSIZE, lazy=False):
+    """Iterate over the packets in a file-like object.
+
+    :Parameters:
+        - `f`: file-like object positioned at the start of a packet
+        - `bufsize`: integer maximum number of bytes read per pass
+        - `lazy`: set to True to create packet bodies on first access (see
+          `openpgp.sap.list.list_pkts()`)
+
+    :Returns: iterator yielding packet instances
+
+    Only one packet is held at a time, so memory use is bounded by the
+    largest packet rather than the size of the file. Packets with partial
+    body lengths are rebuilt with a single (new) length.
+
+    ASCII-armored input is decoded as it's read (see `native_reader()`).
+    """
+    f = native_reader(f, bufsize)
+
+    while True:
+        header = read_header(f)
+
+        if header is None:
+            break
+
+        tag, size, partial, header_d = header
+        body_d = BodyReader(f, header, bufsize).read()
+
+        if partial:
+            header_d = header_d[:1] + create_NewLength(len(body_d))._d
+
+        pkt = pktclass(tag.type)()
+        pkt.fill(header_d + body_d, 0, lazy)
+
+        yield pkt
+
+
+class PacketWriter:
+    """Write a single new packet with partial body lengths.
+
+    :IVariables:
+        - `chunk`: integer partial body length used (a power of 2)
+
+    The tag is written right away, the body goes out a chunk at a time as
+    partial lengths. `close()` writes whatever is left with a normal length.
+    """
+    def __init__(self, f, pkttype, bufsize=BUFSIZE):
+        """Initialize a packet writer.
+
+        :Parameters:
+            - `f`: file-like object with a ``write()`` method
+            - `pkttype`: integer packet type constant
+            - `bufsize`: integer size of the partial body chunks (rounded
+              down to a power of 2, 512 at least)
+        """
+        chunk = 512 # first partial length MUST be at least 512 octets
+
+        while chunk * 2 <= min(bufsize, 1073741824):
+            chunk = chunk * 2
+
+        self._f = f
+        self.chunk = chunk
+        self._partial_d = STN.int2partial(chunk)
+        self._pending = ''
+        f.write(create_Tag(pkttype)._d)
+
+    def write(self, d):
+        """Write body data.
+
+        :Parameters:
+            - `d`: string of packet body data
+        """
+        d = self._pending + d
+        chunk = self.chunk
+        idx = 0
+
+        while len(d) - idx >= chunk:
+            self._f.write(self._partial_d + d[idx:idx+chunk])
+            idx = idx + chunk
+
+        self._pending = d[idx:]
+
+    def close(self):
+        """Write the rest of the body, ending the packet.
+        """
+        d, self._pending = self._pending, ''
+        self._f.write(create_NewLength(len(d))._d + d)
+
+
+class CompressWriter:
+    """Compress data for a compressed data packet.
+
+    The algorithm octet is not written, only compressed data.
+    """
+    def __init__(self, f, algorithm):
+        """Initialize a compressing writer.
+
+        :Parameters:
+            - `f`: file-like object with a ``write()`` method (normally a
+              `PacketWriter`)
+            - `algorithm`: integer compression algorithm constant
+        """
+        self._f = f
+
+        if COMP_UNCOMPRESSED == algorithm:
+            self._cmpr = None
+        elif COMP_ZIP == algorithm:
+            self._cmpr = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        elif COMP_ZLIB == algorithm:
+            self._cmpr = zlib.compressobj()
+        else:
+            raise NotImplementedError("Unsupported compression algorithm->(%s)" % algorithm)
+
+    def write(self, d):
+        if self._cmpr is None:
+            self._f.write(d)
+
+        else:
+            d = self._cmpr.compress(d)
+
+            if d:
+                self._f.write(d)
+
+    def close(self):
+        if self._cmpr is not None:
+            self._f.write(self._cmpr.flush())
+
+
+class EncryptWriter:
+    """Encrypt data for an integrity protected packet.
+
+    The version octet and encrypted random prefix are written right away. The
+    SHA-1 modification detection code is accumulated as data is written and
+    is encrypted and written by `close()`.
+    """
+    def __init__(self, f, algorithm, key):
+        """Initialize an encrypting writer.
+
+        :Parameters:
+            - `f`: file-like object with a ``write()`` method (normally a
+              `PacketWriter`)
+            - `algorithm`: integer symmetric cipher constant
+            - `key`: string session key
+        """
+        bs = _import_cipher(algorithm).block_size
+        prefix = gen_random(bs)
+        prefix = prefix + prefix[-2:]
+        self._f = f
+        self._cfb = CFB(algorithm, key, None, 'encrypt')
+        self._hash = HASH.new(HASH_SHA1, prefix)
+        f.write('\x01' + self._cfb.update(prefix))
+
+    def write(self, d):
+        self._hash.update(d)
+        self._f.write(self._cfb.update(d))
+
+    def close(self):
+        self._hash.update('\xd3\x14')
+        mdc_d = '\xd3\x14' + self._hash.digest()
+        self._f.write(self._cfb.update(mdc_d) + self._cfb.final())
@@ -162,6 +162,7 @@ _alg_hash_msg = {HASH_MD5:"MD5",
                  HASH_SHA256:"SHA256",
                  HASH_SHA384:"SHA384",
                  HASH_SHA512:"SHA512",
+                 HASH_SHA224:"SHA224",
                  HASH_100:"Private/Experimental algorithm",
                  HASH_101:"Private/Experimental algorithm",
                  HASH_102:"Private/Experimental algorithm",
@@ -1,5 +1,7 @@
 """Realy miscellaneous functions
 """
+import time
+
 def unique_order(l, reverse=False):
     """Retrieve unique elements from a list, preserving their order.
 
@@ -121,3 +123,78 @@ def intersect_order(L):
     items = tally_dict(tally, True) 
 
     return [i[0] for i in items]
+
+class LRUCache:
+    """A bounded mapping that forgets the least recently used items.
+
+    :IVariables:
+        - `maxsize`: integer maximum number of items kept
+        - `hits`: integer number of lookups that found a (fresh) item
+        - `misses`: integer number of lookups that didn't
+
+    Items may be given an expiration time, after which they're dropped as
+    though they had never been set. When the cache is full, the least
+    recently used quarter is dropped at once so the sorting this takes is
+    spread over many insertions.
+    """
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._items = {} # key: (value, expiration or None)
+        self._used = {} # key: tick of last use
+        self._tick = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key, default=None):
+        """Retrieve an item.
+
+        :Parameters:
+            - `key`: hashable item key
+            - `default`: value returned if the item isn't there (or expired)
+
+        :Returns: item value or `default`
+        """
+        try:
+            value, expires = self._items[key]
+
+        except KeyError:
+            self.misses += 1
+            return default
+
+        if expires is not None and expires <= time.time():
+            del self._items[key], self._used[key]
+            self.misses += 1
+            return default
+
+        self._tick += 1
+        self._used[key] = self._tick
+        self.hits += 1
+        return value
+
+    def set(self, key, value, expires=None):
+        """Store an item.
+
+        :Parameters:
+            - `key`: hashable item key
+            - `value`: item value
+            - `expires`: optional time (seconds since the epoch) after which
+              the item is stale
+        """
+        if self.maxsize <= len(self._items) and key not in self._items:
+            used = [(t, k) for k, t in self._used.items()]
+            used.sort()
+
+            for t, k in used[:max(1, self.maxsize // 4)]:
+                del self._items[k], self._used[k]
+
+        self._tick += 1
+        self._items[key] = (value, expires)
+        self._used[key] = self._tick
+
+    def clear(self):
+        """Forget all items.
+        """
+        self._items.clear()
+        self._used.clear()
@@ -22,31 +22,103 @@ Retrieve keyword order (keyword list)::
     >>> d.keylist
     ['a', 'b', 'c']
 
-Delete an entry by index::
-    
+Delete an entry by index or keyword::
+
     >>> del d[0]
+    >>> del d['c']
     >>> d.list()
-    [2, 3]
+    [2]
 """
 
+_hole = object() # marks a deleted key in ordict._keys
+
+
 class ordict(dict):
     """Ordered dictionary
 
     This is a dictionary subclass that supports *some* list-like
     operations. Basically, this is for convenience and will evolve as
     needed.
+
+    Keys are kept in order of addition in a list, and each key's position in
+    that list is kept in a dictionary, so setting, getting and deleting an
+    item take constant time. Deleting a key at either end of the order just
+    moves the end, deleting one in between leaves a hole in the list. Index
+    access goes straight to the list up to the first hole. Past it, holes
+    are counted in a binary indexed tree, built on first need and kept up
+    to date by deletes, so index access takes logarithmic time. The list is
+    squeezed when deleted keys make up half of it or when the whole order is
+    needed (`keylist`, `list()`, etc.). Setting a key that's already there
+    keeps its place.
     """
 
     def __init__(self):
         "Initialize keylist."
-        self.keylist = []
-                                                                                                         
+        self._keys = [] # keys in order of addition, with holes
+        self._pos = {} # key: index in _keys
+        self._start = 0 # index of the first key in _keys
+        self._holes = 0 # number of holes after _start
+        self._first = 0 # no holes in _keys[_start:_first]
+        self._tree = None # hole counts (see __build_tree())
+
+    def __compact(self):
+        self._keys = [k for k in self._keys[self._start:] if k is not _hole]
+        self._pos = dict(zip(self._keys, xrange(len(self._keys))))
+        self._start = self._holes = 0
+        self._first = len(self._keys)
+        self._tree = None
+
+    # Count the holes in _keys in a binary indexed tree with room for as many
+    # keys again: _tree[n] holds the number of holes in the (n & -n) slots
+    # ending at _keys[n - 1].
+    def __build_tree(self):
+        size = 2 * len(self._keys)
+        tree = [0] * (size + 1)
+
+        for i, key in enumerate(self._keys):
+
+            if key is _hole:
+                tree[i + 1] = 1
+
+        for n in xrange(1, size + 1):
+            parent = n + (n & -n)
+
+            if parent <= size:
+                tree[parent] += tree[n]
+
+        self._tree = tree
+
+    # Add `count` holes at _keys[i] to the tree, if there is one.
+    def __mark(self, i, count):
+        tree = self._tree
+
+        if tree is not None:
+            n = i + 1
+
+            while n < len(tree):
+                tree[n] += count
+                n += n & -n
+
+    def _get_keylist(self):
+        if self._start or self._holes:
+            self.__compact()
+
+        return self._keys
+
+    keylist = property(_get_keylist, doc="list of keys in order of addition "
+                                         "(don't change it)")
+
     def __setitem__(self, key, value):
         "Set keyword list."
         dict.__setitem__(self, key, value)
-        if key not in self.keylist:
-            self.keylist.append(key)
-                                                                                                         
+
+        if key not in self._pos:
+            self._pos[key] = len(self._keys)
+            self._keys.append(key)
+
+            if self._tree is not None and len(self._tree) <= len(self._keys):
+                self._tree = None # out of room, rebuilt when needed
+
     def __getitem__(self, key):
         "Get dictionary item from keyword list index."
         try:
@@ -54,25 +126,157 @@ class ordict(dict):
 
         except KeyError:
 
-            if isinstance(key, int) and key < len(self.keylist):
-                return dict.__getitem__(self, self.keylist[key])
+            if isinstance(key, int):
+                return dict.__getitem__(self, self.__key(key))
             else:
                 raise
-                                                                                                         
+
     def __delitem__(self, key):
         "Delete keyword entry."
-        try:
-            dict.__delitem__(self, key)
+        if not dict.__contains__(self, key) and isinstance(key, int):
+            key = self.__key(key)
 
-        except KeyError:
+        dict.__delitem__(self, key)
+        keys = self._keys
+        i = self._pos.pop(key)
+        keys[i] = _hole
 
-            if isinstance(key, int) and key < len(self.keylist):
-                dict.__delitem__(self, self.keylist[key])
-            else:
-                raise
+        if i == self._start: # first key, move the start past any holes
+            self.__mark(i, 1)
+            self._start += 1
+
+            while self._start < len(keys) and keys[self._start] is _hole:
+                self._start += 1
+                self._holes -= 1
+
+            self._first = max(self._first, self._start)
+
+        elif i == len(keys) - 1: # last key, drop it and any holes before it
+            keys.pop()
+
+            while keys[-1] is _hole:
+                keys.pop()
+                self.__mark(len(keys), -1)
+                self._holes -= 1
+
+        else:
+            self.__mark(i, 1)
+            self._holes += 1
+            self._first = min(self._first, i)
 
-        self.keylist.pop(key)
+        if len(keys) < 2 * (self._start + self._holes):
+            self.__compact()
+
+    # Key at list index `i` (negative counts from the end), KeyError if there
+    # isn't one.
+    def __key(self, i):
+        count = len(self)
+
+        if i < 0:
+            i += count
+
+        if not 0 <= i < count:
+            raise KeyError(i)
+
+        if not self._holes or self._start + i < self._first:
+            return self._keys[self._start + i]
+
+        if self._tree is None:
+            self.__build_tree()
+
+        # walk down the tree to the slot of key number i (the tree counts the
+        # holes in front of _start too)
+        tree, n, step = self._tree, 0, 1
+
+        while 2 * step < len(tree):
+            step *= 2
+
+        while step:
+
+            if n + step < len(tree) and step - tree[n + step] <= i:
+                n += step
+                i -= step - tree[n]
+
+            step //= 2
+
+        return self._keys[n]
+
+    def __iter__(self):
+        return iter(self.keylist)
+
+    def iterkeys(self):
+        return iter(self.keylist)
+
+    def keys(self):
+        "Retrieve keys in order of addition."
+        return self.keylist[:]
+
+    def values(self):
+        "Retrieve items in order of addition (same as `list()`)."
+        return self.list()
+
+    def items(self):
+        "Retrieve (key, item) tuples in order of addition."
+        return [(key, dict.__getitem__(self, key)) for key in self.keylist]
+
+    def pop(self, key, *default):
+        "Remove an entry and return its item."
+        if dict.__contains__(self, key):
+            value = dict.__getitem__(self, key)
+            del self[key]
+            return value
+
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        "Remove the last entry added and return its (key, item) tuple."
+        if not self:
+            raise KeyError('popitem(): dictionary is empty')
+
+        key = self._keys[-1] # the last slot is never a hole
+        value = dict.__getitem__(self, key)
+        del self[key]
+        return key, value
+
+    def setdefault(self, key, default=None):
+        "Retrieve an item, setting it to `default` first if it's not there."
+        if not dict.__contains__(self, key):
+            self[key] = default
+
+        return dict.__getitem__(self, key)
+
+    def clear(self):
+        "Remove all entries."
+        dict.clear(self)
+        self.__init__()
+
+    def copy(self):
+        "Retrieve a shallow copy, in the same order."
+        d = self.__class__()
+        d.update(self)
+        return d
+
+    def update(self, other=(), **kw):
+        "Set entries from a dictionary or (key, item) tuples, in their order."
+        if hasattr(other, 'keys'):
+            other = [(key, other[key]) for key in other.keys()]
+
+        for key, value in other:
+            self[key] = value
+
+        for key, value in kw.items():
+            self[key] = value
+
+    def itervalues(self):
+        return iter(self.list())
+
+    def iteritems(self):
+        return iter(self.items())
 
     def list(self):
         "Retrieve items ordered by key in keyword list."
         return [dict.__getitem__(self, key) for key in self.keylist]
+
+    def __reduce__(self):
+        # copies and pickles are rebuilt item by item, without the holes
+        return (self.__class__, (), None, None, iter(self.items()))
@@ -12,6 +12,11 @@ These functions cover common OpenPGP number and string conversions.
 import struct
 import binascii
 
+_unpack = {0: lambda s: 0, # str2int() by string length, the rest use hex
+           1: ord,
+           2: lambda s: struct.unpack('>H', s)[0],
+           4: lambda s: struct.unpack('>I', s)[0]}
+
 def strcalc(func, arg, idx):
     """Get value of string->number calculation and incremented index.
     
@@ -60,46 +65,43 @@ def str2int(s):
         >>> str2int('\\xb0\\x32\\x7a\\xfc')
         2956098300L
 
+    Short (fixed width) strings are unpacked with `struct`, longer ones are
+    converted all at once by way of their hex representation.
+
     :note: This functions tries to return the number as an int(), but will
-        return a long() if an OverflowError is triggered. Don't know if this is
-        good behavior..
+        return a long() if it doesn't fit. Don't know if this is good
+        behavior..
     """
-    l = 0L
-
-    for i in map(ord, s):
-        l = (l * 256) + i
-
     try:
-        return int(l)
+        return _unpack[len(s)](s)
 
-    except OverflowError:
-        return l
+    except KeyError:
+        return int(binascii.hexlify(s), 16)
 
-# TODO gotta be a better way, and how does this mesh with endian-ness?
 def int2str(n):
     """Convert an integer to a string. 
 
     :Parameters:
         - `n`: integer to convert to string
 
-    :Returns: string 
+    :Returns: string, big-endian with no leading zero octets (0 is '\\x00')
 
-    This is a simple transformation using the builtin hex() function
-    to return the number. 
-    
-    **Note:** I'm not sure what the relationship between hex()
-    representations and endian issues are, these need to be tested.
+    Single octets are made with chr(), larger numbers are formatted in hex
+    and the hex converted to octets.
     
     Example:
 
         >>> strnums.int2str(34728919023)
         '\\x08\\x16\\x01?\\xef'
     """
-    h = hex(n)[2:] # chop off the '0x' 
-    if h[-1] in ['l', 'L']:
-        h = h[:-1]
-    if 1 == len(h) % 2: # odd string, add '0' to beginning
-        h = ''.join(['0', h])
+    if 0 <= n < 256:
+        return chr(n)
+
+    h = '%x' % n
+
+    if len(h) & 1: # odd string, add '0' to beginning
+        h = '0' + h
+
     return binascii.unhexlify(h)
 
 # TODO struct doesn't explicitly force this into four octets, does it? 
@@ -274,12 +276,34 @@ def mpilen2int(s):
         >>> TODO
     """
     if len(s) == 2:
-        L = str2int(s)
-        return (L + 7) / 8
+        return (struct.unpack('>H', s)[0] + 7) >> 3
 
     else:
         raise ValueError, "MPI length must be a 2 character string."
 
+def int2mpi(i):
+    """Convert an integer to an MPI string (bit count header and integer).
+
+    :Parameters:
+        - `i`: non-negative integer
+
+    :Returns: string MPI
+
+    :Exceptions:
+        - `ValueError`: `i` has more bits than two octets can count
+
+    Example:
+
+        >>> int2mpi(511)
+        '\\x00\\t\\x01\\xff'
+    """
+    bit_count = i.bit_length()
+
+    if 0xffff < bit_count:
+        raise ValueError("int is larger than two octets can specify - int occupies %s bits" % bit_count)
+
+    return struct.pack('>H', bit_count) + int2str(i)
+
 def sigbits(c):
     """Find out how many bits are used in an octet. 
 
@@ -301,12 +325,7 @@ def sigbits(c):
 
         >>> TODO
     """
-    i = str2int(c)
-    bitmasks = [0x80, 0x40, 0x20, 0x10, 0x08, 0x04, 0x02, 0x01]
-    for m in range(len(bitmasks)):
-        if i & bitmasks[m] == bitmasks[m]:
-            return 8 - m
-    return 0
+    return ord(c).bit_length()
 
 def str2hex(s):
     """Represent a binary string in hex.
@@ -347,10 +366,7 @@ def checksum(s):
 
     :Returns: integer checksum
     """
-    csum = 0
-    for b in s:
-        csum += str2int(b)
-    return csum % 65536
+    return sum(bytearray(s)) % 65536
 
 # possible to use s.zfill() somehow?
 def prepad(length, s=''):
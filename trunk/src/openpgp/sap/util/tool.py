@@ -8,7 +8,7 @@ from openpgp.code import *
 import openpgp.sap.text as TXT
 
 from openpgp.sap.armory import looks_armored, list_armored
-from openpgp.sap.list import list_pkts, list_msgs
+from openpgp.sap.list import list_pkts, list_msgs, iter_msgs
 
 linesep = os.linesep
 saplog = logging.getLogger("saplog")
@@ -57,7 +57,8 @@ def slice_pkt_str(msg_d, slice_d):
     """Return a packet slice from a string of OpenPGP data.
 
     :Parameters:
-        - `msg_d`: string OpenPGP data
+        - `msg_d`: string OpenPGP data or a list (or other iterable) of
+          packet instances
         - `slice_d`: string slice notation (see `Slice syntax`_)
 
     :Returns: list of sliced items (message or packet instances)
@@ -78,20 +79,40 @@ def slice_pkt_str(msg_d, slice_d):
 
     :todo: Add deep msg slicing (ex.signed contains literal - 0[0][1:3]).
     """
-    if looks_armored(msg_d):    
-        msg_d = ''.join([a.data for a in list_armored(msg_d)])
+    if isinstance(msg_d, str):
+
+        if looks_armored(msg_d):    
+            msg_d = ''.join([a.data for a in list_armored(msg_d)])
+
+        pkts = list_pkts(msg_d)
+
+    else:
+        pkts = msg_d
 
     l = []
-    players = list_msgs(list_pkts(msg_d), leftover=l)
+    players = iter_msgs(pkts, leftover=l)
 
     if 'L' == slice_d[0]:
+
+        for msg in players: # leftovers come after the messages
+            pass
+
         items = l
         saplog.info("Slicing leftover packets (%s total)." % len(items))
 
     else:
         msg_idx = int(slice_d[0])
-        items = players[msg_idx].seq()
-        saplog.info("Slicing message %s of %s." % (msg_idx, len(players)-1))
+
+        for i, msg in enumerate(players): # earlier messages aren't kept
+
+            if i == msg_idx:
+                items = msg.seq()
+                break
+
+        else:
+            raise IndexError("Message %s not found." % msg_idx)
+
+        saplog.info("Slicing message %s." % msg_idx)
 
     pkt_slice = eval("items%s" % slice_d[1:])
 
@@ -189,13 +210,16 @@ def show_simple_packet(p):
 
     return ' '.join(p_string)
 
-def show_pkts(d):
+def show_pkts(d, lazy=False):
     """Show OpenPGP packet information.
 
     :Parameters:
         - `d`: variable OpenPGP data - may be a string containing
           OpenPGP packets (native or armored), a list of OpenPGP packets, or a
           single OpenPGP packet instance
+        - `lazy`: optional True or False (default False), set to True to
+          show packet headers only - packet bodies listed from a string are
+          not decoded
 
     :Returns: string of packet information found in `d`
 
@@ -206,7 +230,7 @@ def show_pkts(d):
         if looks_armored(d):
             armored = list_armored(d)
             d = ''.join([a.data for a in armored]) # we may have many armored instances
-        pkts = list_pkts(d)
+        pkts = list_pkts(d, lazy=lazy)
 
     elif isinstance(d, list):
         pkts = d
@@ -214,26 +238,38 @@ def show_pkts(d):
     elif isinstance(d, PKT.Packet):
         pkts = [d]
 
-    r = []
-    for p in pkts:
-        r.append(TXT.pkt_msg(p.tag.type))
-        l = p.length.size
-        if l == 'UNDEFINED':
-            l = "Undefined (found %s octets)" % len(p.body.rawstr())
-        r.append(" version: %s type: %s bodylength: %s" % (p.tag.version, p.tag.type, l))
-        r.append(report_body(p))
-        ### packet byte string
-        #import OpenPGP.util.strnum as STN
-        #r.append("Packet body byte string:")
-        #r.append(STN.str2pyhex(p.rawstr()))
-        ###
-        ### packet body byte string
-        #r.append("Packet body byte string:")
-        #r.append(STN.str2pyhex(p.body._d))
-        ###
+    r = [show_pkt(p, lazy) for p in pkts]
     r.append("Pau.")
     return linesep.join(r)
 
+def show_pkt(p, lazy=False):
+    """Show information about a single OpenPGP packet.
+
+    :Parameters:
+        - `p`: OpenPGP packet instance
+        - `lazy`: optional True or False (default False), set to True to show
+          the packet header only
+
+    :Returns: string of packet information (see `show_pkts()`)
+    """
+    r = [TXT.pkt_msg(p.tag.type)]
+    l = p.length.size
+    if l == 'UNDEFINED':
+        l = "Undefined (found %s octets)" % (p.size - len(p.tag._d) - len(p.length._d))
+    r.append(" version: %s type: %s bodylength: %s" % (p.tag.version, p.tag.type, l))
+    if not lazy:
+        r.append(report_body(p))
+    ### packet byte string
+    #import OpenPGP.util.strnum as STN
+    #r.append("Packet body byte string:")
+    #r.append(STN.str2pyhex(p.rawstr()))
+    ###
+    ### packet body byte string
+    #r.append("Packet body byte string:")
+    #r.append(STN.str2pyhex(p.body._d))
+    ###
+    return linesep.join(r)
+
 # TODO Major condensing needed.
 def report_body(pkt):
     """Return a list of reports on a packet body.
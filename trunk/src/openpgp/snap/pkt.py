@@ -1,7 +1,8 @@
 
 from openpgp.code import *
 
-from openpgp.sap.util.strnum import int2str, str2int, sigbits, mpilen2int, str2hex
+from openpgp.sap.util.strnum import int2str, str2int, mpilen2int, str2hex
+from openpgp.sap.util.strnum import int2mpi
 
 PGIO_STR_TYPE = 'str'
 PGIO_MPI_TYPE = 'mpi'
@@ -430,8 +431,6 @@ def str2mpi(s, limit):
 
     :Returns: list of MPI values (integers/longs)
     """
-    import struct
-
     idx = 0
     mpi_list = []
 
@@ -449,9 +448,7 @@ def str2mpi(s, limit):
             len_int_d = len(int_d)
 
             if len_int_d == mpilen:
-                i = struct.unpack('>'+str(len_int_d)+'s', int_d)[0]
-                mpival = str2int(i) 
-                mpi_list.append(mpival)
+                mpi_list.append(str2int(int_d))
 
                 continue # if good, keep going
 
@@ -474,18 +471,7 @@ def mpi2str(l, limit):
     d = []
 
     for i in l:
-        i_d = int2str(i)
-        i_length = len(i_d)
-        bit_count = sigbits(i_d[0]) + (8 * (i_length - 1))
-        i_length_str = int2str(bit_count)
-
-        if 2 < len(i_length_str):
-            raise ValueError, "MPI integer > two octs: %s octets used>" % str(i_length)
-
-        elif 1 == len(i_length_str):
-            i_length_str = ''.join(['\x00', i_length_str])
-
-        d.append(''.join([i_length_str, i_d])) # since limit checks complete mpi
+        d.append(int2mpi(i)) # since limit checks complete mpi
 
         if limit == len(d):
             break
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+"""CFB throughput
+
+Encrypt and decrypt a buffer with each supported cipher and report MB/s.
+
+Usage: bench_cfb.py [size in KB, default 1024]
+"""
+import sys
+
+from openpgp.code import *
+from openpgp.sap.crypto import crypt_CFB_str, gen_random, _keysize
+
+from support import best_time, report
+
+ciphers = [('CAST5', SYM_CAST5),
+           ('3DES', SYM_DES3),
+           ('Blowfish', SYM_BLOWFISH),
+           ('AES128', SYM_AES128),
+           ('AES192', SYM_AES192),
+           ('AES256', SYM_AES256)]
+
+def main(size):
+    d = gen_random(size)
+
+    for name, alg in ciphers:
+        key = gen_random(_keysize(alg))
+        c = crypt_CFB_str(d, alg, key, None, 'encrypt')
+
+        t = best_time(lambda: crypt_CFB_str(d, alg, key, None, 'encrypt'))
+        report("CFB encrypt %s" % name, t, size)
+
+        t = best_time(lambda: crypt_CFB_str(c, alg, key, None, 'decrypt'))
+        report("CFB decrypt %s" % name, t, size)
+
+if '__main__' == __name__:
+    if 1 < len(sys.argv):
+        size = int(sys.argv[1]) * 1024
+    else:
+        size = 1024 * 1024
+
+    main(size)
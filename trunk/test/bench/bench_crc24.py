@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""CRC-24 and armor throughput
+
+Checksum a buffer with the table-driven `crc24()` and with the bit-by-bit
+version it replaced, then armor and dearmor the buffer. Reports MB/s. The
+bit-by-bit version is only run on the first megabyte, it's too slow for
+more. `ArmorDecoder` is fed 64k chunks of the armored text.
+
+Usage: bench_crc24.py [size in MB, default 50]
+"""
+import sys
+
+from openpgp.sap.armory import crc24, apply_armor, list_armored, ArmorDecoder
+from openpgp.sap.crypto import gen_random
+
+from support import best_time, report
+
+def crc24_bitwise(s, crc=0xb704ce):
+    crc24_poly = 0x1864cfb
+
+    for i in list(s):
+        crc = crc ^ (ord(i) << 16)
+
+        for j in range(0, 8):
+            crc = crc << 1
+
+            if crc & 0x1000000:
+                crc = crc ^ crc24_poly
+
+    return crc & 0xffffff
+
+def main(size):
+    d = gen_random(size)
+    sample = d[:1024 * 1024]
+
+    t = best_time(lambda: crc24_bitwise(sample), repeat=1)
+    report("crc24 bitwise (before)", t, len(sample))
+
+    t = best_time(lambda: crc24(d), repeat=1)
+    report("crc24 table", t, size)
+
+    armored_d = apply_armor(d)
+    t = best_time(lambda: apply_armor(d), repeat=1)
+    report("apply_armor", t, size)
+
+    t = best_time(lambda: list_armored(armored_d), repeat=1)
+    report("list_armored", t, size)
+
+    def decode():
+        decoder = ArmorDecoder()
+
+        for i in xrange(0, len(armored_d), 65536):
+            decoder.feed(armored_d[i:i + 65536])
+
+        decoder.close()
+
+    t = best_time(decode, repeat=1)
+    report("ArmorDecoder", t, size)
+
+if '__main__' == __name__:
+    if 1 < len(sys.argv):
+        size = int(sys.argv[1]) * 1024 * 1024
+    else:
+        size = 50 * 1024 * 1024
+
+    main(size)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""Batch decryption
+
+Decrypt a "mailbox" of messages encrypted to one key: one at a time with
+decrypt_str() (which unlocks the secret key for every message), and with
+decrypt_many() and a KeySession using 1 to N worker processes.
+
+Usage: bench_decrypt_many.py [number of messages, default 32] [max workers, default 4]
+"""
+import sys
+
+from openpgp.sap.api import encrypt_str, decrypt_str, decrypt_many, KeySession
+
+from support import best_time, report, read_test_file
+
+def main(number, max_workers):
+    pubkey_d = read_test_file(['key', 'DSAELG1.pub.asc'])
+    seckey_d = read_test_file(['key', 'DSAELG1.sec.asc'])
+    messages = []
+
+    for i in range(number):
+        messages.append(encrypt_str("message %s\n" % i, keys=pubkey_d,
+                                    use_userid=[(None, 'Tester')]))
+
+    def serial():
+
+        for m in messages:
+            assert decrypt_str(m, keys=seckey_d, passphrase='test')
+
+    t = best_time(serial)
+    report("decrypt_str x %s" % number, t)
+    t = best_time(lambda: KeySession(seckey_d, 'test'))
+    report("KeySession (unlock once)", t)
+    session = KeySession(seckey_d, 'test')
+    workers = 1
+
+    while workers <= max_workers:
+        t = best_time(lambda: decrypt_many(messages, session, workers=workers))
+        report("decrypt_many x %s, %s worker(s)" % (number, workers), t)
+        workers = workers * 2
+
+    session.wipe()
+
+if '__main__' == __name__:
+    if 1 < len(sys.argv):
+        number = int(sys.argv[1])
+    else:
+        number = 32
+
+    if 2 < len(sys.argv):
+        max_workers = int(sys.argv[2])
+    else:
+        max_workers = 4
+
+    main(number, max_workers)
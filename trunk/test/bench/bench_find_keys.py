@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""Key lookup scaling
+
+Look up one key by key ID and by user ID among a growing number of keys (the
+test public keys repeated, with the target key last). The linear search
+`find_keys()` used to do is compared with a `KeyIndex` built once (the build
+time is reported separately).
+
+Usage: bench_find_keys.py [smallest number of key copies, default 1000]
+"""
+import sys
+
+from openpgp.code import *
+from openpgp.sap.list import list_pkts, list_msgs, KeyIndex
+
+from support import best_time, report, read_test_file, synthetic_keyring
+
+target = 'DSAELG2.revoked_uid.gpg'
+
+def linear_find_keys(keys, **kw):
+    action = kw.get('action')
+    uids = kw.get('userids', [])
+    keyids = kw.get('keyids', [])
+    keytargets = []
+
+    for key in keys:
+        _pids = [None, False, '', key.primary_id, key.primary_fprint]
+
+        if uids:
+            _uids = [u for u in key._b_userids.keys() if
+                        [(p,i) for (p,i) in uids if p in _pids and i in u]]
+
+            if not _uids:
+                continue
+
+        keypkts = [key._b_primary.leader]
+        keypkts.extend([b.leader for b in key._b_subkeys.list()])
+
+        if action:
+
+            if 'sign' == action:
+                keypkts = [p for p in keypkts if p.body.alg in ASYM_SIGNING]
+
+            elif 'encrypt' == action:
+                keypkts = [p for p in keypkts if p.body.alg in ASYM_ENCRYPTING]
+
+        if keyids:
+            _keypkts = []
+
+            for keypkt in keypkts:
+                _target_ids = [None, keypkt.body.id, keypkt.body.fingerprint]
+
+                for p, t in keyids:
+
+                    if p in _pids and t in _target_ids:
+                        _keypkts.append(keypkt)
+
+            keypkts = _keypkts
+
+        if keypkts:
+            keytargets.append((key, [p.body.fingerprint for p in keypkts]))
+
+    return keytargets
+
+def main(copies):
+    keymsgs = list_msgs(list_pkts(synthetic_keyring()))
+    targetmsg = list_msgs(list_pkts(read_test_file(['key', target])))[0]
+    by_keyid = {'keyids':[(None, targetmsg.primary_id)], 'action':'sign'}
+    by_userid = {'userids':[(None, targetmsg._b_userids.keys()[0][:8])]}
+
+    for n in [copies, copies * 4, copies * 16]:
+        keyring = keymsgs * n + [targetmsg]
+        name = "%6d keys" % len(keyring)
+        t = best_time(lambda: linear_find_keys(keyring, **by_keyid))
+        report("linear by key ID   %s" % name, t)
+        t = best_time(lambda: linear_find_keys(keyring, **by_userid))
+        report("linear by user ID  %s" % name, t)
+        t = best_time(lambda: KeyIndex(keyring))
+        report("KeyIndex build     %s" % name, t)
+        index = KeyIndex(keyring)
+        t = best_time(lambda: index.find(**by_keyid), number=100)
+        report("KeyIndex key ID    %s" % name, t)
+        t = best_time(lambda: index.find(**by_userid), number=100)
+        report("KeyIndex user ID   %s" % name, t)
+
+if '__main__' == __name__:
+    if 1 < len(sys.argv):
+        copies = int(sys.argv[1])
+    else:
+        copies = 1000
+
+    main(copies)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""Opening a large keyring
+
+Write a synthetic keyring (the test public keys repeated), native and
+ASCII-armored, and time parsing all of it the way the string API does, then
+opening it as a `Keyring` with no index (the index is built), with an up to
+date index, and with an up to date index plus one key lookup. Every key is
+in the keyring many times over, so the lookup parses only the first key
+message it finds.
+
+Usage: bench_keyring_cache.py [number of copies, default 3000]
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+from openpgp.sap.armory import ArmorWriter, list_armored
+from openpgp.sap.keyring import Keyring
+from openpgp.sap.list import list_pkts, list_msgs
+
+from support import best_time, report, keyring_keys, synthetic_keyring
+
+def write_keyrings(tmpdir, copies):
+    key_d = synthetic_keyring()
+    native = os.path.join(tmpdir, 'pubring.gpg')
+    f = file(native, 'wb')
+    f.write(key_d * copies)
+    f.close()
+    armored = os.path.join(tmpdir, 'pubring.asc')
+    f = file(armored, 'wb')
+    w = ArmorWriter(f, "-----BEGIN PGP PUBLIC KEY BLOCK-----",
+                    "-----END PGP PUBLIC KEY BLOCK-----")
+
+    for i in range(copies):
+        w.write(key_d)
+
+    w.close()
+    f.close()
+    return native, armored
+
+def parse_all(filename):
+    d = file(filename, 'rb').read()
+
+    if not 0x80 & ord(d[0]):
+        d = ''.join([a.data for a in list_armored(d)])
+
+    return list_msgs(list_pkts(d))
+
+def open_close(filename, keyid=None):
+    keyring = Keyring(filename)
+
+    if keyid:
+        assert keyring._load(keyring._match_keyids([keyid])[:1])
+
+    keyring.close()
+
+def main(copies):
+    tmpdir = tempfile.mkdtemp()
+
+    try:
+        native, armored = write_keyrings(tmpdir, copies)
+        keyid = parse_all(native)[-1].primary_id
+        print "%s keys" % (len(keyring_keys) * copies)
+
+        for name, filename in [("native", native), ("armored", armored)]:
+            t = time.time()
+            parse_all(filename)
+            report("%s, parse everything" % name, time.time() - t)
+            t = time.time()
+            open_close(filename)
+            report("%s, Keyring without index" % name, time.time() - t)
+            t = best_time(lambda: open_close(filename))
+            report("%s, Keyring with index" % name, t)
+            t = best_time(lambda: open_close(filename, keyid))
+            report("%s, Keyring with index, lookup" % name, t)
+
+    finally:
+        shutil.rmtree(tmpdir)
+
+if '__main__' == __name__:
+    if 1 < len(sys.argv):
+        copies = int(sys.argv[1])
+    else:
+        copies = 3000
+
+    main(copies)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+"""Lazy key messages
+
+List the key messages of a synthetic keyring (the test public keys repeated)
+eagerly and lazily, then list them lazily and look up the last subkey of each
+message, which builds only the primary and subkey blocks. Packets are listed
+lazily throughout.
+
+Usage: bench_lazy_keymsg.py [number of copies, default 1000]
+"""
+import sys
+
+from openpgp.sap.list import list_pkts, list_msgs
+
+from support import best_time, report, synthetic_keyring
+
+keys = ['DSAELG1.pub.gpg', 'DSAELG2.subkeyrevoc.gpg', 'DSAELG3.pub.gpg',
+        'RSA1.pub.gpg']
+
+def lookup(d, keyids):
+    for keymsg in list_msgs(list_pkts(d, lazy=True), lazy=True):
+        keymsg.get_keypkt(keyids[keymsg.primary_id])
+
+def main(copies):
+    d = synthetic_keyring(copies, keys)
+    keyids = {}
+
+    for keymsg in list_msgs(list_pkts(d[:len(d) // copies])):
+        keyids[keymsg.primary_id] = keymsg.list_keyids()[-1]
+
+    print "%s keys" % (len(keys) * copies)
+    t = best_time(lambda: list_msgs(list_pkts(d, lazy=True)))
+    report("list_msgs, eager", t, len(d))
+    t = best_time(lambda: list_msgs(list_pkts(d, lazy=True), lazy=True))
+    report("list_msgs, lazy", t, len(d))
+    t = best_time(lambda: lookup(d, keyids))
+    report("list_msgs, lazy, get_keypkt(last subkey)", t, len(d))
+
+if '__main__' == __name__:
+    if 1 < len(sys.argv):
+        copies = int(sys.argv[1])
+    else:
+        copies = 1000
+
+    main(copies)
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+"""Message grouping scaling
+
+Group the packets of synthetic keyrings of growing size (the test public keys
+repeated) into messages with `list_msgs()`, and report the time per packet
+and the process's peak memory. Both should stay flat as the keyring grows.
+`iter_msgs()` is timed over a packet iterator as well.
+
+Usage: bench_list_msgs.py [smallest number of key copies, default 250]
+"""
+import resource
+import sys
+
+from openpgp.sap.list import list_pkts, list_msgs, iter_msgs
+
+from support import best_time, report, synthetic_keyring
+
+def main(copies):
+    pkts = list_pkts(synthetic_keyring())
+
+    for n in [copies, copies * 2, copies * 4, copies * 8]:
+        keyring = pkts * n
+        t = best_time(lambda: list_msgs(keyring))
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        report("list_msgs %6d packets" % len(keyring), t)
+        print "%-40s %10.3f us/packet, peak %d KB" % ('', t / len(keyring) * 1e6, peak)
+        t = best_time(lambda: [m for m in iter_msgs(iter(keyring))])
+        report("iter_msgs %6d packets" % len(keyring), t)
+
+if '__main__' == __name__:
+    if 1 < len(sys.argv):
+        copies = int(sys.argv[1])
+    else:
+        copies = 250
+
+    main(copies)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""Packet listing throughput
+
+List the packets of a synthetic keyring (the test public keys repeated) from
+a string, lazily (headers only) and from a memory-mapped file, and report
+MB/s. Parsing should scale
+linearly with the keyring size.
+
+Usage: bench_list_pkts.py [number of key copies, default 2000]
+"""
+import mmap
+import os
+import sys
+import tempfile
+
+from openpgp.sap.list import list_pkts
+
+from support import best_time, report, synthetic_keyring
+
+def main(copies):
+    keyring = synthetic_keyring(copies)
+    fd, path = tempfile.mkstemp()
+    os.write(fd, keyring)
+    os.close(fd)
+
+    t = best_time(lambda: list_pkts(keyring))
+    report("list_pkts string", t, len(keyring))
+
+    t = best_time(lambda: list_pkts(keyring, lazy=True))
+    report("list_pkts string lazy", t, len(keyring))
+
+    f = file(path, 'rb')
+    m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    t = best_time(lambda: list_pkts(m))
+    report("list_pkts mmap", t, len(keyring))
+    m.close()
+    f.close()
+    os.remove(path)
+
+if '__main__' == __name__:
+    if 1 < len(sys.argv):
+        copies = int(sys.argv[1])
+    else:
+        copies = 2000
+
+    main(copies)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+"""Keyring memory use
+
+Parse a synthetic keyring (the test public keys repeated) into packets,
+eagerly and lazily, and into key messages, and report how much the process
+grew per key (resident size, from /proc/self/statm) next to the keyring's
+own size per key. Each step runs in its own child process.
+
+Usage: bench_memory.py [number of copies, default 3000]
+"""
+import gc
+import os
+import sys
+
+from openpgp.sap.list import list_pkts, list_msgs
+
+from support import in_child, keyring_keys, synthetic_keyring
+
+def rss():
+    f = file('/proc/self/statm')
+    pages = int(f.read().split()[1])
+    f.close()
+    return pages * os.sysconf('SC_PAGE_SIZE')
+
+def grow(name, parse, keyring, count):
+    gc.collect()
+    before = rss()
+    parsed = parse(keyring)
+    gc.collect()
+    print "%-40s %10.0f bytes/key" % (name, (rss() - before) / float(count))
+
+def main(copies):
+    keyring = synthetic_keyring(copies)
+    count = len(keyring_keys) * copies
+    print "%-40s %10.0f bytes/key" % ("keyring data", len(keyring) / float(count))
+    in_child(grow, "packets", list_pkts, keyring, count)
+    in_child(grow, "packets, lazy", lambda d: list_pkts(d, lazy=True),
+             keyring, count)
+    in_child(grow, "key messages", lambda d: list_msgs(list_pkts(d)),
+             keyring, count)
+
+if '__main__' == __name__:
+    if 1 < len(sys.argv):
+        copies = int(sys.argv[1])
+    else:
+        copies = 3000
+
+    main(copies)
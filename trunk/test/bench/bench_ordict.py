@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""Key messages with many user IDs
+
+Make a synthetic key with thousands of user IDs (the first test public key's
+user ID and self-signature repeated under different names) and time listing
+its key message, with the current `ordict` and with the list-scanning one it
+replaced. Then time the `ordict` operations themselves: adding keys, looking
+them up by key and by index, and deleting them from the front, from the back
+and from the middle while reading by index.
+
+Usage: bench_ordict.py [number of user IDs, default 10000]
+"""
+import sys
+
+import openpgp.sap.util.ordict as ORD
+
+from openpgp.sap.list import list_pkts, list_msgs
+
+from support import best_time, report, read_test_file
+
+class ordict_before(dict):
+
+    def __init__(self):
+        self.keylist = []
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        if key not in self.keylist:
+            self.keylist.append(key)
+
+    def __getitem__(self, key):
+        try:
+            return dict.__getitem__(self, key)
+        except KeyError:
+            if isinstance(key, int) and key < len(self.keylist):
+                return dict.__getitem__(self, self.keylist[key])
+            else:
+                raise
+
+    def __delitem__(self, key):
+        try:
+            dict.__delitem__(self, key)
+        except KeyError:
+            if isinstance(key, int) and key < len(self.keylist):
+                dict.__delitem__(self, self.keylist[key])
+            else:
+                raise
+        self.keylist.pop(key)
+
+    def list(self):
+        return [dict.__getitem__(self, key) for key in self.keylist]
+
+def make_key(count):
+    primary, uid, uidsig, subkey, subkeysig = \
+        list_pkts(read_test_file(['key', 'DSAELG1.pub.gpg']))
+    d = [primary.rawstr()]
+
+    for i in range(count):
+        uid_d = "%s %s" % (uid.body.value, i)
+        d.extend(['\xb4', chr(len(uid_d)), uid_d, uidsig.rawstr()])
+
+    d.extend([subkey.rawstr(), subkeysig.rawstr()])
+    return ''.join(d)
+
+def fill(cls, keys):
+    d = cls()
+
+    for k in keys:
+        d[k] = k
+
+    return d
+
+def lookup(d, keys):
+    for k in keys:
+        d[k]
+
+def index(d, count):
+    for i in xrange(count):
+        d[i]
+
+def delete(d, keys):
+    for k in keys:
+        del d[k]
+
+def delete_first(d):
+    while d:
+        del d[0]
+
+def delete_last(d):
+    while d:
+        del d[-1]
+
+def delete_middle(d):
+    while 2 < len(d):
+        del d[len(d) // 2]
+        d[len(d) - 1]
+
+def main(count):
+    pkts = list_pkts(make_key(count))
+    keys = ['user %s' % i for i in range(count)]
+    after = ORD.ordict
+
+    for name, cls in [("before", ordict_before), ("now", after)]:
+        ORD.ordict = cls # KeyMsg reaches it through ORD
+
+        try:
+            keymsg = list_msgs(pkts)[0]
+            assert count == len(keymsg._b_userids.keylist)
+            t = best_time(lambda: list_msgs(pkts))
+            report("key with %s user IDs, %s" % (count, name), t)
+
+        finally:
+            ORD.ordict = after
+
+        d = fill(cls, keys)
+        report("%s sets, %s" % (count, name), best_time(lambda: fill(cls, keys)))
+        report("%s gets by key, %s" % (count, name),
+               best_time(lambda: lookup(d, keys)))
+        report("%s gets by index, %s" % (count, name),
+               best_time(lambda: index(d, count)))
+
+        if cls is after: # the old one can only delete by index
+            report("%s sets and deletes by key, %s" % (count, name),
+                   best_time(lambda: delete(fill(cls, keys), keys)))
+
+        for what, func in [("first", delete_first), ("last", delete_last),
+                           ("middle", delete_middle)]:
+            report("%s sets and deletes of the %s, %s" % (count, what, name),
+                   best_time(lambda: func(fill(cls, keys))))
+
+if '__main__' == __name__:
+    if 1 < len(sys.argv):
+        count = int(sys.argv[1])
+    else:
+        count = 10000
+
+    main(count)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""Packet parsing rate
+
+List the packets of a synthetic keyring (the test public keys repeated) and
+of a run of signed and encrypted messages, eagerly and lazily, and report
+packets/s. Each is done with the packet class table and with the
+import-per-packet lookup it replaced.
+
+Usage: bench_parse.py [number of copies, default 1000]
+"""
+import sys
+
+import openpgp.sap.list as LIST
+
+from openpgp.sap.pkt.Packet import pktclasses, pktclass
+
+from support import best_time, read_test_file, synthetic_keyring
+
+msgs = [['sig', 'sig.DSAELG1.onepass.gpg'], ['sig', 'sig.RSA1.onepass.gpg'],
+        ['sig', 'sig.DSAELG1.detached.gpg'],
+        ['enc', 'pub.elg.aes256.clrtxt.gpg']]
+
+def pktclass_import(i):
+    if i in pktclasses:
+        cn = pktclasses[i]
+        mod = __import__("openpgp.sap.pkt.%s" % cn, None, None, [cn])
+        return mod.__dict__[cn]
+
+def rate(name, d, lazy):
+    count = len(LIST.list_pkts(d))
+    t = best_time(lambda: LIST.list_pkts(d, lazy=lazy))
+    print "%-40s %10.0f packets/s" % (name, count / t)
+
+def main(copies):
+    keyring = synthetic_keyring(copies)
+    messages = ''.join([read_test_file(m) for m in msgs]) * copies
+
+    for lazy in [False, True]:
+
+        for name, d in [("keyring", keyring), ("messages", messages)]:
+            name = "%s%s" % (name, lazy and ", lazy" or "")
+            LIST.pktclass = pktclass_import
+
+            try:
+                rate("%s, import" % name, d, lazy)
+
+            finally:
+                LIST.pktclass = pktclass
+
+            rate("%s, table" % name, d, lazy)
+
+    for name, lookup in [("import", pktclass_import), ("table", pktclass)]:
+        t = best_time(lambda: lookup(13), number=100000)
+        print "%-40s %10.0f lookups/s" % ("pktclass(13) %s" % name, 1 / t)
+
+if '__main__' == __name__:
+    if 1 < len(sys.argv):
+        copies = int(sys.argv[1])
+    else:
+        copies = 1000
+
+    main(copies)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""Iterated and salted S2K
+
+Derive an AES-256 key with the chunked `string2key()` (cache off) and with
+the build-the-whole-stream version it replaced, for GnuPG's default count,
+a middling one and the largest count an S2K can encode. Then time a cached
+derivation. Reports MB/s of hashed stream.
+
+Usage: bench_s2k.py
+"""
+import sha
+import md5
+
+from openpgp.code import *
+import openpgp.sap.crypto as CRYPT
+from openpgp.sap.crypto import string2key, _keysize
+
+from support import best_time, report
+
+class S2K:
+
+    def __init__(self, count):
+        self.type = 3
+        self.alg_hash = HASH_SHA1
+        self.salt = '\xd6\xcd\xd8\x35\x70\x06\x22\xdf'
+        self.count = count
+
+def string2key_joined(s2k, k_sym, passphrase):
+    hasher = {HASH_MD5:md5, HASH_SHA1:sha}[s2k.alg_hash]
+    salt, count = s2k.salt, s2k.count
+    len_passphrase = len(passphrase)
+    keysize = _keysize(k_sym)
+    pos, run, result = 0, 0, ''
+
+    while pos < keysize:
+        md = ['\x00'] * run
+        done = 0
+
+        while (count - done) > (len_passphrase + len(salt)):
+            md.append(salt)
+            md.append(passphrase)
+            done = done + len_passphrase + len(salt)
+
+        for c in salt + passphrase:
+
+            if done < count:
+                md.append(c)
+                done += 1
+
+        hash = hasher.new(''.join(md)).digest()
+        size = min(len(hash), keysize - pos)
+        result = result[:pos] + hash[:size]
+        pos += size
+        run += 1
+
+    return result
+
+def main():
+    for count in [65536, 1048576, 65011712]:
+        s2k = S2K(count)
+        assert string2key(s2k, SYM_AES256, 'test') == \
+               string2key_joined(s2k, SYM_AES256, 'test')
+        t = best_time(lambda: string2key_joined(s2k, SYM_AES256, 'test'), repeat=1)
+        report("joined stream (before), count %s" % count, t, 2 * count)
+        t = best_time(lambda: string2key(s2k, SYM_AES256, 'test'), repeat=1)
+        report("chunked, count %s" % count, t, 2 * count)
+
+    CRYPT.s2k_lifetime = 300
+    string2key(s2k, SYM_AES256, 'test')
+    t = best_time(lambda: string2key(s2k, SYM_AES256, 'test'), number=100)
+    report("cached, count %s" % count, t)
+
+if '__main__' == __name__:
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""Signing large data
+
+Make a detached text signature on a temporary file with sign_file(), which
+reads and hashes it a chunk at a time, and on the same data held in a string
+with crypto.sign() (the sign_str() path). Reports MB/s and how much the
+process grew (peak resident size) during each run. sign_file() runs first so
+its growth isn't hidden by the string run.
+
+Usage: bench_sign_file.py [size in MB, default 64]
+"""
+import os
+import sys
+import time
+import tempfile
+
+from openpgp.code import *
+from openpgp.sap.api import sign_file
+from openpgp.sap.crypto import sign
+from openpgp.sap.list import list_as_signed
+
+from support import maxrss_mb, report, read_test_file
+
+def main(size):
+    seckey_d = read_test_file(['key', 'DSAELG1.sec.asc'])
+    keymsg = list_as_signed(seckey_d)[0]
+    keypkt = keymsg.get_keypkt(keymsg.primary_id)
+    line = "All work and no play makes Jack a dull boy.\n"
+    fd, filename = tempfile.mkstemp()
+    f = os.fdopen(fd, 'wb')
+    block = line * (1024 * 1024 // len(line))
+
+    for i in range(size):
+        f.write(block)
+
+    f.close()
+    nbytes = os.path.getsize(filename)
+
+    try:
+        before = maxrss_mb()
+        t = time.time()
+        sign_file(SIG_TEXT, seckey_d, file(filename, 'rb'), passphrase='test')
+        report("sign_file (grew %.1f MB)" % (maxrss_mb() - before),
+               time.time() - t, nbytes)
+
+        before = maxrss_mb()
+        t = time.time()
+        d = file(filename, 'rb').read()
+        sign(SIG_TEXT, d, keypkt, passphrase='test')
+        report("whole string (grew %.1f MB)" % (maxrss_mb() - before),
+               time.time() - t, nbytes)
+
+    finally:
+        os.remove(filename)
+
+if '__main__' == __name__:
+    if 1 < len(sys.argv):
+        size = int(sys.argv[1])
+    else:
+        size = 64
+
+    main(size)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""Integer/string and MPI conversions
+
+Convert integers of 1 to 8192 bits to strings and back, and MPIs to values
+and back, with the current `strnum` functions and the byte-at-a-time and
+hex()-based versions they replaced. Then list the packets of a synthetic
+keyring (mostly MPIs) with both `str2int()` versions.
+
+Usage: bench_strnum.py
+"""
+import struct
+import binascii
+
+import openpgp.sap.util.strnum as STN
+
+from openpgp.sap.pkt.MPI import MPI
+from openpgp.sap.list import list_pkts
+
+from support import best_time, report, synthetic_keyring
+
+def str2int_bytes(s):
+    l = 0L
+
+    for i in map(ord, s):
+        l = (l * 256) + i
+
+    try:
+        return int(l)
+
+    except OverflowError:
+        return l
+
+def int2str_hex(n):
+    h = hex(n)[2:]
+    if h[-1] in ['l', 'L']:
+        h = h[:-1]
+    if 1 == len(h) % 2:
+        h = ''.join(['0', h])
+    return binascii.unhexlify(h)
+
+def sigbits_masks(c):
+    i = str2int_bytes(c)
+    bitmasks = [0x80, 0x40, 0x20, 0x10, 0x08, 0x04, 0x02, 0x01]
+    for m in range(len(bitmasks)):
+        if i & bitmasks[m] == bitmasks[m]:
+            return 8 - m
+    return 0
+
+def int2mpi_before(i):
+    i_d = int2str_hex(i)
+    bit_count = sigbits_masks(i_d[0]) + (8 * (len(i_d) - 1))
+    i_length_str = int2str_hex(bit_count)
+
+    if 1 == len(i_length_str):
+        i_length_str = ''.join(['\x00', i_length_str])
+
+    return ''.join([i_length_str, i_d])
+
+def mpi2int_before(d):
+    int_d = d[2:2 + (str2int_bytes(d[:2]) + 7) / 8]
+    i = struct.unpack('>' + str(len(int_d)) + 's', int_d)[0]
+    return str2int_bytes(i)
+
+def main():
+    number = 2000
+
+    for bits in [1, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192]:
+        i = 2**bits - 1 - bits // 2
+        d = STN.int2str(i)
+        mpi_d = STN.int2mpi(i)
+        assert str2int_bytes(d) == STN.str2int(d) == i
+        assert int2str_hex(i) == d
+        assert int2mpi_before(i) == mpi_d
+        assert mpi2int_before(mpi_d) == MPI(mpi_d).value == i
+
+        for name, before, after, arg in [
+                ("str2int", str2int_bytes, STN.str2int, d),
+                ("int2str", int2str_hex, STN.int2str, i),
+                ("MPI value", mpi2int_before, lambda m: MPI(m).value, mpi_d),
+                ("int2mpi", int2mpi_before, STN.int2mpi, i)]:
+            t_before = best_time(lambda: before(arg), number=number)
+            t_after = best_time(lambda: after(arg), number=number)
+            report("%s %s bits, before" % (name, bits), t_before)
+            report("%s %s bits, now (x%.1f)" % (name, bits, t_before / t_after),
+                   t_after)
+
+    keyring = synthetic_keyring(200)
+    fast = STN.str2int
+    STN.str2int = str2int_bytes # everything else reaches it through STN
+
+    try:
+        t = best_time(lambda: list_pkts(keyring))
+        report("list_pkts keyring, byte loop str2int", t, len(keyring))
+
+    finally:
+        STN.str2int = fast
+
+    t = best_time(lambda: list_pkts(keyring))
+    report("list_pkts keyring, now", t, len(keyring))
+
+if '__main__' == __name__:
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+"""Verification cache
+
+Verify the same detached signature (and the signer's key blocks), as happens
+when mail from the same sender keeps coming in, with the verification caches
+emptied each time and with them warm.
+
+Usage: bench_verify_cache.py [number of verifications, default 20]
+"""
+import sys
+
+from openpgp.sap.api import verify_msg, block_cache
+from openpgp.sap.crypto import verify_cache
+from openpgp.sap.list import list_pkts, list_msgs
+
+from support import best_time, report, read_test_file
+
+def main(number):
+    sig_d = read_test_file(['sig', 'sig.DSAELG1.detached.gpg'])
+    det_d = read_test_file(['cleartext.txt'])
+    key_d = read_test_file(['key', 'DSAELG1.pub.gpg'])
+    sigpkt = list_pkts(sig_d)[0]
+    keymsg = list_msgs(list_pkts(key_d))[0]
+
+    def verify(clear):
+
+        if clear:
+            verify_cache.clear()
+            block_cache.clear()
+
+        assert det_d == verify_msg(([sigpkt], det_d), keymsg)
+
+    t = best_time(lambda: verify(True), number=number)
+    report("verify_msg, cold caches", t)
+    t = best_time(lambda: verify(False), number=number)
+    report("verify_msg, warm caches", t)
+
+if '__main__' == __name__:
+    if 1 < len(sys.argv):
+        number = int(sys.argv[1])
+    else:
+        number = 20
+
+    main(number)
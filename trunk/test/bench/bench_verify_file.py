@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""Verifying a large signed message
+
+Sign some text as a one-pass signed message, write it to a temporary file and
+verify it with verify_file(), which passes the literal data through the
+signature hashes a buffer at a time, and with verify_str() on the file's
+contents. Reports MB/s and how much the process grew (peak resident size)
+during each run. Each step runs in its own child process so the peaks don't
+hide each other.
+
+Usage: bench_verify_file.py [size in MB, default 32]
+"""
+import os
+import sys
+import time
+import tempfile
+
+from openpgp.code import *
+from openpgp.sap.api import sign_str, verify_str, verify_file
+
+from support import in_child, maxrss_mb, report, read_test_file
+
+class NullSink:
+
+    def write(self, d):
+        pass
+
+def write_signed(filename, size):
+    seckey_d = read_test_file(['key', 'DSAELG1.sec.asc'])
+    line = "All work and no play makes Jack a dull boy.\n"
+    lit_d = line * (size * 1024 * 1024 // len(line))
+    signed_d = sign_str(SIG_BINARY, seckey_d, target=lit_d, passphrase='test')
+    f = file(filename, 'wb')
+    f.write(signed_d)
+    f.close()
+
+def time_verify(name, verifier, filename, size):
+    pubkey_d = read_test_file(['key', 'DSAELG1.pub.asc'])
+    before = maxrss_mb()
+    t = time.time()
+    assert verifier(filename, pubkey_d)
+    report("%s (grew %.1f MB)" % (name, maxrss_mb() - before),
+           time.time() - t, size * 1024 * 1024)
+
+def main(size):
+    fd, filename = tempfile.mkstemp()
+    os.close(fd)
+
+    try:
+        in_child(write_signed, filename, size)
+        in_child(time_verify, "verify_file",
+                 lambda fn, k: verify_file(file(fn, 'rb'), NullSink(), k),
+                 filename, size)
+        in_child(time_verify, "verify_str",
+                 lambda fn, k: verify_str(file(fn, 'rb').read(), k),
+                 filename, size)
+
+    finally:
+        os.remove(filename)
+
+if '__main__' == __name__:
+    if 1 < len(sys.argv):
+        size = int(sys.argv[1])
+    else:
+        size = 32
+
+    main(size)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""Batch verification
+
+Verify a batch of distinct signed messages from one signer, one at a time
+with verify_str() and all at once with verify_many() using 1 to N worker
+processes. The verification caches are emptied before each run. Speedups
+past one worker depend on the number of cores (and the batch size).
+
+Usage: bench_verify_many.py [number of messages, default 64] [max workers, default 4]
+"""
+import sys
+
+from openpgp.sap.api import sign_str, verify_str, verify_many, block_cache
+from openpgp.sap.crypto import verify_cache
+
+from support import best_time, report, read_test_file
+
+def main(number, max_workers):
+    seckey_d = read_test_file(['key', 'DSAELG1.sec.asc'])
+    key_d = read_test_file(['key', 'DSAELG1.pub.asc'])
+    items = []
+
+    for i in range(number):
+        items.append(sign_str(0x00, seckey_d, target="message %s\n" % i,
+                              use_userid=(None, 'Tester'), passphrase='test'))
+
+    def serial():
+        verify_cache.clear()
+        block_cache.clear()
+
+        for item in items:
+            assert verify_str(item, key_d)
+
+    def batch(workers):
+        verify_cache.clear()
+        block_cache.clear()
+        assert False not in verify_many(items, key_d, workers=workers)
+
+    t = best_time(serial)
+    report("verify_str x %s" % number, t)
+    workers = 1
+
+    while workers <= max_workers:
+        t = best_time(lambda: batch(workers))
+        report("verify_many x %s, %s worker(s)" % (number, workers), t)
+        workers = workers * 2
+
+if '__main__' == __name__:
+    if 1 < len(sys.argv):
+        number = int(sys.argv[1])
+    else:
+        number = 64
+
+    if 2 < len(sys.argv):
+        max_workers = int(sys.argv[2])
+    else:
+        max_workers = 4
+
+    main(number, max_workers)
@@ -0,0 +1,106 @@
+"""Benchmark helpers
+
+Benchmarks are plain scripts, run them one at a time from this directory
+with the package on the path::
+
+    PYTHONPATH=../../src python bench_cfb.py
+
+Numbers are the best of a few runs, reported on stdout. They're meant for
+spotting regressions on the same machine, not for comparing machines.
+"""
+import os
+import time
+import resource
+
+curdir = os.path.dirname(os.path.abspath(__file__))
+sepjoin = os.sep.join
+
+pgpfiles = sepjoin([curdir, os.pardir, 'sap', 'public', 'pgpfiles'])
+
+def read_test_file(path_from_pgpfiles):
+    f = file(sepjoin([pgpfiles]+path_from_pgpfiles), 'rb')
+    s = f.read()
+    f.close()
+    return s
+
+keyring_keys = ['DSAELG1.pub.gpg', 'DSAELG3.pub.gpg', 'RSA1.pub.gpg']
+
+def synthetic_keyring(copies=1, names=keyring_keys):
+    """Make up a keyring out of test public keys.
+
+    :Parameters:
+        - `copies`: integer number of times the keys are repeated
+        - `names`: list of key file names (in pgpfiles/key), default
+          `keyring_keys`
+
+    :Returns: string of native OpenPGP data
+    """
+    return ''.join([read_test_file(['key', n]) for n in names]) * copies
+
+def best_time(func, repeat=3, number=1):
+    """Time a function call.
+
+    :Parameters:
+        - `func`: callable taking no arguments
+        - `repeat`: integer number of timing runs
+        - `number`: integer number of calls per run
+
+    :Returns: float best (lowest) number of seconds per call
+    """
+    best = None
+
+    for i in range(repeat):
+        start = time.time()
+
+        for j in xrange(number):
+            func()
+
+        t = (time.time() - start) / number
+
+        if best is None or t < best:
+            best = t
+
+    return best
+
+def report(name, seconds, nbytes=None):
+    """Print a benchmark result line.
+
+    :Parameters:
+        - `name`: string benchmark name
+        - `seconds`: float seconds per call
+        - `nbytes`: optional integer number of bytes handled per call, used
+          to add a MB/s figure
+    """
+    line = "%-40s %10.3f ms" % (name, seconds * 1000)
+
+    if nbytes is not None and seconds:
+        line = "%s %10.2f MB/s" % (line, nbytes / seconds / (1024 * 1024))
+
+    print line
+
+def maxrss_mb():
+    """Find the peak resident size of this process so far.
+
+    :Returns: float number of MB (Linux counts ru_maxrss in kB)
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+def in_child(func, *args):
+    """Run a function in a child process.
+
+    The child starts at its parent's size and keeps its own peak size, so
+    memory figures taken inside `func` don't include earlier steps.
+
+    :Parameters:
+        - `func`: callable
+        - `args`: arguments for `func`
+    """
+    pid = os.fork()
+
+    if 0 == pid:
+        try:
+            func(*args)
+        finally:
+            os._exit(0)
+
+    os.waitpid(pid, 0)
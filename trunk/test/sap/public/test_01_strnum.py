@@ -12,9 +12,14 @@ from openpgp.sap.util.strnum import int2doubleoct
 from openpgp.sap.util.strnum import doubleoct2int
 from openpgp.sap.util.strnum import str2hex
 from openpgp.sap.util.strnum import hex2str
+from openpgp.sap.util.strnum import int2mpi
+from openpgp.sap.util.strnum import mpilen2int
+from openpgp.sap.util.strnum import sigbits
+from openpgp.sap.util.strnum import checksum
 
 # package help
 from openpgp.sap.list import list_pkts
+from openpgp.sap.pkt.MPI import MPI, create_MPI
 
 # test help
 from support import read_test_file
@@ -149,6 +154,45 @@ class A5FunkyStuff(unittest.TestCase):
         xprint = str2hex(hex2str(fprint))
         self.assertEqual(fprint, xprint)
 
+class A6MPIs(unittest.TestCase):
+    """
+    """
+    bit_lengths = [1, 7, 8, 9, 15, 16, 17, 31, 32, 33, 63, 64, 65, 160, 1023,
+                   1024, 2048, 4096, 8191, 8192]
+
+    def testA0Widths(self):
+        "strnum: str2int/int2str at every width, leading zeros"
+        for bits in self.bit_lengths:
+            for i in [2**bits - 1, 2**(bits - 1), 2**(bits - 1) + bits // 2]:
+                d = int2str(i)
+                self.assertEqual((bits + 7) // 8, len(d))
+                self.assertEqual(i, str2int(d))
+                self.assertEqual(i, str2int('\x00\x00' + d))
+                self.assertEqual(bits, 8 * (len(d) - 1) + sigbits(d[0]))
+
+        self.assertEqual('\x00', int2str(0))
+        self.assertEqual(0, str2int(''))
+
+    def testB0Int2MPI(self):
+        "strnum: int2mpi output and MPI inversion"
+        self.assertEqual('\x00\x09\x01\xff', int2mpi(511))
+        self.assertEqual('\x00\x01\x01', int2mpi(1))
+
+        for bits in self.bit_lengths:
+            i = 2**bits - 1 - bits // 2
+            mpi = MPI(int2mpi(i) + 'trailing')
+            self.assertEqual(i, mpi.value)
+            self.assertEqual(i.bit_length(), mpi.bit_length)
+            self.assertEqual(mpi.length, mpilen2int(mpi._d[:2]))
+            self.assertEqual(mpi._d, create_MPI(i)._d)
+
+        self.assertRaises(ValueError, int2mpi, 2**65536)
+
+    def testC0Checksum(self):
+        "strnum: checksum mod 65536"
+        self.assertEqual(0, checksum(''))
+        self.assertEqual((255 * 300) % 65536, checksum('\xff' * 300))
+
 
 if '__main__' == __name__:
     unittest.main()
@@ -6,6 +6,7 @@ import unittest
 from openpgp.sap.util.misc import unique_order
 from openpgp.sap.util.misc import order_intersection
 from openpgp.sap.util.misc import intersect_order
+from openpgp.sap.util.misc import LRUCache
 
 # test help
 from support import read_test_file
@@ -60,6 +61,25 @@ class ReallyMiscellaneousStuff(unittest.TestCase):
         tl = intersect_order(ll)
         self.assertEqual(tl, [1, 3, 4, 5, 10])
 
+    def testA06LRUCache(self):
+        """misc: LRUCache eviction and expiration"""
+        cache = LRUCache(4)
+
+        for i in range(4):
+            cache.set(i, str(i))
+
+        self.assertEqual('0', cache.get(0)) # 1 is now least recently used
+        cache.set(4, '4')
+        self.assertEqual(4, len(cache)) # dropped a quarter (one) first
+        self.assertEqual(None, cache.get(1))
+        self.assertEqual('4', cache.get(4))
+        cache.set(5, '5', expires=0)
+        self.assertEqual('gone', cache.get(5, 'gone'))
+        self.assertEqual(2, cache.hits)
+        self.assertEqual(2, cache.misses)
+        cache.clear()
+        self.assertEqual(0, len(cache))
+
 
 if '__main__' == __name__:
     unittest.main()
@@ -1,5 +1,6 @@
 "Ordered dictionary tests"
 
+import random
 import unittest
 
 # test target
@@ -28,5 +29,105 @@ class A00DictionaryTests(unittest.TestCase):
         del d[0]
         self.assertEqual(d.list(), [33])
 
+    def testA04(self):
+        "util.ordict: __delitem__ via key keeps the order"
+        d = ordict()
+
+        for i in range(10):
+            d['k%s' % i] = i
+
+        for i in [3, 4, 5, 6, 7, 0]:
+            del d['k%s' % i]
+
+        d['k3'] = 3
+        d['k1'] = 11
+        self.assertEqual(['k1', 'k2', 'k8', 'k9', 'k3'], d.keylist)
+        self.assertEqual([11, 2, 8, 9, 3], d.list())
+        self.assertEqual(d.keylist, d.keys())
+        self.assertEqual(d.list(), d.values())
+        self.assertEqual(zip(d.keys(), d.values()), d.items())
+        self.assertEqual(d.keylist, list(d))
+        self.assertEqual(9, d[3])
+        self.assertEqual(3, d[-1])
+        self.assertRaises(KeyError, d.__getitem__, 5)
+        self.assertRaises(KeyError, d.__delitem__, 'k0')
+        self.assertEqual(False, 'k0' in d)
+
+    def testA05(self):
+        "util.ordict: copies keep the order"
+        import copy
+        d = ordict()
+        d['b'] = [1]
+        d['a'] = [2]
+        d['c'] = [3]
+        del d['a']
+        c = copy.deepcopy(d)
+        self.assertEqual(['b', 'c'], c.keylist)
+        self.assertEqual([[1], [3]], c.list())
+        self.assertEqual([3], c[1])
+        self.assertEqual(2, len(c))
+    def testA06(self):
+        "util.ordict: index access and deletes match a list"
+        rnd = random.Random(7)
+
+        for trial in range(100):
+            d, keys = ordict(), []
+
+            for step in range(rnd.randint(1, 200)):
+                op = rnd.random()
+
+                if op < 0.4 or not keys:
+                    key = 'k%s' % rnd.randint(0, 50)
+                    d[key] = key
+
+                    if key not in keys:
+                        keys.append(key)
+
+                elif op < 0.55:
+                    i = rnd.randint(-len(keys), len(keys) - 1)
+                    del d[i]
+                    del keys[i]
+
+                elif op < 0.7:
+                    key = rnd.choice(keys)
+                    del d[key]
+                    keys.remove(key)
+
+                else:
+                    i = rnd.randint(-len(keys), len(keys) - 1)
+                    self.assertEqual(keys[i], d[i])
+
+            self.assertEqual(keys, d.keylist)
+            self.assertEqual(keys, d.list())
+
+        d = ordict()
+        d['a'] = 1
+        del d[0]
+        self.assertEqual([], d.keylist)
+        self.assertRaises(KeyError, d.__getitem__, 0)
+
+
+    def testA07(self):
+        "util.ordict: setdefault(), popitem(), copy() and update() keep the order"
+        d = ordict()
+        self.assertEqual(1, d.setdefault('x', 1))
+        self.assertEqual(1, d.setdefault('x', 2))
+        d['y'] = 3
+        d.update([('z', 4), ('x', 5)])
+        self.assertEqual(['x', 'y', 'z'], d.keys())
+        self.assertEqual([5, 3, 4], d.values())
+        c = d.copy()
+        self.assertEqual(ordict, c.__class__)
+        self.assertEqual(d.items(), c.items())
+        self.assertEqual(('z', 4), d.popitem())
+        self.assertEqual(['x', 'y'], d.keylist)
+        self.assertEqual([5, 3], d.list())
+        self.assertEqual(3, d[1])
+        self.assertEqual(('y', 3), d.popitem())
+        self.assertEqual(('x', 5), d.popitem())
+        self.assertRaises(KeyError, d.popitem)
+        self.assertEqual(['x', 'y', 'z'], c.keylist)
+
+
 if '__main__' == __name__:
     unittest.main()
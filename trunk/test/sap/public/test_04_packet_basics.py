@@ -10,6 +10,7 @@ from openpgp.sap.pkt.Packet import Tag, create_Tag
 from openpgp.sap.pkt.Packet import OldLength
 from openpgp.sap.pkt.Packet import NewLength, create_NewLength
 from openpgp.sap.pkt.Packet import create_Packet
+from openpgp.sap.pkt.Packet import pktclass, pktclasses, register_pktclass
 import openpgp.sap.list as LIST
 
 # package help
@@ -140,11 +141,11 @@ class A0_TagDataTests(unittest.TestCase):
 
         prob = 0
         for attr in attrs:
-            if tag_dict[attr] != tag_obj.__dict__[attr]:
+            if tag_dict[attr] != getattr(tag_obj, attr):
                 prob = attr
                 break
         if prob:
-            return tag_dict['data'], prob, tag_dict[attr], tag_obj.__dict__[attr]
+            return tag_dict['data'], prob, tag_dict[attr], getattr(tag_obj, attr)
         else:
             return 0 
 
@@ -343,5 +344,47 @@ class D1_PacketCreation(unittest.TestCase):
         self.assertEqual(newpkt.length.size, keypkt.length.size) # ._d could differ
         self.assertEqual(newpkt.body._d, keypkt.body._d)
 
+class D2_PacketClasses(unittest.TestCase):
+    """
+    """
+    def tearDown(self):
+        for i in range(60, 64):
+            register_pktclass(i, None)
+
+    def testA01Table(self):
+        "Packet: pktclass() classes and unknown types (NotImplementedError)"
+        for i, cn in pktclasses.items():
+            self.assertEqual(cn, pktclass(i).__name__)
+
+        for i in [-64, -1, 15, 16, 20, 59, 61, 63, 64, 255]:
+            self.assertRaises(NotImplementedError, pktclass, i)
+
+    def testA02Register(self):
+        "Packet: register_pktclass() private/experimental types"
+        register_pktclass(61, TestPGP.TestPGP)
+        register_pktclass(60, Reserved.Reserved)
+        pkts = LIST.list_pkts('\xfd\x03abc' + '\xfc\x01d')
+        self.assertEqual(['TestPGP', 'Reserved'],
+                         [p.__class__.__name__ for p in pkts])
+        self.assertEqual('abc', pkts[0].body._d)
+        register_pktclass(60, None)
+        self.assertEqual(TestPGP.TestPGP, pktclass(60))
+
+        for i in [0, 13, 59, 64]:
+            self.assertRaises(ValueError, register_pktclass, i, TestPGP.TestPGP)
+
+    def testA03Slots(self):
+        "Packet: packets, tags and lengths have no instance dictionary"
+        for i in pktclasses:
+            self.assertEqual(False, hasattr(pktclass(i)(), '__dict__'))
+
+        d = read_test_file(['pgpfiles','key','DSAELG1.pub.gpg'])
+        pkts = LIST.list_pkts(d) + LIST.list_pkts(d, lazy=True)
+        for pkt in pkts:
+            for obj in [pkt, pkt.tag, pkt.length]:
+                self.assertEqual(False, hasattr(obj, '__dict__'))
+        self.assertEqual([p.rawstr() for p in pkts[:len(pkts)//2]],
+                         [p.rawstr() for p in pkts[len(pkts)//2:]])
+
 if '__main__' == __name__:
     unittest.main()
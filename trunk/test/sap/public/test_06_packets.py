@@ -98,6 +98,24 @@ class MPITest(unittest.TestCase):
             self.assertEqual(new_mpi.bit_length, mpi.bit_length)
             self.assertEqual(new_mpi.size, mpi.size)
 
+    def testA02SharedData(self):
+        """MPI: key MPIs point into the key body, values made when asked for"""
+        key_d = read_test_file(['pgpfiles','key','DSAELG1.pub.gpg'])
+        body = list_pkts(key_d)[0].body
+        self.assertEqual(False, hasattr(body.DSA_p, '__dict__'))
+        self.assertEqual(None, body.DSA_p._value)
+        mpis = [body.DSA_p, body.DSA_q, body.DSA_g, body.DSA_y]
+        idx = 6 # version, created, alg
+        for mpi in mpis:
+            self.assertEqual(True, mpi._buf is body._d)
+            self.assertEqual(body._d[idx:idx+mpi.size], mpi._d)
+            self.assertEqual(mpi._d[:2], mpi._length_d)
+            self.assertEqual(mpi._d[2:], mpi._int_d)
+            idx += mpi.size
+        self.assertEqual(body._d[6:], body._mpi_d)
+        self.assertEqual(int(mpi._int_d.encode('hex'), 16), mpi.value)
+        self.assertEqual(mpi.value, mpi._value)
+
 
 from openpgp.sap.pkt.OnePassSignature import create_OnePassSignatureBody
 class OnePassSigntureTest(unittest.TestCase):
@@ -244,6 +262,21 @@ class SignatureTest(unittest.TestCase):
         sus = sig.unhashed_subpkts
         self.assertEqual((sus[0].type, sus[0].value), (16, '0CFC2B6DCC079DF3'))
 
+    def testSig3(self):
+        """Signature: hashed data and subpackets come from the body data"""
+        import struct
+        sig = Signature(self.pubkey_sig_pkt).body
+        hashed_len = 6 + struct.unpack('>H', sig._d[4:6])[0]
+        hashed_d = sig._d[:hashed_len]
+        trailer = '\x04\xff' + struct.pack('>I', hashed_len)
+        self.assertEqual(hashed_d + trailer, sig.hashed_data)
+        self.assertEqual(hashed_d[6:], ''.join([x._d for x in sig.hashed_subpkts]))
+        for subpkt in sig.hashed_subpkts + sig.unhashed_subpkts:
+            self.assertEqual(True, subpkt._buf is sig._d)
+        sig = Signature(self.detached_sig_d).body
+        self.assertEqual(sig._d[2:7], sig.hashed_data)
+        self.assertEqual(False, hasattr(sig, '__dict__'))
+
     def testCreateSig(self):
         """Signature: create Signature DSA (using known good values)"""
         sigbody = Signature(self.pubkey_sig_pkt).body
@@ -6,6 +6,8 @@ import unittest
 # test targets
 from openpgp.sap.armory import list_armored
 from openpgp.sap.armory import apply_armor
+from openpgp.sap.armory import crc24, CRC24
+from openpgp.sap.armory import ArmorDecoder
 
 # package help
 from openpgp.code import *
@@ -299,5 +301,67 @@ class C00ArmoredCreation(unittest.TestCase):
         #msgs = SAP.dearmor(gpg_d)
         #print msgs
 
+class D00Checksum(unittest.TestCase):
+    """CRC-24 Tests
+    """
+    data = "One of these lives has a future, the other does not."
+
+    def testD01Known(self):
+        "armory: crc24() known checksum"
+        self.assertEqual(8725147, crc24(self.data))
+
+    def testD02Incremental(self):
+        "armory: CRC24 update() in pieces"
+        crc = CRC24()
+
+        for i in range(0, len(self.data), 5):
+            crc.update(self.data[i:i+5])
+
+        self.assertEqual(crc24(self.data), crc.crc)
+        self.assertEqual('\x85"\x9b', crc.digest())
+
+    def testD03ShortChecksum(self):
+        "armory: apply_armor() checksum under 3 octets"
+        d = 'data 62' # crc24(d) == 41012
+        armored_d = apply_armor(d)
+        self.assertEqual(True, '=AKA0' in armored_d.splitlines())
+        armored = list_armored(armored_d)[0]
+        self.assertEqual(d, armored.data)
+        self.assertEqual(1, armored.selfcheck())
+
+class E00ArmorDecoder(unittest.TestCase):
+    """Incremental Armor-decoding Tests
+    """
+    def decode(self, d, size):
+        decoder = ArmorDecoder()
+        l = [decoder.feed(d[i:i+size]) for i in range(0, len(d), size)]
+        l.append(decoder.close())
+        return ''.join(l)
+
+    def testE01Chunks(self):
+        "armory: ArmorDecoder fed in chunks matches list_armored()"
+        for ascmsg in goodasc:
+            for size in [1, 7, len(ascmsg['armored'])]:
+                self.assertEqual(ascmsg['data'],
+                                 self.decode(ascmsg['armored'], size))
+
+    def testE02MultipleMessages(self):
+        "armory: ArmorDecoder multiple blocks and clearsigned text"
+        self.assertEqual(''.join(multasc['data']),
+                         self.decode(multasc['armored'], 5))
+        self.assertEqual(sigasc['sigdata'], self.decode(sigasc['armored'], 5))
+
+    def testE03ChksumFailure(self):
+        "armory: ArmorDecoder catches bad chksums"
+        for ascmsg in badchksum:
+            self.assertRaises(PGPFormatError, self.decode, ascmsg, 3)
+
+    def testE04Truncated(self):
+        "armory: ArmorDecoder catches truncated blocks"
+        d = goodasc[0]['armored']
+        d = d[:d.index('=')]
+        self.assertRaises(PGPFormatError, self.decode, d, 64)
+
+
 if '__main__' == __name__:
     unittest.main()
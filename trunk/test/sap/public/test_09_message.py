@@ -300,6 +300,47 @@ class A00PublicKeyMsgTest(unittest.TestCase):
         self.assertEqual(1, len(keymsg.seq())) # only one packet exists..
         keymsg._b_primary.leader.body.id # ..make sure it's the signing primary
 
+    def testA03LazyBlocks(self):
+        "PublicKeyMsg: lazy messages match eager ones"
+        for name in ['DSAELG1.pub.gpg', 'DSAELG2.subkeyrevoc.gpg',
+                     'DSAELG1.sec.gpg', 'RSA1.pub.gpg']:
+            key_d = read_test_file(['pgpfiles','key',name])
+            keymsg = list_msgs(list_pkts(key_d))[0]
+            lazymsg = list_msgs(list_pkts(key_d, lazy=True), lazy=True)[0]
+            self.assertEqual(keymsg.type, lazymsg.type)
+            self.assertEqual(keymsg.primary_id, lazymsg.primary_id)
+            self.assertEqual(keymsg.list_keyids(), lazymsg.list_keyids())
+            self.assertEqual(keymsg.rawstr(), lazymsg.rawstr())
+            self.assertEqual([b.leader.rawstr() for b in keymsg.list_blocks()],
+                             [b.leader.rawstr() for b in lazymsg.list_blocks()])
+
+    def testA04LazyLookups(self):
+        "PublicKeyMsg: lazy lookups only build the blocks they need"
+        key_d = read_test_file(['pgpfiles','key','DSAELG2.subkeyrevoc.gpg'])
+        keymsg = list_msgs(list_pkts(key_d), lazy=True)[0]
+        keypkt = keymsg.get_keypkt('52E7E945372C2D26')
+        self.assertEqual('52E7E945372C2D26', keypkt.body.id)
+        self.assertEqual(False, '_b_subkeys' in keymsg.__dict__)
+        self.assertEqual(1, len(keymsg._blocks))
+        uid = 'test2 (test many subkeys) <test2@test2.test2>'
+        block = keymsg.get_block('userid', uid)
+        self.assertEqual(uid, block.leader.body.value)
+        self.assertEqual(False, '_b_userids' in keymsg.__dict__)
+        self.assertEqual(None, keymsg.get_block('userid', 'nobody'))
+        self.assertRaises(KeyError, keymsg.get_keypkt, '0000000000000000')
+        # asking for the dictionary builds the rest
+        self.assertEqual(6, len(keymsg._b_subkeys.keylist))
+        self.assertEqual('6246EF319AC13CFC', keymsg.get_keypkt('6246EF319AC13CFC').body.id)
+
+    def testA05LazyUnboundSubblocks(self):
+        "PublicKeyMsg: lazy messages leave out unbound subkeys"
+        key_d = read_test_file(['pgpfiles','key','DSAELG3.sec.nopass.gpg'])
+        pkts = list_pkts(key_d)
+        keymsg = list_msgs(pkts, lazy=True)[0]
+        self.assertEqual(1, len(keymsg.seq()))
+        self.assertEqual([keymsg.primary_id], keymsg.list_keyids())
+        self.assertRaises(KeyError, keymsg.get_keypkt, pkts[-1].body.id)
+
 
 #class A00PacketListTest(unittest.TestCase):
 #    """Message Organization using organize_msgs()
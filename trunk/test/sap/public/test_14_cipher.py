@@ -2,6 +2,7 @@
 """
 import unittest
 import os
+import hashlib
 
 # test targets
 from openpgp.sap.crypto import decrypt_symmetric
@@ -14,6 +15,8 @@ from openpgp.sap.crypto import encrypt_integrity
 from openpgp.sap.crypto import gen_random
 from openpgp.sap.crypto import string2key
 from openpgp.sap.crypto import _keysize # ugly
+from openpgp.sap.crypto import CFB, crypt_CFB_str
+import openpgp.sap.crypto as CRYPT
 # missing decrypt_secret_key
 # missing encrypt_public_session
 
@@ -66,6 +69,55 @@ class B00S2KTests(unittest.TestCase):
         goodkey = '\xb4\x99\xdc\x1d\x1d\x53\x3c\x8c\x6f\x89\x0b\xe3\x42\xf3\x0e\x73'
         self.assertEqual(testkey, goodkey)
 
+    def testB02S2KStream(self):
+        """crypto.cipher: S2K matches the whole hashed stream"""
+        self.s2k.salt = '\xd6\xcd\xd8\x35\x70\x06\x22\xdf'
+
+        for s2ktype, hashalg, hasher in [(0x00, HASH_MD5, hashlib.md5),
+                                         (0x01, HASH_SHA1, hashlib.sha1),
+                                         (0x03, HASH_SHA1, hashlib.sha1),
+                                         (0x03, HASH_SHA256, hashlib.sha256)]:
+
+            for passphrase in ['', 'test', 'x' * 70000]:
+
+                for count in [1, 65536, 65536 + 7, 200000]:
+                    self.s2k.type, self.s2k.alg_hash = s2ktype, hashalg
+                    self.s2k.count = count
+                    salt = s2ktype in [1, 3] and self.s2k.salt or ''
+                    d = salt + passphrase
+                    count = max(3 == s2ktype and count or 0, len(d))
+                    stream = (d * (count // max(1, len(d)) + 1))[:count]
+                    goodkey = ''.join([hasher('\x00' * run + stream).digest()
+                                       for run in range(2)])[:32]
+                    testkey = string2key(self.s2k, SYM_AES256, passphrase)
+                    self.assertEqual(goodkey, testkey)
+
+    def testB03S2KCache(self):
+        """crypto.cipher: S2K keys are cached when asked to"""
+        self.s2k.type = 0x03
+        self.s2k.alg_hash = HASH_SHA1
+        self.s2k.salt = '\x02\xa5\xec\x54\x32\xbd\xf4\xa8'
+        self.s2k.count = 65536
+        CRYPT.s2k_cache.clear()
+        goodkey = string2key(self.s2k, SYM_CAST5, 'test')
+        self.assertEqual(0, len(CRYPT.s2k_cache)) # off by default
+        lifetime, CRYPT.s2k_lifetime = CRYPT.s2k_lifetime, 300
+
+        try:
+            self.assertEqual(goodkey, string2key(self.s2k, SYM_CAST5, 'test'))
+            hits = CRYPT.s2k_cache.hits
+            self.assertEqual(goodkey, string2key(self.s2k, SYM_CAST5, 'test'))
+            self.assertEqual(hits + 1, CRYPT.s2k_cache.hits)
+            self.assertNotEqual(goodkey, string2key(self.s2k, SYM_CAST5, 'tesT'))
+            self.assertEqual(hits + 1, CRYPT.s2k_cache.hits)
+
+            for cache_key in CRYPT.s2k_cache._items.keys():
+                self.assertEqual(False, hashlib.sha256('test').digest() in cache_key)
+
+        finally:
+            CRYPT.s2k_lifetime = lifetime
+            CRYPT.s2k_cache.clear()
+
 
 sym_cast_d = read_test_file(['pgpfiles','enc','sym.cast.cleartext.txt.gpg'])
 
@@ -434,6 +486,36 @@ class I00EncryptMessagesByHand(unittest.TestCase):
         self.assertEqual('b', litpkt_out.body.format)
 
 
+class J00CFB(unittest.TestCase):
+    """CFB Machine Tests
+
+    Feeding the CFB machine odd-sized chunks must produce the same output as
+    handling the whole string at once.
+    """
+    def setUp(self):
+        self.cleartext = read_test_file(['pgpfiles','cleartext.txt'])
+
+    def testJ01ChunkedEncrypt(self):
+        """crypto.cipher: CFB encrypt in chunks (CAST5, AES256)"""
+        for alg in [SYM_CAST5, SYM_AES256]:
+            key = gen_random(_keysize(alg))
+            ciphertext = crypt_CFB_str(self.cleartext, alg, key, None, 'encrypt')
+            cfb = CFB(alg, key, None, 'encrypt')
+            chunks = [cfb.update(self.cleartext[i:i+7]) for i in range(0, len(self.cleartext), 7)]
+            chunks.append(cfb.final())
+            self.assertEqual(ciphertext, ''.join(chunks))
+
+    def testJ02ChunkedDecrypt(self):
+        """crypto.cipher: CFB decrypt in chunks (Blowfish, AES128)"""
+        for alg in [SYM_BLOWFISH, SYM_AES128]:
+            key = gen_random(_keysize(alg))
+            ciphertext = crypt_CFB_str(self.cleartext, alg, key, None, 'encrypt')
+            cfb = CFB(alg, key, None, 'decrypt')
+            chunks = [cfb.update(ciphertext[i:i+13]) for i in range(0, len(ciphertext), 13)]
+            chunks.append(cfb.final())
+            self.assertEqual(self.cleartext, ''.join(chunks))
+
+
 #class XInteropCryptPGP653PublicKeyDecryption(unittest.TestCase):
 #    """PGP 6.5.3 Public Key Decryption
 #
@@ -11,6 +11,8 @@ from openpgp.sap.api import verify_msg
 from openpgp.sap.api import decrypt_msg
 from openpgp.sap.api import encrypt_msg
 from openpgp.sap.api import sign_msg
+from openpgp.sap.api import block_cache
+from openpgp.sap.crypto import verify_cache
 
 # package help
 from openpgp.code import *
@@ -214,6 +216,38 @@ class C01SignatureVerificationTests(unittest.TestCase):
         self.assertEqual(det_d, verify_msg(([sigpkt], det_d), keymsg))
 
 
+class C02VerificationCacheTests(unittest.TestCase):
+    """sap Verification Cache Tests
+    """
+    def testC01SignatureCache(self):
+        "verify_msg() repeated detached signature uses the cache"
+        sig_d = read_test_file(['pgpfiles','sig','sig.DSAELG1.detached.gpg'])
+        det_d = read_test_file(['pgpfiles','cleartext.txt'])
+        key_d = read_test_file(['pgpfiles','key','DSAELG1.pub.gpg'])
+        sigpkt = list_pkts(sig_d)[0]
+        keymsg = list_msgs(list_pkts(key_d))[0]
+        verify_cache.clear()
+        self.assertEqual(det_d, verify_msg(([sigpkt], det_d), keymsg))
+        hits = verify_cache.hits
+        keymsg = list_msgs(list_pkts(key_d))[0] # same key, new instances
+        self.assertEqual(det_d, verify_msg(([sigpkt], det_d), keymsg))
+        self.assertEqual(hits + 1, verify_cache.hits)
+        # different data, different context hash
+        self.assertEqual(None, verify_msg(([sigpkt], det_d + 'x'), keymsg))
+        self.assertEqual(hits + 1, verify_cache.hits)
+
+    def testC02BlockCache(self):
+        "verify_block() repeated revoked primary uses the cache"
+        key_d = read_test_file(['pgpfiles','key','DSAELG1.pub.revoked.gpg'])
+        keymsg = list_msgs(list_pkts(key_d))[0]
+        block_cache.clear()
+        r1, r2 = [], []
+        self.assertEqual(None, verify_block(keymsg, 'key', keymsg.primary_id, revocs=r1))
+        hits = block_cache.hits
+        self.assertEqual(None, verify_block(keymsg, 'key', keymsg.primary_id, revocs=r2))
+        self.assertEqual(hits + 1, block_cache.hits)
+        self.assertEqual([s.rawstr() for s in r1], [s.rawstr() for s in r2])
+
 class D00DecryptionTests(unittest.TestCase): 
 #class D00DecryptionTests: 
     """sap Decryption Tests
@@ -7,14 +7,19 @@ import pickle
 # test targets
 from openpgp.sap.api import encrypt_str
 from openpgp.sap.api import decrypt_str
+from openpgp.sap.api import decrypt_many, KeySession
 from openpgp.sap.api import sign_str
+from openpgp.sap.api import sign_file
 from openpgp.sap.api import verify_str
+from openpgp.sap.api import verify_many
 
 # package help
 from openpgp.code import *
 from openpgp.sap.exceptions import *
 from openpgp.sap.list import list_pkts, list_msgs, list_as_signed
 from openpgp.sap.armory import looks_armored, list_armored
+import openpgp.sap.crypto as CRYPT
+import openpgp.sap.api as API
 
 # test help
 from support import sepjoin, curdir, read_test_file
@@ -93,6 +98,23 @@ class TestA_decrypt_str(unittest.TestCase):
         key_d = read_test_file(['pgpfiles','key','DSAELG3.sec.asc']) # wrong key
         self.assertRaises(PGPCryptoError, decrypt_str, enc_d, keys=key_d, passphrase='badpassword')
 
+    def testC09DecryptManySession(self):
+        "decrypt_many() with a key session, serial and forked"
+        enc_d = read_test_file(['pgpfiles','enc','pub.elg.aes256.clrtxt.gpg'])
+        key_d = read_test_file(['pgpfiles','key','DSAELG1.sec.asc'])
+        session = KeySession(key_d, 'test')
+        self.assertEqual(1, len(session))
+        expected = decrypt_str(enc_d, passphrase='test', keys=key_d)
+        messages = [enc_d, 'not OpenPGP', enc_d]
+
+        for workers in [1, 2]:
+            clrtxts = decrypt_many(messages, session, workers=workers)
+            self.assertEqual([expected, None, expected], clrtxts)
+
+        session.wipe()
+        self.assertRaises(PGPCryptoError, decrypt_many, messages, session)
+        self.assertRaises(PGPCryptoError, KeySession, key_d, 'badpassword')
+
 
 class TestB_encrypt_str(unittest.TestCase):
 #class TestB_encrypt_str:
@@ -216,6 +238,68 @@ class TestC_verify_str(unittest.TestCase):
         verified = verify_str(key_d, key_d)
         self.assertEqual(list_as_signed(key_d), list_as_signed(verified))
 
+    def testB06VerifyMany(self):
+        "verify_many() matches verify_str() in input order"
+        det_d = read_test_file(['pgpfiles','cleartext.txt'])
+        key_d = read_test_file(['pgpfiles','key','DSAELG1.pub.asc']) + \
+                read_test_file(['pgpfiles','key','RSA1.pub.asc'])
+        items = [read_test_file(['pgpfiles','sig','sig.DSAELG1.clear.asc']),
+                 read_test_file(['pgpfiles','sig','sig.DSAELG1.comp.gpg']),
+                 (read_test_file(['pgpfiles','sig','sig.DSAELG1.detached.gpg']), det_d),
+                 (read_test_file(['pgpfiles','sig','sig.DSAELG1.detached.gpg']), det_d + 'x'),
+                 read_test_file(['pgpfiles','sig','sig.RSA1.onepass.gpg']),
+                 read_test_file(['pgpfiles','key','DSAELG1.pub.asc']),
+                 'not OpenPGP']
+        expected = []
+
+        for item in items[:-1]:
+
+            if isinstance(item, tuple):
+                expected.append(verify_str(item[0], key_d, detached=item[1]))
+            else:
+                expected.append(verify_str(item, key_d))
+
+        expected.append(False)
+        self.assertEqual(False, expected[3])
+
+        for workers in [1, 2]:
+            CRYPT.verify_cache.clear()
+            API.block_cache.clear()
+            self.assertEqual(expected, verify_many(items, key_d, workers=workers))
+
+    def testB07VerifyManySmallCache(self):
+        "verify_many() doesn't redo verifications evicted from the cache"
+        key_d = read_test_file(['pgpfiles','key','DSAELG1.pub.asc']) + \
+                read_test_file(['pgpfiles','key','RSA1.pub.asc'])
+        items = [read_test_file(['pgpfiles','sig','sig.DSAELG1.comp.gpg']),
+                 read_test_file(['pgpfiles','sig','sig.RSA1.onepass.gpg'])] * 3
+        calls = []
+        verify_task, maxsize = CRYPT.verify_task, CRYPT.verify_cache.maxsize
+
+        def counting_task(task):
+            calls.append(task)
+            return verify_task(task)
+
+        CRYPT.verify_task = counting_task
+
+        try:
+            counts = []
+
+            for size in [4096, 1]:
+                CRYPT.verify_cache.clear()
+                CRYPT.verify_cache.maxsize = size
+                API.block_cache.clear()
+                del calls[:]
+                self.assertEqual([True] * 6, map(bool, verify_many(items, key_d)))
+                counts.append(len(calls))
+
+            self.assertEqual(counts[0], counts[1])
+
+        finally:
+            CRYPT.verify_task = verify_task
+            CRYPT.verify_cache.maxsize = maxsize
+            CRYPT.verify_cache.clear()
+
 
 class TestD_sign_str(unittest.TestCase):
     """
@@ -312,6 +396,20 @@ class TestD_sign_str(unittest.TestCase):
         self.assertEqual('testfilename', literal_body.filename)
         self.assertEqual(100, literal_body.modified)
 
+    def testE06SignFile(self):
+        "sign_file()/verify_str() detached binary and text signatures"
+        from StringIO import StringIO
+        seckey_d = read_test_file(['pgpfiles','key','DSAELG1.sec.asc'])
+        pubkey_d = read_test_file(['pgpfiles','key','DSAELG1.pub.asc'])
+        lit_d = ' first line\r\nsecond line \n' * 1000
+
+        for sigtype in [SIG_BINARY, SIG_TEXT]:
+            sig_d = sign_file(sigtype, seckey_d, StringIO(lit_d),
+                              passphrase='test', bufsize=1000, armor=True)
+            self.assertEqual(True, looks_armored(sig_d))
+            self.assertEqual(lit_d, verify_str(sig_d, pubkey_d, detached=lit_d))
+            self.assertEqual(False, verify_str(sig_d, pubkey_d, detached=lit_d + 'x'))
+
     def testE07SignSubkeyAsStringBadTarget(self):
         "sign_str() subkey direct (0x1F) target not found"
         seckey_d = read_test_file(['pgpfiles','key','DSAELG1.sec.asc'])
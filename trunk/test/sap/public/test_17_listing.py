@@ -1,25 +1,37 @@
 "Packet and message listing tests"
 
+import mmap
 import os
 import unittest
 
 # test targets
 from openpgp.sap.list import list_as_signed
 from openpgp.sap.list import find_key_prefs
-from openpgp.sap.list import find_keys
+from openpgp.sap.list import find_keys, KeyIndex
 from openpgp.sap.list import list_msgs
+from openpgp.sap.list import iter_msgs
 from openpgp.sap.list import list_pkts
 
 # package help
+from openpgp.code import *
 from openpgp.sap.armory import list_armored
 from openpgp.sap.exceptions import PGPError
 from openpgp.sap.msg.KeyMsg import PublicKeyMsg
 from openpgp.sap.msg.SignedMsg import SignedMsg
+from openpgp.sap.pkt.Packet import Packet
 from openpgp.sap.pkt.Signature import Signature
 
 # test help
 from support import curdir, sepjoin, read_test_file
 
+# whether a packet's body has been created, without creating it
+def has_body(pkt):
+    try:
+        Packet.body.__get__(pkt)
+        return True
+    except AttributeError:
+        return False
+
 class B00PublicKeyTests(unittest.TestCase):
     """sap Public Key Tests
 
@@ -113,5 +125,140 @@ class Test_list_as_signed(unittest.TestCase):
         self.assertEqual(1, len(players))
 
 
+class Test_list_pkts(unittest.TestCase):
+
+    def testA01Offsets(self):
+        "list: list_pkts() packet data is sliced in place"
+        d = read_test_file(['pgpfiles','key','DSAELG1.pub.gpg'])
+        idx = 0
+
+        for pkt in list_pkts(d):
+            self.assertEqual(d[idx:idx+pkt.size], pkt.rawstr())
+            idx = idx + pkt.size
+
+        self.assertEqual(len(d), idx)
+
+    def testA02MappedFile(self):
+        "list: list_pkts() memory-mapped file"
+        d = read_test_file(['pgpfiles','key','DSAELG1.sec.gpg'])
+        f = file(sepjoin([curdir,'pgpfiles','key','DSAELG1.sec.gpg']), 'rb')
+        m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mapped = [p.rawstr() for p in list_pkts(m)]
+        m.close()
+        f.close()
+        self.assertEqual([p.rawstr() for p in list_pkts(d)], mapped)
+
+    def testA03Lazy(self):
+        "list: list_pkts() lazy packet bodies"
+        d = read_test_file(['pgpfiles','sig','sig.DSAELG1.comp.gpg'])
+        pkt = list_pkts(d, lazy=True)[0]
+        self.assertEqual(False, has_body(pkt))
+        self.assertEqual(d, pkt.rawstr())
+        self.assertEqual(False, has_body(pkt))
+        self.assertEqual(list_pkts(d)[0].body.data, pkt.body.data)
+        self.assertEqual(True, has_body(pkt))
+
+
+class Test_list_msgs(unittest.TestCase):
+
+    def testA01SharedPackets(self):
+        "list: list_msgs() keyring, packets are not copied"
+        d = ''.join([read_test_file(['pgpfiles','key',k]) for k in
+                     ['DSAELG1.pub.gpg', 'DSAELG3.pub.gpg', 'RSA1.pub.gpg']])
+        pkts = list_pkts(d)
+        leftover = []
+        msgs = list_msgs(pkts + pkts[1:2], leftover=leftover) # stray user ID
+        self.assertEqual(3, len(msgs))
+        seq = []
+
+        for msg in msgs:
+            seq.extend(msg.seq())
+
+        self.assertEqual(len(pkts), len(seq))
+        self.assertEqual(True, seq[0] is pkts[0] and seq[-1] is pkts[-1])
+        self.assertEqual(True, leftover[0] is pkts[1])
+
+    def testA02IterMsgs(self):
+        "list: iter_msgs() packet iterator"
+        d = ''.join([read_test_file(['pgpfiles','key',k]) for k in
+                     ['DSAELG1.pub.gpg', 'DSAELG3.pub.gpg', 'RSA1.pub.gpg']])
+        pkts = list_pkts(d) + list_pkts(d)[1:2] # stray user ID
+        consumed = []
+
+        def pull():
+            for pkt in pkts:
+                consumed.append(pkt)
+                yield pkt
+
+        leftover = []
+        msgs = iter_msgs(pull(), leftover=leftover)
+        msg = msgs.next()
+        self.assertEqual(True, msg.seq()[0] is pkts[0])
+        self.assertEqual(True, len(consumed) < len(pkts))
+        self.assertEqual(2, len(list(msgs)))
+        self.assertEqual(True, leftover[0] is pkts[-1])
+
+
+class Test_find_keys(unittest.TestCase):
+
+    def linear_find_keys(self, keys, action=None, userids=[], keyids=[]):
+        "find_keys() the way it used to be done, key by key"
+        keytargets = []
+
+        for key in keys:
+            pids = [None, False, '', key.primary_id, key.primary_fprint]
+
+            if userids and not [u for u in key._b_userids.keys()
+                                for p, i in userids if p in pids and i in u]:
+                continue
+
+            keypkts = [key._b_primary.leader]
+            keypkts.extend([b.leader for b in key._b_subkeys.list()])
+
+            if 'sign' == action:
+                keypkts = [k for k in keypkts if k.body.alg in ASYM_SIGNING]
+            elif 'encrypt' == action:
+                keypkts = [k for k in keypkts if k.body.alg in ASYM_ENCRYPTING]
+
+            if keyids:
+                keypkts = [k for k in keypkts for p, t in keyids if p in pids
+                           and t in [None, k.body.id, k.body.fingerprint]]
+
+            if keypkts:
+                keytargets.append((key, [k.body.fingerprint for k in keypkts]))
+
+        return keytargets
+
+    def testA01KeyIndex(self):
+        """sap.list: find_keys() with a KeyIndex matches a linear search"""
+        key_d = ''.join([read_test_file(['pgpfiles','key',k]) for k in
+                         ['DSAELG1.pub.gpg','DSAELG3.pub.gpg','RSA1.pub.gpg']])
+        keys = list_msgs(list_pkts(key_d))
+        index = KeyIndex(keys)
+        primary = keys[1].primary_fprint
+        subkeyid = keys[0].list_keyids()[-1]
+        queries = [{},
+                   {'action':'sign'},
+                   {'action':'encrypt'},
+                   {'userids':[(None, 'Tester')]},
+                   {'userids':[(None, 'ester'), (None, 'RSA')]},
+                   {'userids':[(None, '')], 'action':'encrypt'},
+                   {'userids':[(primary, 'e')]},
+                   {'userids':[(None, 'Nobody')]},
+                   {'keyids':[(None, subkeyid)]},
+                   {'keyids':[(primary, None)], 'action':'sign'},
+                   {'keyids':[(None, None)], 'action':'encrypt'},
+                   {'keyids':[(primary, subkeyid)]},
+                   {'keyids':[(None, primary[-16:])], 'userids':[(None, 'e')]}]
+
+        for kw in queries:
+            expected = self.linear_find_keys(keys, **kw)
+            self.assertEqual(expected, index.find(**kw))
+            self.assertEqual(expected, find_keys(keys, **kw))
+
+        self.assertEqual([keys[0]], index.list_keys([subkeyid]))
+        self.assertEqual([keys[1]], index.list_keys([primary, '0123456789ABCDEF']))
+
+
 if '__main__' == __name__:
     unittest.main()
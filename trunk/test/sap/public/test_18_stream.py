@@ -0,0 +1,290 @@
+"Incremental (file-like) reading and writing tests"
+
+import os
+import sys
+import unittest
+import subprocess
+from StringIO import StringIO
+
+# test targets
+import openpgp.sap.cmd as CMD
+from openpgp.sap.api import decrypt_file, decrypt_str, verify_str
+from openpgp.sap.api import EncryptingWriter, sign_str, verify_file
+from openpgp.sap.armory import ArmorWriter, apply_armor, looks_armored
+from openpgp.sap.stream import read_header, BodyReader, DecompressReader
+from openpgp.sap.stream import iter_pkts, read_signed
+
+# package help
+from openpgp.code import *
+from openpgp.sap.exceptions import *
+from openpgp.sap.list import list_pkts
+from openpgp.sap.pkt.CompressedData import create_CompressedDataBody
+from openpgp.sap.pkt.LiteralData import create_LiteralDataBody
+from openpgp.sap.pkt.Packet import create_Packet
+
+# test help
+from support import sepjoin, curdir, read_test_file
+
+
+class ChunkSink:
+    "Keep the chunks written to a sink."
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, d):
+        self.chunks.append(d)
+
+    def getvalue(self):
+        return ''.join(self.chunks)
+
+
+class A00Readers(unittest.TestCase):
+    """Packet Reader Tests
+    """
+    def testA01PartialBody(self):
+        """stream: BodyReader partial lengths"""
+        body_d = 'x' * 512 + 'y' * 512 + 'z' * 10
+        pkt_d = ''.join(['\xcb', '\xe9', body_d[:512], # partial 2**9
+                         '\xe9', body_d[512:1024],
+                         '\x0a', body_d[1024:]])
+        f = StringIO(pkt_d + 'trailing')
+        header = read_header(f)
+        self.assertEqual(PKT_LITERAL, header[0].type)
+        self.assertEqual(True, header[2])
+        body = BodyReader(f, header, bufsize=100)
+        self.assertEqual(body_d, body.read())
+        self.assertEqual('trailing', f.read())
+
+    def testA02Decompress(self):
+        """stream: DecompressReader ZIP & ZLIB"""
+        d = 'Some compressible data. ' * 1000
+
+        for alg in [COMP_ZIP, COMP_ZLIB, COMP_UNCOMPRESSED]:
+            comp_d = create_CompressedDataBody(alg, d)._d
+            reader = DecompressReader(StringIO(comp_d[1:]), alg, bufsize=64)
+            chunks = []
+
+            while True:
+                chunk = reader.read(64)
+
+                if not chunk:
+                    break
+
+                chunks.append(chunk)
+
+            self.assertEqual(d, ''.join(chunks))
+
+    def testA03IterPkts(self):
+        """stream: iter_pkts() native, partial and armored"""
+        key_d = read_test_file(['pgpfiles','key','DSAELG1.pub.gpg'])
+        rawstrs = [p.rawstr() for p in list_pkts(key_d)]
+        pkts = list(iter_pkts(StringIO(key_d), bufsize=7))
+        self.assertEqual(rawstrs, [p.rawstr() for p in pkts])
+
+        body_d = 'x' * 512 + 'y' * 10
+        pkt_d = ''.join(['\xcb', '\xe9', body_d[:512], '\x0a', body_d[512:]])
+        pkts = list(iter_pkts(StringIO(pkt_d + key_d)))
+        self.assertEqual(body_d, pkts[0].body._d)
+        self.assertEqual(rawstrs, [p.rawstr() for p in pkts[1:]])
+
+        key_d = read_test_file(['pgpfiles','key','DSAELG1.pub.asc'])
+        pkts = list(iter_pkts(StringIO(key_d), lazy=True))
+        self.assertEqual(rawstrs, [p.rawstr() for p in pkts])
+
+
+class B00DecryptFile(unittest.TestCase):
+    """Incremental Decryption Tests
+    """
+    lit_data = "This is some ordinary text.\n"
+
+    def testB01Symmetric(self):
+        """stream: decrypt_file() symmetric CAST w/integrity (compressed)"""
+        f = file(sepjoin([curdir,'pgpfiles','enc','sym.cast.cleartext.txt.gpg']), 'rb')
+        sink = ChunkSink()
+        literal = decrypt_file(f, sink, passphrase='test', bufsize=8)
+        f.close()
+        self.assertEqual(self.lit_data, sink.getvalue())
+        self.assertEqual('cleartext.txt', literal.filename)
+        self.assertEqual(8, max([len(c) for c in sink.chunks]))
+
+    def testB02Public(self):
+        """stream: decrypt_file() DSA AES256 w/integrity"""
+        enc_d = read_test_file(['pgpfiles','enc','pub.elg.aes256.clrtxt.gpg'])
+        key_d = read_test_file(['pgpfiles','key','DSAELG1.sec.asc'])
+        sink = StringIO()
+        decrypt_file(StringIO(enc_d), sink, passphrase='test', keys=key_d)
+        self.assertEqual(self.lit_data, sink.getvalue())
+
+    def testB03NoIntegrity(self):
+        """stream: decrypt_file() symmetric w/out integrity (resync)"""
+        enc_d = read_test_file(['pgpfiles','enc','dek.165.186.142.clrtxt.gpg'])
+        sink = StringIO()
+        decrypt_file(StringIO(enc_d), sink, passphrase='test', bufsize=5)
+        self.assertEqual(self.lit_data, sink.getvalue())
+
+    def testB04WrongPassphrase(self):
+        """stream: decrypt_file() failure (wrong passphrase)"""
+        enc_d = read_test_file(['pgpfiles','enc','sym.cast.cleartext.txt.gpg'])
+        sink = StringIO()
+        self.assertRaises(PGPCryptoError, decrypt_file, StringIO(enc_d), sink,
+                          passphrase='badpassword')
+        self.assertEqual('', sink.getvalue())
+
+    def testB05Modified(self):
+        """stream: decrypt_file() failure (modified ciphertext)"""
+        enc_d = read_test_file(['pgpfiles','enc','mdc.nocompress.71.211.169.clrtxt.gpg'])
+        enc_d = enc_d[:-10] + chr(ord(enc_d[-10]) ^ 1) + enc_d[-9:]
+        self.assertRaises(PGPCryptoError, decrypt_file, StringIO(enc_d),
+                          StringIO(), passphrase='test')
+
+    def testB06Armored(self):
+        """stream: decrypt_file() ASCII-armored input"""
+        enc_d = read_test_file(['pgpfiles','enc','sym.cast.cleartext.txt.gpg'])
+        sink = StringIO()
+        decrypt_file(StringIO(apply_armor(enc_d)), sink, passphrase='test',
+                     bufsize=8)
+        self.assertEqual(self.lit_data, sink.getvalue())
+
+
+class C00EncryptingWriter(unittest.TestCase):
+    """Incremental Encryption Tests
+    """
+    lit_data = "This is some ordinary text.\n"
+
+    def testC01ArmorWriter(self):
+        """stream: ArmorWriter matches apply_armor()"""
+        enc_d = read_test_file(['pgpfiles','enc','sym.cast.cleartext.txt.gpg'])
+        f = StringIO()
+        writer = ArmorWriter(f, "-----BEGIN PGP FLOTSAM-----",
+                             "-----END PGP FLOTSAM-----")
+
+        for i in range(0, len(enc_d), 13):
+            writer.write(enc_d[i:i+13])
+
+        writer.close()
+        self.assertEqual(apply_armor(enc_d), f.getvalue())
+
+    def testC02SymmetricPartial(self):
+        """stream: EncryptingWriter symmetric (partial lengths)"""
+        d = ''.join([chr(i % 251) for i in range(10000)])
+        f = StringIO()
+        writer = EncryptingWriter(f, passphrase='test', bufsize=512)
+
+        for i in range(0, len(d), 777):
+            writer.write(d[i:i+777])
+
+        writer.close()
+        sink = StringIO()
+        decrypt_file(StringIO(f.getvalue()), sink, passphrase='test')
+        self.assertEqual(d, sink.getvalue())
+
+    def testC03PublicSignedArmor(self):
+        """stream: EncryptingWriter ElGamal, signed, armored"""
+        pubkey_d = read_test_file(['pgpfiles','key','DSAELG1.pub.asc'])
+        seckey_d = read_test_file(['pgpfiles','key','DSAELG1.sec.asc'])
+        f = StringIO()
+        writer = EncryptingWriter(f, keys=pubkey_d, use_userid=[(None,"Tester")],
+                                  sign_keys=seckey_d, sign_passphrase='test',
+                                  armor=True)
+        writer.write(self.lit_data)
+        writer.close()
+        self.assertEqual(True, looks_armored(f.getvalue()))
+        clrtxt = decrypt_str(f.getvalue(), passphrase='test', keys=seckey_d,
+                             decompress=True)
+        self.assertNotEqual(None, verify_str(clrtxt, pubkey_d))
+
+class D00VerifyFile(unittest.TestCase):
+    """Incremental Verification Tests
+    """
+    lit_data = "This is some ordinary text.\n"
+
+    def setUp(self):
+        self.pubkey_d = read_test_file(['pgpfiles','key','DSAELG1.pub.asc'])
+        self.seckey_d = read_test_file(['pgpfiles','key','DSAELG1.sec.asc'])
+
+    def testD01OnePass(self):
+        """stream: verify_file() one-pass signed, compressed, armored"""
+        for name in ['sig.DSAELG1.onepass.gpg', 'sig.DSAELG1.comp.gpg']:
+            sig_d = read_test_file(['pgpfiles','sig',name])
+
+            for signed_d in [sig_d, apply_armor(sig_d)]:
+                sink = ChunkSink()
+                literal = verify_file(StringIO(signed_d), sink, self.pubkey_d,
+                                      bufsize=8)
+                self.assertEqual('cleartext.txt', literal.filename)
+                self.assertEqual(self.lit_data, sink.getvalue())
+                self.assertEqual(8, max([len(c) for c in sink.chunks]))
+
+    def testD02ReadSigned(self):
+        """stream: read_signed() hashes per (sigtype, hash algorithm)"""
+        sig_d = read_test_file(['pgpfiles','sig','sig.DSAELG1.onepass.gpg'])
+        sink = StringIO()
+        literal, sigs, hashers = read_signed(StringIO(sig_d), sink, bufsize=3)
+        self.assertEqual(1, len(sigs))
+        self.assertEqual([(sigs[0].body.type, sigs[0].body.alg_hash)],
+                         hashers.keys())
+        self.assertEqual(self.lit_data, sink.getvalue())
+
+    def testD03Text(self):
+        """stream: verify_file() text signature, large literal"""
+        lit_d = ' first line\r\nsecond line \n' * 5000
+        signed_d = sign_str(SIG_TEXT, self.seckey_d, target=lit_d,
+                            passphrase='test')
+        sink = StringIO()
+        self.assertNotEqual(None, verify_file(StringIO(signed_d), sink,
+                                              self.pubkey_d, bufsize=1000))
+        self.assertEqual(lit_d, sink.getvalue())
+
+    def testD04Modified(self):
+        """stream: verify_file() failure (modified literal, wrong key)"""
+        sig_d = read_test_file(['pgpfiles','sig','sig.DSAELG1.onepass.gpg'])
+        idx = sig_d.find(self.lit_data)
+        bad_d = sig_d[:idx] + 't' + sig_d[idx+1:]
+        self.assertEqual(None, verify_file(StringIO(bad_d), StringIO(),
+                                           self.pubkey_d))
+        key_d = read_test_file(['pgpfiles','key','RSA1.pub.gpg'])
+        self.assertEqual(None, verify_file(StringIO(sig_d), StringIO(), key_d))
+
+    def testD05NotSigned(self):
+        """stream: verify_file() failure (no signatures)"""
+        lit_d = create_Packet(PKT_LITERAL, create_LiteralDataBody(
+                    data=self.lit_data, format='b', filename='',
+                    modified=0)._d).rawstr()
+        self.assertRaises(PGPFormatError, verify_file, StringIO(lit_d),
+                          StringIO(), self.pubkey_d)
+
+
+
+class E00Cmd(unittest.TestCase):
+    """Command Line Output Tests
+    """
+    def sap(self, *args):
+        "Run sap and return what it wrote."
+        cmd = os.path.splitext(CMD.__file__)[0] + '.py'
+        src = os.path.dirname(os.path.dirname(os.path.dirname(cmd)))
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join([src, env.get('PYTHONPATH', '')])
+        p = subprocess.Popen([sys.executable, cmd] + list(args), env=env,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        out = p.communicate()[0]
+        self.assertEqual(0, p.returncode)
+        return out
+
+    def testE01Verify(self):
+        "stream: sap --verify prints the message or False"
+        sig_f = sepjoin([curdir, 'pgpfiles', 'sig', 'sig.DSAELG1.onepass.gpg'])
+        good_f = sepjoin([curdir, 'pgpfiles', 'key', 'DSAELG1.pub.gpg'])
+        bad_f = sepjoin([curdir, 'pgpfiles', 'key', 'DSAELG3.pub.gpg'])
+        self.assertEqual('False\n', self.sap('--verify', '--keyfile', bad_f, sig_f))
+        out = self.sap('--verify', '--keyfile', good_f, sig_f)
+        self.assertNotEqual(-1, out.find('This is some ordinary text.'))
+
+    def testE02ShowPackets(self):
+        "stream: sap --show-packets streams its report"
+        key_f = sepjoin([curdir, 'pgpfiles', 'key', 'DSAELG1.pub.gpg'])
+        out = self.sap('--show-packets', key_f)
+        self.assertEqual('Pau.\n', out[-5:])
+
+
+if '__main__' == __name__:
+    unittest.main()
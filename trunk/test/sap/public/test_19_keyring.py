@@ -0,0 +1,182 @@
+"Indexed keyring tests"
+
+import os
+import shutil
+import tempfile
+import unittest
+from StringIO import StringIO
+
+# test targets
+from openpgp.sap.keyring import Keyring, scan_keyring
+from openpgp.sap.api import sign_str, verify_str, decrypt_file
+
+# package help
+from openpgp.code import *
+from openpgp.sap.exceptions import *
+from openpgp.sap.list import list_pkts, list_msgs, find_keys
+
+# test help
+from support import read_test_file
+
+
+class A00Keyring(unittest.TestCase):
+    """Keyring Index Tests
+    """
+    keyfiles = ['DSAELG1.pub.gpg', 'DSAELG3.pub.gpg', 'RSA1.pub.gpg']
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'pubring.gpg')
+        self.key_d = ''.join([read_test_file(['pgpfiles','key',k])
+                              for k in self.keyfiles])
+        self.write_keyring(self.key_d)
+        self.keys = list_msgs(list_pkts(self.key_d))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write_keyring(self, d):
+        f = file(self.filename, 'wb')
+        f.write(d)
+        f.close()
+
+    def testA01Scan(self):
+        "keyring: scan_keyring() offsets and IDs"
+        entries = scan_keyring(self.key_d)
+        self.assertEqual(len(self.keys), len(entries))
+
+        for key, (offset, size, keyids, userids) in zip(self.keys, entries):
+            self.assertEqual(key.rawstr(), self.key_d[offset:offset+size])
+            self.assertEqual(key.list_keyids(), [i for i, f in keyids])
+            self.assertEqual(key._b_userids.keys(), userids)
+
+    def testA02Index(self):
+        "keyring: index is written, reused and rebuilt when stale"
+        keyring = Keyring(self.filename)
+        self.assertEqual(3, len(keyring))
+        self.assertEqual(True, os.path.exists(self.filename + '.idx'))
+        keyring.close()
+
+        keyring = Keyring(self.filename)
+        self.assertEqual(True, keyring._read_index()) # not stale
+        keyring.close()
+
+        self.write_keyring(self.key_d + read_test_file(['pgpfiles','key','DSAELG1.pub.gpg']))
+        keyring = Keyring(self.filename)
+        self.assertEqual(4, len(keyring))
+        keyring.close()
+
+    def testA03ListKeys(self):
+        "keyring: list_keys() by key ID and fingerprint"
+        keyring = Keyring(self.filename)
+
+        for key in self.keys:
+            found = keyring.list_keys([key.primary_id])
+            self.assertEqual([key.rawstr()], [k.rawstr() for k in found])
+            subkeyid = key.list_keyids()[-1]
+            found = keyring.list_keys([key.primary_fprint, subkeyid])
+            self.assertEqual([key.rawstr()], [k.rawstr() for k in found])
+
+        self.assertEqual([], keyring.list_keys(['0123456789ABCDEF']))
+        self.assertEqual(len(self.keys), len(keyring.list_keys()))
+        keyring.close()
+
+    def testA04FindKeys(self):
+        "keyring: find_keys() matches list.find_keys()"
+        keyring = Keyring(self.filename)
+        primary_id = self.keys[1].primary_id
+
+        for kw in [{'userids':[(None, 'Tester')]},
+                   {'userids':[(None, 'ester')], 'action':'sign'},
+                   {'keyids':[(primary_id, None)], 'action':'encrypt'},
+                   {'keyids':[(None, None)]},
+                   {'userids':[(None, 'Nobody')]}]:
+            expected = [(k.primary_id, f) for k, f in find_keys(self.keys, **kw)]
+            found = [(k.primary_id, f) for k, f in keyring.find_keys(**kw)]
+            self.assertEqual(expected, found)
+
+        keyring.close()
+
+    def testA05Armored(self):
+        "keyring: armored keyrings are dearmored into the index once"
+        asc_d = read_test_file(['pgpfiles','key','DSAELG1.pub.asc'])
+        self.write_keyring(asc_d)
+        keyring = Keyring(self.filename)
+        keyring.close()
+        keyring = Keyring(self.filename)
+        self.assertEqual(True, keyring._armored)
+        self.assertEqual(True, keyring._pkts is keyring._idx) # no dearmoring
+        expected = [k.rawstr() for k in list_msgs(list_pkts(self.key_d))[:1]]
+        self.assertEqual(expected, [k.rawstr() for k in keyring.list_keys()])
+        keyring.close()
+
+        self.write_keyring('not a keyring')
+        self.assertRaises(PGPFormatError, Keyring, self.filename)
+
+    def testA06API(self):
+        "keyring: verify_str() and sign_str() with a keyring"
+        sig_d = read_test_file(['pgpfiles','sig','sig.DSAELG1.detached.gpg'])
+        det_d = read_test_file(['pgpfiles','cleartext.txt'])
+        keyring = Keyring(self.filename)
+        self.assertEqual(det_d, verify_str(sig_d, keyring, detached=det_d))
+        self.assertEqual(1, len(keyring._loaded)) # only the signer was parsed
+
+        # unassigned signatures are checked against every key
+        seckey_d = read_test_file(['pgpfiles','key','DSAELG1.sec.asc'])
+        signed = sign_str(0x00, seckey_d, target=det_d,
+                          use_userid=(None,'Tester'), passphrase='test')
+        verified = verify_str(signed, keyring)
+        self.assertEqual(det_d, list_pkts(verified)[0].body.data)
+        keyring.close()
+
+    def testA07SecretKeyring(self):
+        "keyring: decrypt_file() with a secret keyring"
+        self.write_keyring(read_test_file(['pgpfiles','key','RSA1.sec.gpg']) +
+                           read_test_file(['pgpfiles','key','DSAELG1.sec.gpg']))
+        enc_d = read_test_file(['pgpfiles','enc','pub.elg.aes256.clrtxt.gpg'])
+        keyring = Keyring(self.filename)
+        sink = StringIO()
+        decrypt_file(StringIO(enc_d), sink, passphrase='test', keys=keyring)
+        self.assertEqual("This is some ordinary text.\n", sink.getvalue())
+        self.assertEqual(1, len(keyring._loaded))
+        keyring.close()
+
+    def testA08Stale(self):
+        "keyring: index is rebuilt when the keyring's checksum changes"
+        keyring = Keyring(self.filename)
+        keyring.close()
+        # same size, different keys
+        swapped_d = self.key_d[-len(self.keys[2].rawstr()):] + \
+                    self.key_d[:-len(self.keys[2].rawstr())]
+        self.write_keyring(swapped_d)
+        keyring = Keyring(self.filename)
+        self.assertEqual([k.rawstr() for k in list_msgs(list_pkts(swapped_d))],
+                         [k.rawstr() for k in keyring.list_keys()])
+        keyring.close()
+
+        for d in ['', 'SAP-KEYRING-INDEX 1 0 0\n', 'SAPKRIDX' + '\x00' * 60]:
+            f = file(self.filename + '.idx', 'wb')
+            f.write(d)
+            f.close()
+            keyring = Keyring(self.filename)
+            self.assertEqual(3, len(keyring))
+            keyring.close()
+
+    def testA09Lookups(self):
+        "keyring: key ID and fingerprint lookups with many keys"
+        self.write_keyring(self.key_d * 50)
+        keyring = Keyring(self.filename)
+        self.assertEqual(150, len(keyring))
+
+        for n, key in enumerate(self.keys):
+            expected = range(n, 150, 3)
+            self.assertEqual(expected, keyring._match_keyids([key.primary_id]))
+            self.assertEqual(expected, keyring._match_keyids([key.primary_fprint]))
+            self.assertEqual(expected, keyring._match_keyids([key.list_keyids()[-1]]))
+
+        self.assertEqual([], keyring._match_keyids(['0' * 16, 'F' * 40, 'x']))
+        keyring.close()
+
+
+if '__main__' == __name__:
+    unittest.main()
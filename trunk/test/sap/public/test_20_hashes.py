@@ -0,0 +1,106 @@
+"Hash registry and signature hashing tests"
+
+import random
+import hashlib
+import unittest
+
+# test targets
+import openpgp.sap.hashes as HASH
+from openpgp.sap.crypto import sign, verify, pad_rsa, TextCanonicalizer
+
+# package help
+from openpgp.code import *
+from openpgp.sap.list import list_as_signed
+
+# test help
+from support import read_test_file
+
+
+class A00Registry(unittest.TestCase):
+    """Hash Registry Tests
+    """
+    algs = [(HASH_MD5, 'md5'), (HASH_SHA1, 'sha1'), (HASH_SHA224, 'sha224'),
+            (HASH_SHA256, 'sha256'), (HASH_SHA384, 'sha384'),
+            (HASH_SHA512, 'sha512')]
+
+    def testA01Digests(self):
+        "hashes: registered algorithms hash like hashlib"
+        for alg, name in self.algs:
+            md = HASH.new(alg, 'ab')
+            md.update('c')
+            self.assertEqual(hashlib.new(name, 'abc').digest(), md.digest())
+            self.assertEqual(len(md.digest()), HASH.digest_size(alg))
+
+        if HASH.supported(HASH_RIPEMD160):
+            self.assertEqual('8eb208f7e05d987a9b044a8e98c6b087f15a0bfc',
+                             HASH.new(HASH_RIPEMD160, 'abc').hexdigest())
+
+    def testA02Prefixes(self):
+        "hashes: ASN.1 prefixes announce the digest size"
+        for alg, name in self.algs:
+            prefix = HASH.asn1_prefix(alg)
+            self.assertEqual(HASH.digest_size(alg), ord(prefix[-1]))
+            self.assertEqual(len(prefix) - 2 + HASH.digest_size(alg), ord(prefix[1]))
+            padded = pad_rsa(alg, HASH.new(alg).digest(), 1024)
+            self.assertEqual(128, len(padded))
+
+    def testA03Unsupported(self):
+        "hashes: unregistered algorithms raise NotImplementedError"
+        self.assertEqual(False, HASH.supported(HASH_100))
+        self.assertRaises(NotImplementedError, HASH.new, HASH_100)
+        self.assertRaises(NotImplementedError, pad_rsa, HASH_100, '', 1024)
+
+    def testA04SignVerifySHA2(self):
+        "hashes: DSA sign/verify with SHA-2 hashes"
+        key = list_as_signed(read_test_file(['pgpfiles','key','DSAELG1.sec.asc']))[0]
+        keypkt = key.get_keypkt(key.list_keyids()[0])
+
+        for alg in [HASH_SHA224, HASH_SHA256, HASH_SHA512]:
+            sigpkt = sign(SIG_BINARY, 'data', keypkt, passphrase='test',
+                          hashalg=alg)
+            self.assertEqual(alg, sigpkt.body.alg_hash)
+            self.assertEqual(True, bool(verify(sigpkt, 'data', keypkt)))
+            self.assertEqual(False, bool(verify(sigpkt, 'date', keypkt)))
+
+
+class B00TextCanonicalizer(unittest.TestCase):
+    """Streaming Text Canonicalization Tests
+    """
+    def testB01Chunks(self):
+        "hashes: TextCanonicalizer matches whole-string canonicalization"
+        rnd = random.Random(2440)
+
+        for i in range(500):
+            d = ''.join([rnd.choice(' \t\r\nab') for j in range(rnd.randint(0, 40))])
+            canon = TextCanonicalizer()
+            out, idx = [], 0
+
+            while idx < len(d):
+                size = rnd.randint(1, 6)
+                out.append(canon.update(d[idx:idx+size]))
+                idx += size
+
+            out.append(canon.final())
+            expected = d.replace('\r\n', '\n').replace('\n', '\r\n').strip()
+            self.assertEqual(expected, ''.join(out))
+
+    def testB02Hasher(self):
+        "hashes: sign/verify text with an incrementally fed hash"
+        key = list_as_signed(read_test_file(['pgpfiles','key','DSAELG1.sec.asc']))[0]
+        keypkt = key.get_keypkt(key.list_keyids()[0])
+        d = ' line one\r\nline two\n\n'
+        canon = TextCanonicalizer()
+        md = HASH.new(HASH_SHA1)
+
+        for c in d:
+            md.update(canon.update(c))
+
+        md.update(canon.final())
+        sigpkt = sign(SIG_TEXT, None, keypkt, passphrase='test', hasher=md)
+        self.assertEqual(True, bool(verify(sigpkt, d, keypkt)))
+        sigpkt = sign(SIG_TEXT, d, keypkt, passphrase='test')
+        self.assertEqual(True, bool(verify(sigpkt, None, keypkt, hasher=md)))
+
+
+if '__main__' == __name__:
+    unittest.main()